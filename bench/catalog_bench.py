@@ -0,0 +1,98 @@
+"""
+여러 장르/제작사 조건 검색: SQL(ResultPager, 장르마다 IN 하위 조회) vs 인메모리 카탈로그(장르 비트맵)
+
+    python -m bench.catalog_bench --works 100000
+
+- load: 카탈로그를 처음 읽는 시간 (앱에서는 첫 검색 뒤 백그라운드에서 한 번)
+- sql / catalog: 조건마다 전체 개수와 첫 페이지를 얻기까지의 시간
+- select: 카탈로그에서 비트맵 조건 계산만 걸린 시간
+- refresh: 작품 몇 개를 바꾼 뒤 변경 기록으로 따라잡는 시간
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import library_app
+from bench.fixtures import build_library, latency_summary
+from catalog import Catalog, CatalogResult, GenreFilter
+from library_db import open_read_connection
+
+
+def random_filters(rng, genres, makers, count):
+    filters = []
+    for _ in range(count):
+        genre_filter = GenreFilter(tuple(rng.sample(genres, rng.randint(1, 2))), tuple(rng.sample(genres, rng.randint(0, 3))),
+                                   tuple(rng.sample(genres, rng.randint(0, 2))))
+        maker = rng.choice(makers) if rng.random() < 0.3 else '[전체]'
+        filters.append((maker, genre_filter))
+    return filters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="카탈로그 비트맵 검색 벤치마크")
+    parser.add_argument('--works', type=int, default=100000, help="합성 작품 수")
+    parser.add_argument('--genres', type=int, default=100, help="장르 수")
+    parser.add_argument('--queries', type=int, default=30, help="검색 조건 수")
+    parser.add_argument('--changes', type=int, default=200, help="refresh 단계에서 바꿀 작품 수")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    db_path = os.path.join(work_dir, 'bench_catalog.db')
+    try:
+        build_library(db_path, works=args.works, genres=args.genres)
+        library_app.DATABASE_FILE = db_path
+        conn = open_read_connection(db_path)
+        catalog = Catalog()
+        start = time.perf_counter()
+        catalog.load(conn)
+        report = {'benchmark': 'catalog', 'works': args.works, 'genres': args.genres, 'queries': args.queries,
+                  'load_ms': round((time.perf_counter() - start) * 1000, 3)}
+
+        rng = random.Random(1)
+        genres = [row[0] for row in conn.execute("SELECT name FROM genres")]
+        makers = [row[0] for row in conn.execute("SELECT name FROM maker_counts")]
+        filters = random_filters(rng, genres, makers, args.queries)
+        sql_ms, catalog_ms, select_ms = [], [], []
+        for maker, genre_filter in filters:
+            start = time.perf_counter()
+            pager = library_app.ResultPager('', maker, genre_filter, False, conn=conn)
+            expected = pager.count()
+            pager.page(0)
+            sql_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            result = CatalogResult(catalog, maker, genre_filter)
+            result.count()
+            result.rows(0, library_app.RESULT_PAGE_SIZE)
+            catalog_ms.append((time.perf_counter() - start) * 1000)
+            assert result.count() == expected, (maker, genre_filter)
+
+            start = time.perf_counter()
+            catalog.select(maker, genre_filter)
+            select_ms.append((time.perf_counter() - start) * 1000)
+        report['sql'] = latency_summary(sql_ms)
+        report['catalog'] = latency_summary(catalog_ms)
+        report['select'] = latency_summary(select_ms, digits=4)
+
+        writer = sqlite3.connect(db_path)
+        ids = [row[0] for row in writer.execute("SELECT id FROM files WHERE scraped_status = 1")]
+        changed = rng.sample(ids, min(args.changes, len(ids)))
+        writer.executemany("UPDATE files SET is_hidden = 1 - is_hidden WHERE id = ?", [(i,) for i in changed])
+        writer.commit()
+        writer.close()
+        start = time.perf_counter()
+        catalog.refresh(conn)
+        report['refresh'] = {'changes': len(changed), 'ms': round((time.perf_counter() - start) * 1000, 3)}
+        conn.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+run_scraper 처리량: 로컬 FixtureServer(합성 DLsite 페이지)를 상대로 크롤링
+
+    python -m bench.crawl_bench --works 500 --latency-ms 50 --concurrency 8
+
+- network: 페이지를 모두 서버에서 받아 파싱/기록
+- cached: 같은 작업을 다시 돌려 PageCache에 저장된 페이지만 파싱/기록
+- refresh: --refresh와 같이 조건부 요청으로 다시 받기 (대부분 304, --changed 비율만 새 페이지)
+- covers: --covers와 같이 페이지에서 찾은 표지를 받아 팩 파일에 저장하고, 팩에서 하나씩 다시 읽는 시간
+초당 페이지 수(pages_per_sec)와 서버가 본 요청 처리 시간을 출력합니다.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import crawler
+from bench.fixtures import FixtureServer, build_library, latency_summary
+from cover_pack import CoverPack
+from library_db import QUERIES, open_read_connection
+from page_cache import PageCache
+
+
+def run_once(db_path, works, concurrency, base_url, cache, refresh=False):
+    # run_scraper는 작품마다 진행 상황을 출력하므로 측정 중에는 출력을 버립니다.
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        crawler.run_scraper(limit=works, rate=0, concurrency=concurrency, base_url=base_url, cache=cache,
+                            refresh=refresh)
+    elapsed = time.perf_counter() - start
+    conn = sqlite3.connect(db_path)
+    scraped, failed = conn.execute(
+        "SELECT SUM(scraped_status = 1), SUM(scraped_status = -1) FROM files").fetchone()
+    conn.close()
+    return {'seconds': round(elapsed, 3), 'pages_per_sec': round(works / max(elapsed, 1e-9), 2),
+            'scraped': scraped or 0, 'failed': failed or 0}
+
+
+def run_covers(db_path, concurrency, base_url, pack_path):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        crawler.fetch_covers(rate=0, concurrency=concurrency, base_url=base_url, pack=CoverPack(pack_path))
+    elapsed = time.perf_counter() - start
+    conn = open_read_connection(db_path)
+    stored = conn.execute("SELECT COUNT(*) FROM covers WHERE status = 1").fetchone()[0]
+    # 라이브러리 앱의 표지 칸과 같이 작품 id로 위치를 찾아 팩에서 읽습니다.
+    pack = CoverPack(pack_path)
+    read_ms = []
+    for (file_id,) in conn.execute("SELECT id FROM files").fetchall():
+        read_start = time.perf_counter()
+        row = conn.execute(QUERIES['cover'], (file_id,)).fetchone()
+        if row:
+            pack.read(row[0], row[1])
+        read_ms.append((time.perf_counter() - read_start) * 1000)
+    pack.close()
+    conn.close()
+    return {'seconds': round(elapsed, 3), 'covers_per_sec': round(stored / max(elapsed, 1e-9), 2), 'stored': stored,
+            'pack_bytes': os.path.getsize(pack_path) if os.path.exists(pack_path) else 0,
+            'read': latency_summary(read_ms, digits=4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run_scraper 크롤링 벤치마크")
+    parser.add_argument('--works', type=int, default=300, help="크롤링할 작품 수")
+    parser.add_argument('--latency-ms', type=float, default=30, help="서버 응답 지연(ms)")
+    parser.add_argument('--filler-kb', type=int, default=300, help="페이지당 채움 크기(KB)")
+    parser.add_argument('--concurrency', type=int, default=crawler.MAX_CONCURRENT_REQUESTS, help="동시 요청 수")
+    parser.add_argument('--changed', type=float, default=0.1, help="refresh 단계에서 바뀐 것으로 할 페이지 비율")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    db_path = os.path.join(work_dir, 'bench_crawl.db')
+    try:
+        build_library(db_path, works=args.works, duplicate_ratio=0, scraped=False)
+        crawler.DATABASE_FILE = db_path
+        cache = PageCache(os.path.join(work_dir, 'page_cache'))
+        report = {'benchmark': 'run_scraper', 'works': args.works, 'latency_ms': args.latency_ms,
+                  'concurrency': args.concurrency}
+        with FixtureServer(args.latency_ms, args.filler_kb) as server:
+            # build_library의 작품 키는 100000부터입니다.
+            server.preload(range(100000, 100000 + args.works))
+            report['network'] = run_once(db_path, args.works, args.concurrency, server.url_template, cache)
+            report['server'] = latency_summary(server.handled_ms)
+            report['server']['requests'] = len(server.handled_ms)
+
+            conn = sqlite3.connect(db_path)
+            conn.execute("UPDATE files SET scraped_status = 0")
+            conn.execute("UPDATE crawl_jobs SET next_attempt = 0")
+            conn.commit()
+            conn.close()
+            requests_before = len(server.handled_ms)
+            report['cached'] = run_once(db_path, args.works, args.concurrency, server.url_template, cache)
+            report['cached']['requests'] = len(server.handled_ms) - requests_before
+
+            for key in range(100000, 100000 + int(args.works * args.changed)):
+                server.versions[key] = 1
+            requests_before = len(server.handled_ms)
+            report['refresh'] = run_once(db_path, args.works, args.concurrency, server.url_template, cache,
+                                         refresh=True)
+            report['refresh']['requests'] = len(server.handled_ms) - requests_before
+            report['refresh']['not_modified'] = server.not_modified
+
+            report['covers'] = run_covers(db_path, args.concurrency, server.url_template,
+                                          os.path.join(work_dir, 'covers.pack'))
+            report['covers']['requests'] = server.cover_requests
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
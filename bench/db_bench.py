@@ -0,0 +1,73 @@
+"""
+라이브러리 앱 DB 작업별 지연 시간: 호출마다 연결을 여는 방식(이전) vs 공유 LibraryDB(현재)
+
+    python -m bench.db_bench --works 100000
+
+이전 방식은 예전 library_app 함수들처럼 sqlite3.connect → 실행 → close를 매번 반복합니다.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from bench.fixtures import build_library, latency_summary
+from library_db import LibraryDB, QUERIES
+
+
+def per_call(db_path, name, params=(), write=False):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(QUERIES[name], params)
+    rows = cursor.fetchall()
+    if write:
+        conn.commit()
+    conn.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="라이브러리 앱 DB 작업 벤치마크")
+    parser.add_argument('--works', type=int, default=20000, help="합성 작품 수")
+    parser.add_argument('--repeat', type=int, default=50, help="작업별 반복 횟수")
+    parser.add_argument('--db', default=None, help="DB 경로 (기본값: 임시 파일)")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), 'bench_library.db')
+    build_library(db_path, works=args.works)
+    db = LibraryDB(db_path)
+
+    rng = random.Random(1)
+    names = [r[1] for r in db.fetch_all('duplicate_groups') if r[0] == 'title'] or ['']
+    ids = [r[0] for r in db.reader.execute("SELECT id FROM files LIMIT 1000")]
+
+    operations = {
+        'makers': (lambda: per_call(db_path, 'makers'), lambda: db.fetch_all('makers')),
+        'genres': (lambda: per_call(db_path, 'genres'), lambda: db.fetch_all('genres')),
+        'duplicate_groups': (lambda: per_call(db_path, 'duplicate_groups'), lambda: db.fetch_all('duplicate_groups')),
+        'duplicate_files': (lambda n: per_call(db_path, 'duplicate_files_by_title', (n,)),
+                            lambda n: db.fetch_all('duplicate_files_by_title', (n,))),
+        'toggle_hidden': (
+            lambda i: per_call(db_path, 'set_hidden', (1 - per_call(db_path, 'is_hidden', (i,))[0][0], i), write=True),
+            lambda i: db.write([('set_hidden', (1 - db.fetch_one('is_hidden', (i,))[0], i))])),
+    }
+    report = {'benchmark': 'library_db', 'works': args.works, 'repeat': args.repeat, 'operations': {}}
+    for op, (before, after) in operations.items():
+        result = {}
+        for label, func in (('per_call_connection', before), ('shared_connection', after)):
+            latencies = []
+            for _ in range(args.repeat):
+                arg = () if op in ('makers', 'genres', 'duplicate_groups') else (rng.choice(names if op == 'duplicate_files' else ids),)
+                start = time.perf_counter()
+                func(*arg)
+                latencies.append((time.perf_counter() - start) * 1000)
+            result[label] = latency_summary(latencies)
+        report['operations'][op] = result
+    db.close()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+작품 페이지 추출 속도 비교: 빠른 스트리밍 파서 vs BeautifulSoup 전체 파싱
+
+    python -m bench.extract_bench --pages 200 --filler-kb 300
+
+두 방법의 결과가 모든 페이지에서 같은지도 함께 확인합니다.
+"""
+import argparse
+import json
+import time
+
+from bench.fixtures import product_corpus
+from product_parser import parse_product_page, parse_product_page_soup
+
+
+def measure(func, corpus, repeat):
+    """corpus 전체를 repeat번 파싱하는 데 걸린 시간으로 초당 페이지 수를 계산합니다."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, html in corpus:
+            func(html)
+    elapsed = time.perf_counter() - start
+    return len(corpus) * repeat / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="작품 페이지 추출 벤치마크")
+    parser.add_argument('--pages', type=int, default=100, help="합성 페이지 수")
+    parser.add_argument('--filler-kb', type=int, default=300, help="페이지당 채움 크기(KB)")
+    parser.add_argument('--repeat', type=int, default=1, help="반복 횟수")
+    args = parser.parse_args()
+
+    corpus = product_corpus(args.pages, filler_kb=args.filler_kb)
+    mismatches = [key for key, html in corpus if parse_product_page(html) != parse_product_page_soup(html)]
+
+    soup_rate = measure(parse_product_page_soup, corpus, args.repeat)
+    fast_rate = measure(parse_product_page, corpus, args.repeat)
+    print(json.dumps({
+        'benchmark': 'extract_product_info',
+        'pages': len(corpus),
+        'avg_page_bytes': sum(len(html) for _, html in corpus) // len(corpus),
+        'beautifulsoup_pages_per_sec': round(soup_rate, 2),
+        'fast_parser_pages_per_sec': round(fast_rate, 2),
+        'speedup': round(fast_rate / soup_rate, 2),
+        'mismatches': mismatches,
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
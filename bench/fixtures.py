@@ -0,0 +1,318 @@
+import email.utils
+import os
+import random
+import socket
+import statistics
+import threading
+import time
+import struct
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 합성 작품 페이지에 쓰는 단어들
+GENRE_NAMES = ['음성', '판타지', '학원', '일상', '순애', '코미디', 'ASMR', '치유', '누나', '메이드',
+               '여동생', '소꿉친구', '모험', '이세계', '귀축', '단편', '장편', '동인', '게임', '만화']
+TITLE_WORDS = ['小さな', '夏の', '비밀', '약속', 'Night', 'Dream', '魔法', '학교', '모험', '여름',
+               'Story', 'の', '&amp;', '&#9734;', '★', '~', '2', 'Re:', '바다', '별']
+
+
+def percentile(values, p):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def latency_summary(latencies_ms, digits=3):
+    """지연 시간 목록(ms)을 p50/p95/p99/평균 dict로 요약합니다."""
+    summary = {f'p{p}_ms': round(percentile(latencies_ms, p), digits) for p in (50, 95, 99)}
+    summary['mean_ms'] = round(statistics.mean(latencies_ms), digits)
+    return summary
+
+
+def product_title(key):
+    """key로 결정되는 합성 작품명 (HTML 조각)"""
+    rng = random.Random(f"title-{key}")
+    return ' '.join(rng.choice(TITLE_WORDS) for _ in range(rng.randint(2, 6)))
+
+
+def cover_path(key):
+    """합성 작품 페이지의 표지 주소 (FixtureServer가 cover_image(key)로 답하는 상대 주소)"""
+    return f"/modpub/images2/work/doujin/RJ{key}_img_main.png"
+
+
+def cover_image(key, width=560, height=420):
+    """key마다 색이 다른 표지 이미지(PNG bytes)를 만듭니다."""
+    rng = random.Random(f"cover-{key}")
+    red, green, blue = (rng.randrange(256) for _ in range(3))
+    rows = b''.join(b'\x00' + bytes((red, (green + y) % 256, blue)) * width for y in range(height))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+
+
+def product_page(key, filler_kb=300):
+    """
+    DLsite 작품 페이지와 비슷한 구조의 합성 HTML(str)을 만듭니다.
+    같은 key는 항상 같은 페이지가 됩니다. filler_kb로 페이지 크기를 조절합니다.
+    일부 페이지는 일본어 페이지, 장르/제작사/표지 없음, 작품명 안의 태그/주석 같은 변형을 포함합니다.
+    """
+    rng = random.Random(f"page-{key}")
+    variant = int(key) % 10
+    lang = 'ja-jp' if variant == 7 else 'ko-kr'
+    genre_header = 'ジャンル' if variant == 7 else '장르'
+    title = product_title(key)
+    if variant == 3:
+        title = f"<span class=\"icon\">NEW</span> {title} <!-- 추천 -->"
+    maker = f"서클 {rng.randint(1, 500)} &amp; Co."
+    genres = rng.sample(GENRE_NAMES, rng.randint(0, 10))
+
+    nav = ''.join(f'<li><a href="/maniax/genre/{i}">메뉴 {i}</a></li>\n' for i in range(60))
+    script = 'var dataLayer = [' + ','.join(f'{{"id":{i},"v":"<b>{i}</b>"}}' for i in range(200)) + '];'
+    parts = [
+        '<!DOCTYPE html>\n',
+        f'<html lang="{lang}">\n<head>\n<meta charset="utf-8">\n<title>{title} | DLsite</title>\n',
+        '' if variant == 4 else f'<meta property="og:image" content="{cover_path(key)}">\n',
+        f'<script>{script}</script>\n<style>.work_name {{ font-weight: bold; }}</style>\n</head>\n<body>\n',
+        f'<header id="header"><ul class="nav">\n{nav}</ul></header>\n',
+        '<div id="top_wrapper">\n<div class="base_title_br clearfix">\n',
+        f'<h1 itemprop="name" id="work_name">\n  {title}\n</h1>\n</div>\n',
+    ]
+    if variant != 5:
+        parts.append(
+            '<table id="work_maker" cellspacing="0"><tr><th>서클명</th><td>'
+            f'<span itemprop="brand" class="maker_name"><a href="/maniax/circle/profile/=/maker_id/RG{key}.html">{maker}</a></span>'
+            '</td></tr></table>\n')
+    parts.append('<table id="work_outline" cellspacing="0">\n<tr><th>판매일</th><td><a href="#">2024년 01월 01일</a></td></tr>\n')
+    parts.append('<tr><th>작품 형식</th><td><div class="work_genre"><a href="#"><span title="보이스">보이스</span></a></div></td></tr>\n')
+    if variant != 6:
+        links = ''.join(f'<a href="/maniax/fsr/=/genre/{GENRE_NAMES.index(g)}">{g}</a>' for g in genres)
+        parts.append(f'<tr><th>{genre_header}</th><td>\n<div class="main_genre">{links}</div>\n</td></tr>\n')
+    parts.append('</table>\n</div>\n')
+
+    # 리뷰, 추천 작품 같은 나머지 영역으로 페이지 크기를 채웁니다.
+    filler = []
+    size = 0
+    i = 0
+    while size < filler_kb * 1024:
+        block = (f'<div class="recommend_work"><a href="/maniax/work/=/product_id/RJ{rng.randint(10000, 999999)}.html">'
+                 f'<img src="/img/{i}.jpg" alt="추천 {i}"><br><span class="work_name">{product_title(i)}</span></a>'
+                 f'<div class="main_genre"><a href="#">{rng.choice(GENRE_NAMES)}</a></div>'
+                 f'<p class="review">리뷰 내용 {i} &hellip; 좋아요 &#9829;</p></div>\n')
+        filler.append(block)
+        size += len(block.encode('utf-8'))
+        i += 1
+    parts.extend(filler)
+    parts.append('</body>\n</html>\n')
+    return ''.join(parts)
+
+
+def product_corpus(count, start_key=100000, filler_kb=300):
+    """(key, 페이지 bytes) 목록을 만듭니다."""
+    return [(str(key), product_page(key, filler_kb).encode('utf-8')) for key in range(start_key, start_key + count)]
+
+
+def build_library(db_path, works=10000, genres=100, genres_per_work=8, makers=None, duplicate_ratio=0.05, seed=0,
+                  scraped=True):
+    """
+    합성 라이브러리 DB(file_index.db와 같은 스키마)를 db_path에 만듭니다.
+    works개의 작품(모두 스크래핑 완료 상태), genres개의 장르, 작품당 최대 genres_per_work개의 장르를 넣고,
+    duplicate_ratio 비율만큼은 같은 작품명의 중복 파일을 추가합니다.
+    scraped=False이면 작품 정보와 장르 없이 크롤러 작업 대기 상태(scraped_status = 0)로 넣습니다.
+    """
+    import sqlite3
+    import db_schema
+    from duplicate_index import normalize_title
+
+    rng = random.Random(seed)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    db_schema.setup_database(db_path)
+
+    makers = makers or max(1, works // 20)
+    genre_names = [f"{GENRE_NAMES[i % len(GENRE_NAMES)]} {i}" for i in range(genres)]
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.executemany("INSERT INTO genres (id, name) VALUES (?, ?)", list(enumerate(genre_names, 1)))
+    rows = []
+    links = []
+    file_id = 0
+    for i in range(works):
+        key = str(100000 + i)
+        title = f"{product_title(i)} {i}"
+        maker = f"서클 {rng.randrange(makers)}"
+        copies = 2 if rng.random() < duplicate_ratio else 1
+        work_genres = rng.sample(range(1, genres + 1), rng.randint(0, min(genres_per_work, genres)))
+        for copy in range(copies):
+            file_id += 1
+            path = os.path.join('library', f"dir{i % 100}", f"RJ{key}{'' if copy == 0 else ' (1)'}.zip")
+            if scraped:
+                rows.append((file_id, key, path, os.path.dirname(path), title, normalize_title(title), maker, 1))
+                links.extend((file_id, genre_id) for genre_id in work_genres)
+            else:
+                rows.append((file_id, key, path, os.path.dirname(path), None, None, None, 0))
+    cursor.executemany(
+        "INSERT INTO files (id, extracted_key, file_path, dir_path, product_name, title_key, maker_name, scraped_status)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        rows)
+    cursor.executemany("INSERT INTO file_genres (file_id, genre_id) VALUES (?, ?)", links)
+    conn.commit()
+    conn.close()
+    return {'works': works, 'files': file_id, 'genres': genres, 'genre_links': len(links)}
+
+
+FILE_WORDS = ['voice', 'ASMR', 'archive', 'backup', '작품', '음성', 'final', 'ver2', 'disc1', '修正版']
+
+
+def build_tree(root, files=10000, files_per_dir=200, fanout=8, key_ratio=0.8, seed=0):
+    """
+    process_files용 합성 폴더 트리를 root 아래에 만듭니다. (내용이 빈 파일)
+    폴더마다 files_per_dir개의 파일을 넣고, 폴더는 fanout개씩 가지를 쳐서 깊어집니다.
+    key_ratio 비율의 파일 이름에는 품번(RJ123456 등)이 들어 있습니다. 만든 (폴더 수, 파일 수)를 돌려줍니다.
+    """
+    rng = random.Random(seed)
+    dir_paths = [root]
+    created = 0
+    key = 100000
+    i = 0
+    while created < files:
+        # 너비 우선으로 폴더를 만들어 트리가 고르게 깊어지도록 합니다.
+        dir_path = dir_paths[i]
+        os.makedirs(dir_path, exist_ok=True)
+        for _ in range(min(files_per_dir, files - created)):
+            words = [rng.choice(FILE_WORDS) for _ in range(rng.randint(1, 3))]
+            if rng.random() < key_ratio:
+                key += 1
+                words.insert(0, f"[RJ{key}]")
+            else:
+                words.append(str(created))
+            path = os.path.join(dir_path, ' '.join(words) + f" {created}.zip")
+            open(path, 'wb').close()
+            created += 1
+        dir_paths.extend(os.path.join(dir_path, f"d{j}") for j in range(fanout))
+        i += 1
+    return i, created
+
+
+class FixtureServer:
+    """
+    합성 DLsite 작품 페이지를 돌려주는 로컬 HTTP 서버입니다. (crawler.run_scraper의 base_url로 사용)
+
+        with FixtureServer(latency_ms=20) as server:
+            run_scraper(..., base_url=server.url_template)
+
+    /maniax/work/=/product_id/RJ<번호>.html 요청에 product_page(번호)를, cover_path(번호) 요청에
+    cover_image(번호)를 돌려주고, 나머지는 404입니다. (표지 요청 수는 cover_requests에 쌓입니다)
+    latency_ms만큼 응답을 늦춰 실제 서버의 지연을 흉내 냅니다. 요청 처리 시간(ms)은 handled_ms에 쌓입니다.
+    페이지 생성이 측정을 흐리지 않도록 preload로 미리 만들어 둘 수 있습니다.
+
+    페이지마다 ETag/Last-Modified를 보내고, If-None-Match가 맞으면 304로 답합니다. (not_modified에 개수)
+    versions[번호]를 올리면 그 페이지가 바뀐 것으로 봅니다. faults[번호]에 응답 코드나 'reset'(연결 끊기)의
+    목록을 넣으면 그 순서대로 실패한 뒤에 정상 응답합니다. (429/503에는 Retry-After: 1)
+    """
+
+    def __init__(self, latency_ms=0, filler_kb=300):
+        self.latency_ms = latency_ms
+        self.filler_kb = filler_kb
+        self.pages = {}
+        self.versions = {}
+        self.faults = {}
+        self.not_modified = 0
+        self.cover_requests = 0
+        self.covers = {}
+        self.handled_ms = []
+        self.lock = threading.Lock()
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # 헤더와 본문을 따로 보내므로, 작은 응답(표지 이미지 등)이 Nagle 알고리즘 때문에 늦어지지 않게 합니다.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                start = time.perf_counter()
+                name = self.path.rsplit('/', 1)[-1]
+                if name.startswith('RJ') and name.endswith('.html') and name[2:-5].isdigit():
+                    key = int(name[2:-5])
+                    if fixture.latency_ms:
+                        time.sleep(fixture.latency_ms / 1000)
+                    with fixture.lock:
+                        faults = fixture.faults.get(key)
+                        fault = faults.pop(0) if faults else None
+                    version = fixture.versions.get(key, 0)
+                    etag = f'"RJ{key}-{version}"'
+                    if fault == 'reset':
+                        self.close_connection = True
+                        self.connection.shutdown(socket.SHUT_RDWR)
+                        return
+                    if fault is not None:
+                        body = b'error'
+                        self.send_response(fault)
+                        if fault in (429, 503):
+                            self.send_header('Retry-After', '1')
+                    elif self.headers.get('If-None-Match') == etag:
+                        body = b''
+                        self.send_response(304)
+                        self.send_header('ETag', etag)
+                        with fixture.lock:
+                            fixture.not_modified += 1
+                    else:
+                        body = fixture.page(key)
+                        self.send_response(200)
+                        self.send_header('Content-Type', 'text/html; charset=utf-8')
+                        self.send_header('ETag', etag)
+                        self.send_header('Last-Modified', email.utils.formatdate(1_600_000_000 + version * 86400,
+                                                                                 usegmt=True))
+                elif name.startswith('RJ') and name.endswith('_img_main.png') and name[2:-13].isdigit():
+                    body = fixture.cover(int(name[2:-13]))
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'image/png')
+                    with fixture.lock:
+                        fixture.cover_requests += 1
+                else:
+                    body = b'not found'
+                    self.send_response(404)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with fixture.lock:
+                    fixture.handled_ms.append((time.perf_counter() - start) * 1000)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def page(self, key):
+        body = self.pages.get(key)
+        if body is None:
+            body = self.pages[key] = product_page(key, self.filler_kb).encode('utf-8')
+        return body
+
+    def cover(self, key):
+        body = self.covers.get(key)
+        if body is None:
+            body = self.covers[key] = cover_image(key)
+        return body
+
+    def preload(self, keys):
+        for key in keys:
+            self.page(int(key))
+
+    @property
+    def url_template(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/maniax/work/=/product_id/{{}}.html"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
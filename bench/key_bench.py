@@ -0,0 +1,114 @@
+"""
+파일 이름 품번 추출 속도 비교
+
+    python -m bench.key_bench --names 2000000
+
+- legacy_single_regex: 예전 extract_info_from_filename (RJ 정규식 하나를 파일마다 re.search)
+- per_rule_search: 규칙마다 정규식을 따로 두고 파일마다 차례로 re.search
+- combined: KeyExtractor.extract (접두어 문자열 검사 후 합친 정규식 한 번)
+- combined_no_prefilter: 접두어 검사 없이 합친 정규식만
+- batch: KeyExtractor.extract_batch (폴더 목록 단위로 정규식 한 번)
+세 가지 KeyExtractor 방식의 결과가 per_rule_search와 같은지도 함께 확인합니다.
+"""
+import argparse
+import json
+import random
+import re
+import time
+
+from key_extractor import KeyExtractor, KEY_RULES
+
+WORDS = ['voice', 'ASMR', 'game', 'archive', 'backup', '작품', '음성', 'final', 'ver2', 'disc1', '修正版', 'Part']
+EXTENSIONS = ['.zip', '.rar', '.7z', '.mp4', '.wav', '.pdf', '.txt', '.jpg']
+
+
+def synthetic_names(count, key_ratio=0.3, seed=0):
+    """count개의 파일 이름을 만듭니다. key_ratio 비율만큼은 품번(RJ/거/VJ/BJ/RE)을 포함합니다."""
+    rng = random.Random(seed)
+    prefixes = ['RJ', 'rj', '거', 'VJ', 'BJ', 'RE']
+    names = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 4))]
+        if rng.random() < key_ratio:
+            key = f"{rng.choice(prefixes)}{rng.randint(10000, 99999999):0{rng.choice((6, 8))}d}"
+            words.insert(rng.randint(0, len(words)), f"[{key}]" if rng.random() < 0.5 else key)
+        else:
+            words.append(str(rng.randint(1, 99999)))
+        names.append(' '.join(words) + rng.choice(EXTENSIONS))
+    return names
+
+
+def per_rule_extractor(rules):
+    """규칙마다 따로 컴파일한 정규식을 차례로 시도하는 단순한 방식 (비교 기준)"""
+    compiled = []
+    for name, prefixes, min_digits, key_format, word_start in rules:
+        start = '(?<![a-z])' if word_start else ''
+        prefix = '|'.join(re.escape(p) for p in sorted(prefixes, key=len, reverse=True))
+        compiled.append((name, key_format, re.compile(f"{start}(?:{prefix})(\\d{{{min_digits},}})", re.IGNORECASE)))
+
+    def extract(filename):
+        best = None
+        for name, key_format, pattern in compiled:
+            match = pattern.search(filename)
+            if match and (best is None or match.start() < best[0]):
+                best = (match.start(), name, key_format.format(digits=match.group(1)))
+        return best[1:] if best else None
+    return extract
+
+
+def measure(func, names, batch_size=None):
+    start = time.perf_counter()
+    if batch_size:
+        results = []
+        for i in range(0, len(names), batch_size):
+            results.extend(func(names[i:i + batch_size]))
+    else:
+        results = [func(name) for name in names]
+    return len(names) / (time.perf_counter() - start), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="품번 추출 벤치마크")
+    parser.add_argument('--names', type=int, default=1000000, help="합성 파일 이름 수")
+    parser.add_argument('--key-ratio', type=float, default=0.3, help="품번이 들어 있는 이름의 비율")
+    parser.add_argument('--dir-size', type=int, default=500, help="배치 추출 때 한 폴더의 파일 수")
+    args = parser.parse_args()
+
+    names = synthetic_names(args.names, args.key_ratio)
+    extractor = KeyExtractor(KEY_RULES)
+    legacy = re.compile(r'(?i)(?:rj|거)(\d{5,})')
+
+    def legacy_extract(filename):
+        match = legacy.search(filename)
+        return match.group(1) if match else None
+
+    def no_prefilter(filename):
+        for match in extractor.pattern.finditer(filename):
+            found = extractor._result(filename, match)
+            if found:
+                return found
+        return None
+
+    rates = {}
+    rates['legacy_single_regex'], _ = measure(legacy_extract, names)
+    rates['per_rule_search'], expected = measure(per_rule_extractor(KEY_RULES), names)
+    mismatches = {}
+    for label, func, batch_size in (('combined', extractor.extract, None),
+                                    ('combined_no_prefilter', no_prefilter, None),
+                                    ('batch', extractor.extract_batch, args.dir_size)):
+        rates[label], results = measure(func, names, batch_size)
+        mismatches[label] = sum(1 for a, b in zip(results, expected) if a != b)
+
+    print(json.dumps({
+        'benchmark': 'key_extraction',
+        'names': len(names),
+        'rules': len(KEY_RULES),
+        'matched': sum(1 for r in expected if r),
+        'names_per_sec': {label: round(rate) for label, rate in rates.items()},
+        'speedup_vs_per_rule': {label: round(rate / rates['per_rule_search'], 2) for label, rate in rates.items()},
+        'mismatches': mismatches,
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
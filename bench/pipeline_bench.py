@@ -0,0 +1,77 @@
+"""
+pipeline.Pipeline 전체 처리량: 합성 폴더 트리 두 개를 함께 스캔하면서 로컬 FixtureServer를 상대로 크롤링
+
+    python -m bench.pipeline_bench --files 20000 --latency-ms 30 --concurrency 8
+
+- pipeline: 스캔/크롤링/내용 해시/색인 정리를 한 번에 실행한 단계별 시간과 전체 처리량
+  (crawl.during_scan은 스캔이 끝나기 전에 받은 페이지 수)
+- sequential_scan_seconds: 같은 트리를 크롤링 없이 스캔만 한 시간 (비교용)
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import db_schema
+import main as indexer
+import pipeline
+from bench.fixtures import FixtureServer, build_tree
+from page_cache import PageCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스캔 → 크롤링 → 색인 파이프라인 벤치마크")
+    parser.add_argument('--files', type=int, default=20000, help="두 트리를 합친 파일 수")
+    parser.add_argument('--files-per-dir', type=int, default=200, help="폴더당 파일 수")
+    parser.add_argument('--key-ratio', type=float, default=0.05, help="품번이 들어 있는 파일 비율")
+    parser.add_argument('--latency-ms', type=float, default=30, help="서버 응답 지연(ms)")
+    parser.add_argument('--filler-kb', type=int, default=50, help="페이지당 채움 크기(KB)")
+    parser.add_argument('--concurrency', type=int, default=8, help="동시 요청 수")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    roots = [os.path.join(work_dir, 'tree_a'), os.path.join(work_dir, 'tree_b')]
+    try:
+        keys = 0
+        for i, root in enumerate(roots):
+            build_tree(root, args.files // 2, args.files_per_dir, key_ratio=args.key_ratio, seed=i)
+            keys = max(keys, sum(name.startswith('[RJ') for _, _, names in os.walk(root) for name in names))
+
+        # 비교용: 크롤링 없이 두 트리를 스캔만 합니다.
+        scan_db = os.path.join(work_dir, 'bench_scan.db')
+        db_schema.setup_database(scan_db)
+        conn = db_schema.connect(scan_db)
+        start = time.perf_counter()
+        indexer.scan_trees(conn, roots, incremental=False)
+        sequential_scan = time.perf_counter() - start
+        conn.close()
+
+        pipeline.DATABASE_FILE = os.path.join(work_dir, 'bench_pipeline.db')
+        with FixtureServer(args.latency_ms, args.filler_kb) as server:
+            # build_tree의 품번은 100001부터이며, 두 트리는 같은 품번을 씁니다.
+            server.preload(range(100001, 100001 + keys))
+            runner = pipeline.Pipeline(roots, incremental=False, rate=0, concurrency=args.concurrency,
+                                       base_url=server.url_template, cache=PageCache(os.path.join(work_dir, 'pages')))
+            with contextlib.redirect_stdout(io.StringIO()):
+                report = runner.run()
+            requests = len(server.handled_ms)
+        conn = sqlite3.connect(pipeline.DATABASE_FILE)
+        scraped = conn.execute("SELECT COUNT(*) FROM files WHERE scraped_status = 1").fetchone()[0]
+        conn.close()
+        report = {'benchmark': 'pipeline', 'files': args.files, 'keys': keys, 'latency_ms': args.latency_ms,
+                  'concurrency': args.concurrency, 'requests': requests, 'scraped': scraped,
+                  'sequential_scan_seconds': round(sequential_scan, 3), 'pipeline': report}
+        report['pipeline'].pop('roots')
+        report['pipeline']['scan'].pop('roots', None)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+모든 벤치마크를 차례로 실행해 결과를 JSON 파일 하나로 모읍니다.
+
+    python -m bench.run_all --out results.json
+    python -m bench.run_all --quick --out new.json --compare results.json
+
+--compare를 주면 이전 결과와 숫자 항목별 비율(새 값 / 이전 값)을 함께 출력합니다.
+(*_per_sec, speedup은 클수록, *_ms, seconds는 작을수록 좋습니다)
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+# (벤치마크 모듈, 기본 인자, --quick 인자)
+BENCHMARKS = [
+    ('bench.key_bench', [], ['--names', '200000']),
+    ('bench.extract_bench', [], ['--pages', '30']),
+    ('bench.scan_bench', ['--files', '100000'], ['--files', '10000']),
+    ('bench.search_bench', ['--works', '100000'], ['--works', '10000', '--queries', '10']),
+    ('bench.db_bench', ['--works', '100000'], ['--works', '10000', '--repeat', '20']),
+    ('bench.startup_bench', ['--works', '100000'], ['--works', '10000', '--repeat', '5']),
+    ('bench.catalog_bench', ['--works', '100000'], ['--works', '10000', '--queries', '10']),
+    ('bench.crawl_bench', [], ['--works', '100']),
+    ('bench.pipeline_bench', [], ['--files', '4000']),
+]
+
+
+def run_benchmark(module, args):
+    """벤치마크 하나를 별도 프로세스로 실행해, 출력 끝의 JSON을 읽어 돌려줍니다."""
+    completed = subprocess.run([sys.executable, '-m', module] + args, capture_output=True, text=True,
+                               encoding='utf-8')
+    if completed.returncode != 0:
+        return {'error': completed.stderr.strip().splitlines()[-1:] or ['실패']}
+    # 스키마 마이그레이션 메시지 등이 앞에 섞여 있을 수 있으므로 첫 '{'부터 읽습니다.
+    return json.loads(completed.stdout[completed.stdout.index('{'):])
+
+
+def _numbers(report, prefix=''):
+    """중첩된 결과에서 (경로, 숫자) 목록을 꺼냅니다."""
+    if isinstance(report, dict):
+        for key, value in report.items():
+            yield from _numbers(value, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(report, (int, float)) and not isinstance(report, bool):
+        yield prefix, report
+
+
+def compare(old, new):
+    """이전/새 결과에서 같은 경로의 숫자를 비교해 {경로: {'old', 'new', 'ratio'}}를 돌려줍니다."""
+    old_values = dict(_numbers(old.get('results', {})))
+    changes = {}
+    for path, value in _numbers(new.get('results', {})):
+        before = old_values.get(path)
+        if before is None or before == value:
+            continue
+        changes[path] = {'old': before, 'new': value, 'ratio': round(value / before, 3) if before else None}
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전체 벤치마크 실행")
+    parser.add_argument('--quick', action='store_true', help="작은 크기로 빠르게 실행")
+    parser.add_argument('--only', nargs='*', help="실행할 벤치마크 이름 (예: scan_bench search_bench)")
+    parser.add_argument('--out', default=None, help="결과를 저장할 JSON 파일")
+    parser.add_argument('--compare', default=None, help="비교할 이전 결과 JSON 파일")
+    args = parser.parse_args()
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    report = {'started': time.strftime('%Y-%m-%d %H:%M:%S'), 'commit': commit or None,
+              'python': platform.python_version(), 'platform': platform.platform(), 'quick': args.quick,
+              'results': {}}
+    for module, full_args, quick_args in BENCHMARKS:
+        name = module.split('.')[-1]
+        if args.only and name not in args.only:
+            continue
+        print(f"{name} 실행 중...", file=sys.stderr)
+        start = time.perf_counter()
+        report['results'][name] = run_benchmark(module, quick_args if args.quick else full_args)
+        print(f"  {time.perf_counter() - start:.1f}초", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            report['compared_to'] = args.compare
+            report['changes'] = compare(json.load(f), report)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+process_files 스캔 속도: 합성 폴더 트리에서 전체 스캔 / 변경 없는 증분 스캔 / 일부 폴더만 바뀐 증분 스캔
+
+    python -m bench.scan_bench --files 100000
+
+각 단계의 초당 파일 수(files_per_sec)와 폴더 하나를 반영하는 데 걸린 시간(apply)을 출력합니다.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import db_schema
+import main as indexer
+from bench.fixtures import build_tree, latency_summary
+
+
+class TimedSession(indexer.ScanSession):
+    """폴더마다 apply에 걸린 시간을 기록하는 ScanSession"""
+    latencies = []
+
+    def apply(self, scan, parent):
+        start = time.perf_counter()
+        super().apply(scan, parent)
+        TimedSession.latencies.append((time.perf_counter() - start) * 1000)
+
+
+def run_phase(db_path, root, incremental, workers):
+    TimedSession.latencies = []
+    conn = db_schema.connect(db_path)
+    start = time.perf_counter()
+    try:
+        session = indexer.scan_tree(conn, root, incremental, workers)
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - start
+    return {
+        'seconds': round(elapsed, 3),
+        'files': session.total_files_processed,
+        'files_per_sec': round(session.total_files_processed / max(elapsed, 1e-9)),
+        'scanned_dirs': session.scanned_dirs,
+        'skipped_dirs': session.skipped_dirs,
+        'added': session.added,
+        'removed': session.removed,
+        'apply': latency_summary(TimedSession.latencies) if TimedSession.latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="process_files 스캔 벤치마크")
+    parser.add_argument('--files', type=int, default=20000, help="합성 파일 수")
+    parser.add_argument('--files-per-dir', type=int, default=200, help="폴더당 파일 수")
+    parser.add_argument('--workers', type=int, default=indexer.SCAN_WORKERS, help="스캔 스레드 수")
+    parser.add_argument('--changed-dirs', type=float, default=0.05, help="마지막 단계에서 바꿀 폴더 비율")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    root = os.path.join(work_dir, 'tree')
+    db_path = os.path.join(work_dir, 'bench_scan.db')
+    try:
+        start = time.perf_counter()
+        dirs, files = build_tree(root, args.files, args.files_per_dir)
+        build_seconds = time.perf_counter() - start
+        db_schema.setup_database(db_path)
+        # scan_tree가 쓰는 ScanSession을 시간 측정용으로 바꿉니다.
+        indexer.ScanSession = TimedSession
+
+        report = {'benchmark': 'process_files', 'files': files, 'dirs': dirs, 'workers': args.workers,
+                  'tree_build_seconds': round(build_seconds, 2)}
+        report['full'] = run_phase(db_path, root, False, args.workers)
+        # 폴더 mtime은 DIR_MTIME_SETTLE_SECONDS가 지나야 기록되므로, 그 전에 만든 트리는 한 번 더 읽습니다.
+        time.sleep(indexer.DIR_MTIME_SETTLE_SECONDS)
+        run_phase(db_path, root, True, args.workers)
+        report['incremental_unchanged'] = run_phase(db_path, root, True, args.workers)
+
+        rng = random.Random(1)
+        dir_paths = [path for path, _, names in os.walk(root) if names]
+        for path in rng.sample(dir_paths, max(1, int(len(dir_paths) * args.changed_dirs))):
+            open(os.path.join(path, f"RJ{rng.randint(10**7, 10**8)} new.zip"), 'wb').close()
+            os.remove(os.path.join(path, sorted(n for n in os.listdir(path) if n.startswith('[RJ'))[0]))
+        report['incremental_changed'] = run_phase(db_path, root, True, args.workers)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+search_works 검색 지연 시간 비교: LIKE 전체 검색 vs FTS5 색인
+
+    python -m bench.search_bench --works 100000
+
+두 방법이 같은 작품 집합을 돌려주는지도 함께 확인합니다.
+first_page는 목록 화면(ResultPager)이 첫 화면을 채우는 데 걸리는 시간입니다.
+repeat는 같은 검색을 다시 했을 때(결과 캐시 적중)의 시간과 적중률입니다. (like/fts는 캐시를 비우고 잽니다)
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import library_app
+from bench.fixtures import build_library, latency_summary, product_title
+
+
+def main():
+    parser = argparse.ArgumentParser(description="search_works 검색 벤치마크")
+    parser.add_argument('--works', type=int, default=20000, help="합성 작품 수")
+    parser.add_argument('--queries', type=int, default=30, help="검색어 수")
+    parser.add_argument('--db', default=None, help="DB 경로 (기본값: 임시 파일)")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), 'bench_library.db')
+    build_library(db_path, works=args.works)
+    library_app.DATABASE_FILE = db_path
+
+    rng = random.Random(1)
+    keywords = []
+    for _ in range(args.queries):
+        # 실제 사용처럼 특정 작품명의 일부(연속된 두 단어 + 번호) 또는 제작사 이름으로 찾습니다.
+        i = rng.randrange(args.works)
+        words = f"{product_title(i)} {i}".split()
+        start = rng.randrange(max(1, len(words) - 1))
+        keywords.append(rng.choice([' '.join(words[start:start + 2]), str(i), f"서클 {rng.randrange(args.works // 20)}"]))
+
+    report = {'benchmark': 'search_works', 'works': args.works, 'queries': len(keywords), 'mismatches': []}
+    for label, use_index in (('like', False), ('fts', True)):
+        latencies = []
+        for keyword in keywords:
+            library_app.get_db().queries.clear()
+            start = time.perf_counter()
+            library_app.search_works(keyword, use_index=use_index)
+            latencies.append((time.perf_counter() - start) * 1000)
+        report[label] = latency_summary(latencies, 2)
+    # 목록 화면의 첫 화면: 전체 목록과 검색 결과의 첫 페이지 + 전체 개수
+    latencies = []
+    for keyword in [''] + keywords:
+        start = time.perf_counter()
+        pager = library_app.ResultPager(keyword)
+        pager.rows(0, 40)
+        pager.count()
+        latencies.append((time.perf_counter() - start) * 1000)
+        pager.close()
+    report['first_page'] = latency_summary(latencies, 2)
+    # 같은 검색 반복: 한 번씩 검색해 둔 뒤 다시 검색합니다.
+    queries = library_app.get_db().queries
+    queries.clear()
+    for keyword in keywords:
+        library_app.search_works(keyword)
+    queries.hits = queries.misses = 0
+    latencies = []
+    for keyword in keywords:
+        start = time.perf_counter()
+        library_app.search_works(keyword)
+        latencies.append((time.perf_counter() - start) * 1000)
+    report['repeat'] = latency_summary(latencies, 4)
+    report['repeat']['hit_rate'] = round(queries.hit_rate, 3)
+    for keyword in keywords:
+        like_ids = {w['id'] for w in library_app.search_works(keyword, use_index=False)}
+        fts_ids = {w['id'] for w in library_app.search_works(keyword, use_index=True)}
+        if like_ids != fts_ids:
+            report['mismatches'].append(keyword)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+library_app 시작 시간: 창을 띄우기 전에 하던 DB 작업(이전) vs 창을 먼저 띄우고 백그라운드로 읽기(현재)
+
+    python -m bench.startup_bench --works 100000
+
+화면 없이 DB 쪽 경로만 잽니다.
+- blocking: 예전처럼 DISTINCT 제작사 목록, 장르 목록, 전체 검색 첫 페이지를 차례로 읽은 뒤에야 창이 뜨는 경우
+- first_frame: 지금 창을 띄우기 전에 하는 일 (setup_database의 스키마 버전 확인)
+- interactive: 제작사/장르 목록 스레드와 검색 스레드를 함께 돌려 둘 다 끝날 때까지
+first_frame/interactive의 p95가 --frame-budget-ms / --interactive-budget-ms 안인지 within_budget으로 알려 줍니다.
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+import db_schema
+import library_app
+from bench.fixtures import build_library, latency_summary
+from library_db import QUERIES, open_read_connection
+
+
+def first_page(db_path):
+    conn = open_read_connection(db_path, check_same_thread=False)
+    try:
+        pager = library_app.ResultPager(conn=conn)
+        pager.count()
+        pager.page(0)
+    finally:
+        conn.close()
+
+
+def load_filters(db_path):
+    conn = open_read_connection(db_path)
+    try:
+        library_app.load_filter_lists(conn)
+    finally:
+        conn.close()
+
+
+def blocking(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("SELECT DISTINCT maker_name FROM files WHERE maker_name IS NOT NULL ORDER BY maker_name").fetchall()
+    conn.execute(QUERIES['genres']).fetchall()
+    conn.close()
+    first_page(db_path)
+
+
+def interactive(db_path):
+    threads = [threading.Thread(target=load_filters, args=(db_path,)),
+               threading.Thread(target=first_page, args=(db_path,))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def measure(func, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latency_summary(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="library_app 시작 시간 벤치마크")
+    parser.add_argument('--works', type=int, default=100000, help="합성 작품 수")
+    parser.add_argument('--makers', type=int, default=None, help="제작사 수 (기본값: 작품 수 / 20)")
+    parser.add_argument('--repeat', type=int, default=20, help="반복 횟수")
+    parser.add_argument('--frame-budget-ms', type=float, default=50, help="창이 뜨기 전 DB 작업의 허용 시간")
+    parser.add_argument('--interactive-budget-ms', type=float, default=300, help="목록/첫 결과까지의 허용 시간")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    db_path = os.path.join(work_dir, 'bench_startup.db')
+    try:
+        build_library(db_path, works=args.works, makers=args.makers)
+        library_app.DATABASE_FILE = db_path
+        report = {'benchmark': 'library_app_startup', 'works': args.works, 'repeat': args.repeat,
+                  'blocking': measure(lambda: blocking(db_path), args.repeat),
+                  'first_frame': measure(lambda: db_schema.setup_database(db_path), args.repeat),
+                  'interactive': measure(lambda: interactive(db_path), args.repeat)}
+        report['budget_ms'] = {'first_frame': args.frame_budget_ms, 'interactive': args.interactive_budget_ms}
+        report['within_budget'] = (report['first_frame']['p95_ms'] <= args.frame_budget_ms
+                                   and report['interactive']['p95_ms'] <= args.interactive_budget_ms)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+import copy
+import heapq
+from array import array
+from collections import namedtuple
+
+# --- 설정 ---
+# 변경 기록 테이블. 목록에 나오는 작품(scraped_status = 1)이 바뀔 때마다 트리거가 file_id를 남기며,
+# CATALOG_LOG_KEEP개보다 오래된 기록은 트리거가 지웁니다. (그보다 오래 떨어져 있던 카탈로그는 다시 읽습니다)
+CHANGE_TABLE = 'catalog_changes'
+CATALOG_LOG_KEEP = 100000
+# 바뀐 작품이 이보다 많거나, 정렬되지 않은 꼬리가 전체의 이 비율을 넘으면 증분 반영 대신 처음부터 다시 읽습니다.
+CATALOG_RELOAD_CHANGES = 5000
+CATALOG_MAX_TAIL_RATIO = 0.05
+
+# 장르 조건: all은 모두 포함(AND), any는 하나 이상 포함(OR), none은 하나도 포함하지 않음(NOT)
+GenreFilter = namedtuple('GenreFilter', 'all any none')
+
+# 바이트 값 → 켜진 비트 위치 목록 (비트맵을 위치 목록으로 바꿀 때 씁니다)
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+def genre_filter(value):
+    """장르 콤보 값(문자열)이나 GenreFilter를 GenreFilter로 바꿉니다. 조건이 없으면 None."""
+    if not value or value == '[전체]':
+        return None
+    if isinstance(value, str):
+        return GenreFilter((value,), (), ())
+    value = GenreFilter(*(tuple(names) for names in value))
+    return value if any(value) else None
+
+
+def setup_change_log(cursor):
+    """인메모리 카탈로그가 따라잡을 수 있도록 목록에 영향을 주는 변경을 기록하는 테이블과 트리거를 준비합니다."""
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {CHANGE_TABLE} (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_id INTEGER NOT NULL
+        )
+    ''')
+    for name in ('files_ai', 'files_ad', 'files_au', 'genres_ai', 'genres_ad', 'trim'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {CHANGE_TABLE}_{name}")
+    # 스캔으로 추가되는 미수집 파일(scraped_status = 0)은 목록에 나오지 않으므로 기록하지 않습니다.
+    cursor.execute(f"""
+        CREATE TRIGGER {CHANGE_TABLE}_files_ai AFTER INSERT ON files WHEN NEW.scraped_status = 1 BEGIN
+            INSERT INTO {CHANGE_TABLE} (file_id) VALUES (NEW.id);
+        END""")
+    cursor.execute(f"""
+        CREATE TRIGGER {CHANGE_TABLE}_files_ad AFTER DELETE ON files WHEN OLD.scraped_status = 1 BEGIN
+            INSERT INTO {CHANGE_TABLE} (file_id) VALUES (OLD.id);
+        END""")
+    cursor.execute(f"""
+        CREATE TRIGGER {CHANGE_TABLE}_files_au AFTER UPDATE OF product_name, maker_name, scraped_status, is_hidden
+        ON files WHEN OLD.scraped_status = 1 OR NEW.scraped_status = 1 BEGIN
+            INSERT INTO {CHANGE_TABLE} (file_id) VALUES (NEW.id);
+        END""")
+    cursor.execute(f"""
+        CREATE TRIGGER {CHANGE_TABLE}_genres_ai AFTER INSERT ON file_genres BEGIN
+            INSERT INTO {CHANGE_TABLE} (file_id) VALUES (NEW.file_id);
+        END""")
+    cursor.execute(f"""
+        CREATE TRIGGER {CHANGE_TABLE}_genres_ad AFTER DELETE ON file_genres BEGIN
+            INSERT INTO {CHANGE_TABLE} (file_id) VALUES (OLD.file_id);
+        END""")
+    cursor.execute(f"""
+        CREATE TRIGGER {CHANGE_TABLE}_trim AFTER INSERT ON {CHANGE_TABLE} BEGIN
+            DELETE FROM {CHANGE_TABLE} WHERE seq <= NEW.seq - {CATALOG_LOG_KEEP};
+        END""")
+
+
+def _bitmap(positions, size):
+    """위치 목록 → 그 위치의 비트가 켜진 int"""
+    bits = bytearray(size // 8 + 1)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def _positions(mask):
+    """int 비트맵 → 켜진 비트 위치 목록 (오름차순)"""
+    positions = []
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+    for index, value in enumerate(data):
+        if value:
+            base = index << 3
+            positions.extend(base + bit for bit in _BYTE_BITS[value])
+    return positions
+
+
+class Catalog:
+    """
+    목록에 나오는 작품(scraped_status = 1)을 메모리에 올려 둔 카탈로그입니다.
+    작품은 작품명, id 순서의 위치(position)로 저장하고 id는 array, 제작사는 번호 array로 둡니다.
+    장르마다 그 작품들의 위치 비트가 켜진 Python int(비트맵)를 두므로, 여러 장르의 AND/OR/NOT은
+    정수 비트 연산 몇 번으로 끝납니다. 제작사는 작품 몇 개의 위치 목록으로 두고 거를 때 비트맵으로 만듭니다.
+
+    DB가 바뀌면 refresh가 변경 기록(CHANGE_TABLE)에서 바뀐 작품만 다시 읽습니다. 바뀐 작품은 기존 위치를
+    지우고(alive 비트 끔) 끝에 새 위치로 붙이며, 정렬되지 않은 이 꼬리는 결과를 만들 때 따로 정렬해 합칩니다.
+    한 스레드에서만 씁니다.
+    """
+
+    def __init__(self):
+        self.ids = array('q')
+        self.names = []
+        self.maker_numbers = array('l')
+        self.makers = []
+        self.maker_index = {}
+        self.positions = {}    # 작품 id → 위치
+        self.genre_bits = {}   # 장르 이름 → 비트맵
+        self.maker_positions = {}  # 제작사 번호 → 위치 array (제작사는 많고 작품 수는 적으므로 비트맵 대신)
+        self.alive = 0         # 지우지 않은 위치
+        self.hidden = 0        # 숨긴 작품의 위치
+        self.sorted_count = 0  # 이 위치 앞까지는 작품명, id 순서로 정렬되어 있습니다.
+        self.last_seq = 0
+
+    def __len__(self):
+        return len(self.positions)
+
+    def load(self, conn):
+        """files/genres/file_genres에서 카탈로그를 처음부터 읽습니다."""
+        self.__init__()
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {CHANGE_TABLE}")
+        self.last_seq = cursor.fetchone()[0]
+        # 숨김 여부별로 idx_files_listing 순서대로 읽어 합치면 임시 정렬 없이 작품명, id 순서가 됩니다.
+        listing = ("SELECT product_name, id, maker_name FROM files WHERE scraped_status = 1 AND is_hidden = ?"
+                   " ORDER BY product_name, id")
+        visible = cursor.execute(listing, (0,)).fetchall()
+        hidden_rows = cursor.execute(listing, (1,)).fetchall()
+        hidden_ids = {row[1] for row in hidden_rows}
+        rows = list(heapq.merge(visible, hidden_rows, key=lambda row: (row[0] or '', row[1])))
+
+        size = len(rows)
+        self.ids = array('q', [row[1] for row in rows])
+        self.names = [row[0] for row in rows]
+        # setdefault의 기본값은 넣기 전의 길이이므로 처음 나온 순서대로 번호가 붙습니다.
+        numbers = [self.maker_index.setdefault(row[2], len(self.maker_index)) for row in rows]
+        self.maker_numbers = array('l', numbers)
+        self.makers = list(self.maker_index)
+        self.positions = dict(zip(self.ids, range(size)))
+        for position, number in enumerate(numbers):
+            self.maker_positions.setdefault(number, array('l')).append(position)
+        self.sorted_count = size
+        self.alive = (1 << size) - 1
+        self.hidden = _bitmap([self.positions[file_id] for file_id in hidden_ids], size)
+
+        cursor.execute("SELECT id, name FROM genres")
+        genre_names = dict(cursor.fetchall())
+        positions = self.positions
+        # idx_file_genres_genre만 읽고, 행마다 튜플을 만들지 않도록 장르별로 id를 이어 붙인 문자열로 받습니다.
+        cursor.execute("SELECT genre_id, group_concat(file_id) FROM file_genres GROUP BY genre_id")
+        for genre_id, file_ids in cursor.fetchall():
+            genre_positions = [positions[file_id] for file_id in map(int, file_ids.split(',')) if file_id in positions]
+            if genre_positions and genre_id in genre_names:
+                self.genre_bits[genre_names[genre_id]] = _bitmap(genre_positions, size)
+
+    def _append(self, file_id, name, maker):
+        """(refresh) 작품을 끝에 새 위치로 붙입니다."""
+        number = self.maker_index.get(maker)
+        if number is None:
+            number = self.maker_index[maker] = len(self.makers)
+            self.makers.append(maker)
+        position = len(self.ids)
+        self.ids.append(file_id)
+        self.names.append(name)
+        self.maker_numbers.append(number)
+        self.positions[file_id] = position
+        return position
+
+    def refresh(self, conn):
+        """
+        마지막으로 읽은 뒤 바뀐 작품만 다시 읽습니다. 변경이 많거나 기록이 잘렸으면 처음부터 다시 읽습니다.
+        바뀐 것이 있었으면 True를 돌려줍니다.
+        """
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT MIN(seq), MAX(seq) FROM {CHANGE_TABLE}")
+        first, last = cursor.fetchone()
+        if last is None or last <= self.last_seq:
+            return False
+        if first > self.last_seq + 1:
+            self.load(conn)
+            return True
+        cursor.execute(f"SELECT DISTINCT file_id FROM {CHANGE_TABLE} WHERE seq > ?", (self.last_seq,))
+        changed = [row[0] for row in cursor.fetchall()]
+        tail = len(self.ids) - self.sorted_count + len(changed)
+        if len(changed) > CATALOG_RELOAD_CHANGES or tail > max(100, len(self.ids) * CATALOG_MAX_TAIL_RATIO):
+            self.load(conn)
+            return True
+
+        # 바뀐 작품은 기존 위치를 지우고, 아직 목록에 있으면 끝에 새로 붙입니다.
+        for file_id in changed:
+            position = self.positions.pop(file_id, None)
+            if position is not None:
+                self.alive &= ~(1 << position)
+        for i in range(0, len(changed), 500):
+            chunk = changed[i:i + 500]
+            marks = ','.join('?' * len(chunk))
+            cursor.execute(f"SELECT id, product_name, maker_name, is_hidden FROM files"
+                           f" WHERE id IN ({marks}) AND scraped_status = 1", chunk)
+            for file_id, name, maker, is_hidden in cursor.fetchall():
+                position = self._append(file_id, name, maker)
+                bit = 1 << position
+                self.alive |= bit
+                if is_hidden:
+                    self.hidden |= bit
+                self.maker_positions.setdefault(self.maker_numbers[position], array('l')).append(position)
+            cursor.execute(f"SELECT fg.file_id, g.name FROM file_genres AS fg JOIN genres AS g ON g.id = fg.genre_id"
+                           f" WHERE fg.file_id IN ({marks})", chunk)
+            for file_id, genre in cursor.fetchall():
+                position = self.positions.get(file_id)
+                if position is not None:
+                    self.genre_bits[genre] = self.genre_bits.get(genre, 0) | 1 << position
+        self.last_seq = last
+        return True
+
+    def select(self, maker=None, genres=None):
+        """조건에 맞는 숨기지 않은 작품의 비트맵. maker는 제작사 이름, genres는 GenreFilter입니다."""
+        mask = self.alive & ~self.hidden
+        if maker and maker != '[전체]':
+            maker_bits = 0
+            for position in self.maker_positions.get(self.maker_index.get(maker), ()):
+                maker_bits |= 1 << position
+            mask &= maker_bits
+        if genres:
+            for genre in genres.all:
+                mask &= self.genre_bits.get(genre, 0)
+            if genres.any:
+                any_bits = 0
+                for genre in genres.any:
+                    any_bits |= self.genre_bits.get(genre, 0)
+                mask &= any_bits
+            for genre in genres.none:
+                mask &= ~self.genre_bits.get(genre, 0)
+        return mask
+
+    def ordered_positions(self, mask):
+        """비트맵의 위치를 작품명, id 순서로 돌려줍니다. (꼬리 부분만 정렬해서 합칩니다)"""
+        positions = _positions(mask)
+        split = len(positions)
+        while split and positions[split - 1] >= self.sorted_count:
+            split -= 1
+        if split == len(positions):
+            return positions
+        names = self.names
+        ids = self.ids
+        tail = sorted(positions[split:], key=lambda p: (names[p] or '', ids[p]))
+        return list(heapq.merge(positions[:split], tail, key=lambda p: (names[p] or '', ids[p])))
+
+    def row(self, position):
+        """(id, 작품명, 제작사)"""
+        return self.ids[position], self.names[position], self.makers[self.maker_numbers[position]]
+
+
+class CatalogResult:
+    """
+    카탈로그 검색 결과. library_app이 쓰는 ResultPager와 같은 방법(count, rows, discard, close)으로 읽습니다.
+    결과는 위치 array로만 들고 있다가 화면에 보이는 행만 (id, 작품명, 제작사)로 만듭니다.
+    카탈로그는 위치를 덧붙이기만 하고 load는 새 목록을 만들므로, 결과가 잡고 있는 목록은 바뀌지 않습니다.
+    """
+
+    def __init__(self, catalog, maker=None, genres=None):
+        self.conn = None
+        self.ids = catalog.ids
+        self.names = catalog.names
+        self.maker_numbers = catalog.maker_numbers
+        self.makers = catalog.makers
+        self.order = array('l', catalog.ordered_positions(catalog.select(maker, genres)))
+
+    def count(self):
+        return len(self.order)
+
+    def rows(self, start, count):
+        """start번째 행부터 최대 count개의 (id, 작품명, 제작사) 목록"""
+        return [(self.ids[p], self.names[p], self.makers[self.maker_numbers[p]])
+                for p in self.order[start:start + count]]
+
+    def discard(self, file_ids):
+        """삭제하거나 숨긴 행을 결과에서 뺍니다."""
+        file_ids = set(file_ids)
+        ids = self.ids
+        self.order = array('l', (p for p in self.order if ids[p] not in file_ids))
+
+    def copy(self):
+        """같은 결과를 따로 읽는 복사본. (discard/close는 order를 새로 만들므로 array를 함께 써도 됩니다)"""
+        return copy.copy(self)
+
+    def close(self):
+        self.order = array('l')
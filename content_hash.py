@@ -0,0 +1,183 @@
+import os
+import sys
+import time
+import hashlib
+from multiprocessing import Pool
+
+import db_schema
+
+# --- 설정 ---
+DATABASE_FILE = 'file_index.db'
+# 부분 해시는 파일 앞/뒤 이 크기만큼만 읽습니다.
+PARTIAL_HASH_BYTES = 64 * 1024
+# 전체 해시를 계산할 때 한 번에 읽는 크기. 파일 전체를 메모리에 올리지 않습니다.
+FULL_HASH_BUFFER = 1024 * 1024
+# 해시 결과를 이 개수씩 모아서 기록합니다.
+HASH_BATCH_SIZE = 500
+
+
+def partial_hash(path, size):
+    """파일 크기와 앞/뒤 PARTIAL_HASH_BYTES로 만든 빠른 비교용 해시"""
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(PARTIAL_HASH_BYTES))
+        if size > PARTIAL_HASH_BYTES * 2:
+            f.seek(size - PARTIAL_HASH_BYTES)
+            digest.update(f.read(PARTIAL_HASH_BYTES))
+        elif size > PARTIAL_HASH_BYTES:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def full_hash(path):
+    """파일 전체의 blake2b 해시. 고정 크기 버퍼에 readinto로 읽으므로 수 GB 파일도 메모리를 쓰지 않습니다."""
+    digest = hashlib.blake2b(digest_size=32)
+    buffer = bytearray(FULL_HASH_BUFFER)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+def _hash_job(job):
+    """작업 프로세스에서 실행: (id, 경로, 크기, 'partial' 또는 'full') → (id, 해시 또는 None)"""
+    file_id, path, size, mode = job
+    try:
+        if mode == 'partial':
+            return file_id, partial_hash(path, size)
+        return file_id, full_hash(path)
+    except OSError:
+        return file_id, None
+
+
+def _run_jobs(jobs, processes):
+    """해시 작업을 프로세스 풀에서 끝나는 순서대로 돌려줍니다. processes=1이면 현재 프로세스에서 실행합니다."""
+    if not jobs:
+        return
+    if processes == 1 or len(jobs) == 1:
+        yield from map(_hash_job, jobs)
+        return
+    with Pool(processes) as pool:
+        yield from pool.imap_unordered(_hash_job, jobs, chunksize=4)
+
+
+def find_content_duplicates(conn, processes=None, batch_size=HASH_BATCH_SIZE):
+    """
+    files 테이블의 파일 중 내용이 같은 것을 찾아 content_hash를 기록합니다.
+
+    1. 크기가 같은 파일이 2개 이상인 크기만 후보로 남깁니다. (크기가 유일하면 중복일 수 없음)
+    2. 후보는 앞/뒤 일부만 읽은 부분 해시로 다시 나눕니다.
+    3. 부분 해시까지 같은 파일만 전체 해시를 계산합니다.
+    저장된 해시는 계산할 때의 크기/mtime(hash_size, hash_mtime)이 지금과 같으면 다시 계산하지 않습니다.
+    내용이 같은 파일은 dup_groups의 'content' 묶음으로 모입니다. 통계 dict를 돌려줍니다.
+    """
+    cursor = conn.cursor()
+    stats = {'files': 0, 'size_candidates': 0, 'partial_hashed': 0, 'full_hashed': 0,
+             'reused': 0, 'missing': 0, 'bytes_hashed': 0, 'groups': 0}
+
+    # 예전 버전에서 크기 없이 기록된 행은 지금 크기와 mtime을 채웁니다.
+    cursor.execute("SELECT id, file_path FROM files WHERE file_size IS NULL")
+    filled = []
+    for file_id, path in cursor.fetchall():
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        filled.append((st.st_size, st.st_mtime_ns, file_id))
+    if filled:
+        cursor.executemany("UPDATE files SET file_size = ?, file_mtime = ? WHERE id = ?", filled)
+        conn.commit()
+
+    cursor.execute("""
+        SELECT id, file_path, file_size, file_mtime, partial_hash, content_hash, hash_size, hash_mtime
+        FROM files WHERE file_size > 0 AND file_size IN
+            (SELECT file_size FROM files WHERE file_size > 0 GROUP BY file_size HAVING COUNT(*) > 1)
+    """)
+    rows = {}
+    for file_id, path, size, mtime, partial, content, hash_size, hash_mtime in cursor.fetchall():
+        fresh = hash_size == size and hash_mtime == mtime
+        rows[file_id] = {'path': path, 'size': size, 'mtime': mtime,
+                         'partial': partial if fresh else None, 'content': content if fresh else None}
+    cursor.execute("SELECT COUNT(*) FROM files")
+    stats['files'] = cursor.fetchone()[0]
+    stats['size_candidates'] = len(rows)
+
+    def save(updates, sql):
+        for i in range(0, len(updates), batch_size):
+            cursor.executemany(sql, updates[i:i + batch_size])
+            conn.commit()
+
+    # 2단계: 부분 해시
+    jobs = [(file_id, row['path'], row['size'], 'partial') for file_id, row in rows.items() if row['partial'] is None]
+    updates = []
+    for file_id, digest in _run_jobs(jobs, processes):
+        row = rows[file_id]
+        if digest is None:
+            stats['missing'] += 1
+            del rows[file_id]
+            continue
+        row['partial'] = digest
+        row['content'] = None
+        stats['partial_hashed'] += 1
+        stats['bytes_hashed'] += min(row['size'], PARTIAL_HASH_BYTES * 2)
+        updates.append((digest, row['size'], row['mtime'], file_id))
+    # 부분 해시를 새로 계산한 파일의 예전 전체 해시는 지웁니다.
+    save(updates, "UPDATE files SET partial_hash = ?, content_hash = NULL, hash_size = ?, hash_mtime = ? WHERE id = ?")
+
+    # 3단계: 크기와 부분 해시가 모두 같은 파일만 전체 해시
+    buckets = {}
+    for file_id, row in rows.items():
+        buckets.setdefault((row['size'], row['partial']), []).append(file_id)
+    jobs = []
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for file_id in members:
+            row = rows[file_id]
+            if row['content'] is None:
+                jobs.append((file_id, row['path'], row['size'], 'full'))
+            else:
+                stats['reused'] += 1
+    updates = []
+    for file_id, digest in _run_jobs(jobs, processes):
+        if digest is None:
+            stats['missing'] += 1
+            continue
+        stats['full_hashed'] += 1
+        stats['bytes_hashed'] += rows[file_id]['size']
+        updates.append((digest, file_id))
+    save(updates, "UPDATE files SET content_hash = ? WHERE id = ?")
+
+    cursor.execute("SELECT COUNT(*) FROM dup_groups WHERE kind = 'content' AND file_count > 1")
+    stats['groups'] = cursor.fetchone()[0]
+    return stats
+
+
+def main():
+    # python content_hash.py [프로세스 수] : 내용이 같은 파일을 찾아 기록합니다.
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    db_schema.setup_database(DATABASE_FILE)
+    conn = db_schema.connect(DATABASE_FILE)
+    start_time = time.perf_counter()
+    stats = find_content_duplicates(conn, processes)
+    conn.close()
+    elapsed = time.perf_counter() - start_time
+
+    print("\n" + "-" * 40)
+    print("내용 해시 비교 완료!")
+    print(f"- 전체 파일 수       : {stats['files']}개")
+    print(f"- 크기가 겹치는 파일 : {stats['size_candidates']}개")
+    print(f"- 부분/전체 해시 계산: {stats['partial_hashed']}개 / {stats['full_hashed']}개 (재사용 {stats['reused']}개)")
+    print(f"- 읽은 양            : {stats['bytes_hashed'] / (1024 * 1024):.1f}MB ({elapsed:.1f}초)")
+    print(f"- 내용이 같은 묶음   : {stats['groups']}개")
+    if stats['missing']:
+        print(f"- 읽지 못한 파일     : {stats['missing']}개")
+    print("-" * 40)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+import io
+import os
+import mmap
+import time
+import struct
+import threading
+
+import crawl_jobs
+
+# Pillow는 선택 사항입니다. 있으면 표지를 썸네일 크기로 줄여 저장하고, 없으면 받은 이미지를 그대로 저장합니다.
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# --- 설정 ---
+# 표지 썸네일을 이어 붙여 저장하는 팩 파일
+COVER_PACK_FILE = 'covers.pack'
+# 썸네일의 긴 변(px)과 JPEG 품질 (Pillow가 있을 때만 적용)
+THUMBNAIL_SIZE = 240
+THUMBNAIL_QUALITY = 85
+# 이 크기를 넘는 응답은 표지로 보지 않습니다.
+COVER_MAX_BYTES = 8 * 1024 * 1024
+
+# covers.status 값
+COVER_PENDING = 0
+COVER_STORED = 1
+COVER_FAILED = -1
+
+
+def setup_covers(cursor):
+    """
+    표지 테이블을 준비합니다. 작품 번호(extracted_key)마다 한 행이며, source_url은 작품 페이지에서 찾은 표지 주소
+    (상대 주소일 수 있음)입니다. 받아서 팩 파일에 저장하면 status=1이 되고 offset/length가 팩 안의 위치입니다.
+    """
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS covers (
+            extracted_key TEXT PRIMARY KEY,
+            source_url TEXT NOT NULL,
+            status INTEGER NOT NULL DEFAULT {COVER_PENDING},
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            offset INTEGER,
+            length INTEGER,
+            format TEXT,
+            width INTEGER,
+            height INTEGER,
+            fetched_at REAL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_covers_status ON covers (status, attempts)")
+
+
+def record_cover_urls(cursor, covers):
+    """
+    작품 페이지에서 찾은 표지 주소 [(extracted_key, url)]을 기록합니다. (커밋은 호출한 쪽에서 합니다)
+    처음 보는 작품은 받을 표지로 넣고, 주소가 바뀐 작품은 다시 받도록 되돌립니다.
+    """
+    cursor.executemany("INSERT OR IGNORE INTO covers (extracted_key, source_url) VALUES (?, ?)", covers)
+    cursor.executemany(f'''
+        UPDATE covers SET source_url = ?2, status = {COVER_PENDING}, attempts = 0, last_error = NULL
+        WHERE extracted_key = ?1 AND source_url != ?2''', covers)
+
+
+def pending_covers(cursor, limit=None):
+    """받을 표지 [(extracted_key, source_url)]을 실패 횟수가 적은 것부터 돌려줍니다."""
+    cursor.execute(f"SELECT extracted_key, source_url FROM covers WHERE status = {COVER_PENDING} "
+                   "ORDER BY attempts LIMIT ?", (-1 if limit is None else limit,))
+    return cursor.fetchall()
+
+
+def image_format(data):
+    """이미지 앞부분으로 형식('png', 'gif', 'jpeg', 'webp')을 알아냅니다. 이미지가 아니면 None."""
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if data.startswith(b'\xff\xd8'):
+        return 'jpeg'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def image_size(data, fmt):
+    """PNG/GIF 헤더에서 (너비, 높이)를 읽습니다. 다른 형식이거나 읽을 수 없으면 (None, None)."""
+    try:
+        if fmt == 'png':
+            return struct.unpack('>II', data[16:24])
+        if fmt == 'gif':
+            return struct.unpack('<HH', data[6:10])
+    except struct.error:
+        pass
+    return None, None
+
+
+def make_thumbnail(data, size=THUMBNAIL_SIZE):
+    """
+    받은 이미지로 (저장할 bytes, 형식, 너비, 높이)를 만듭니다. 이미지가 아니면 None.
+    Pillow가 있으면 긴 변이 size가 되도록 줄여 JPEG로 저장합니다. 없으면 원본을 그대로 두며,
+    이때 PNG/GIF는 화면에 띄울 때 Tk가 줄이고 JPEG/WebP는 Pillow를 설치해야 보입니다.
+    """
+    fmt = image_format(data)
+    if fmt is None:
+        return None
+    if Image is None:
+        return (data, fmt) + tuple(image_size(data, fmt))
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail((size, size))
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            out = io.BytesIO()
+            image.save(out, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+            return out.getvalue(), 'jpeg', image.width, image.height
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+class CoverPack:
+    """
+    표지 썸네일 수천 개를 낱개 파일 대신 하나의 파일에 이어 붙여 저장하는 팩입니다.
+    각 썸네일의 위치(offset, length)는 DB의 covers 테이블에 기록하고, 팩 파일에는 이미지 bytes만 있습니다.
+    표지가 바뀌면 새로 붙이고 예전 내용은 그대로 남습니다.
+
+    append/sync는 기록 담당 스레드 하나에서만 호출하고, read는 어느 스레드에서든 호출해도 됩니다.
+    읽기는 파일을 메모리 매핑해서 하며, 매핑한 뒤에 팩이 커졌으면 다시 매핑합니다.
+    """
+
+    def __init__(self, path=COVER_PACK_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self._out = None
+        self._file = None
+        self._map = None
+
+    def append(self, data):
+        """data를 팩 끝에 붙이고 그 offset을 돌려줍니다. DB에 위치를 기록하기 전에 sync()를 호출하세요."""
+        if self._out is None:
+            self._out = open(self.path, 'ab')
+            self._out.seek(0, os.SEEK_END)
+        offset = self._out.tell()
+        self._out.write(data)
+        return offset
+
+    def sync(self):
+        """붙인 내용을 디스크에 내립니다. DB에 기록된 위치는 항상 팩 파일 안을 가리키게 됩니다."""
+        if self._out is not None:
+            self._out.flush()
+            os.fsync(self._out.fileno())
+
+    def read(self, offset, length):
+        """팩에서 썸네일 하나를 읽어 bytes로 돌려줍니다. 팩이 없거나 범위를 벗어나면 None."""
+        with self.lock:
+            if self._map is None or offset + length > len(self._map):
+                self._remap()
+                if self._map is None or offset + length > len(self._map):
+                    return None
+            return self._map[offset:offset + length]
+
+    def _remap(self):
+        self._unmap()
+        try:
+            self._file = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        # 빈 파일은 매핑할 수 없습니다.
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _unmap(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+        with self.lock:
+            self._unmap()
+
+
+def store_covers(cursor, pack, results, now=None):
+    """
+    받은 표지 결과를 팩에 붙이고 covers에 위치를 기록합니다. (커밋은 호출한 쪽에서 합니다)
+    result는 key, info(make_thumbnail 결과 또는 None), status, error, retry_after를 담은 dict이며,
+    실패 종류는 crawl_jobs.classify로 나눕니다. 일시적인 실패는 RETRY_MAX_ATTEMPTS번까지 다음 실행 때 다시 받고,
+    나머지는 실패로 표시합니다. 실패 종류별 개수 dict를 돌려줍니다.
+    """
+    now = time.time() if now is None else now
+    stored = []
+    failed = []
+    failures = {}
+    for result in results:
+        failure = crawl_jobs.classify(result)
+        if failure is None:
+            data, fmt, width, height = result['info']
+            stored.append((pack.append(data), len(data), fmt, width, height, now, result['key']))
+            continue
+        failures[failure] = failures.get(failure, 0) + 1
+        failed.append((COVER_PENDING if failure in crawl_jobs.TRANSIENT_FAILURES else COVER_FAILED,
+                       result.get('error') or failure, result['key']))
+    pack.sync()
+    cursor.executemany(f'''
+        UPDATE covers SET status = {COVER_STORED}, attempts = 0, last_error = NULL,
+            offset = ?, length = ?, format = ?, width = ?, height = ?, fetched_at = ?
+        WHERE extracted_key = ?''', stored)
+    cursor.executemany(f'''
+        UPDATE covers SET attempts = attempts + 1, last_error = ?2,
+            status = CASE WHEN ?1 = {COVER_PENDING} AND attempts + 1 < {crawl_jobs.RETRY_MAX_ATTEMPTS}
+                          THEN {COVER_PENDING} ELSE {COVER_FAILED} END
+        WHERE extracted_key = ?3''', failed)
+    return failures
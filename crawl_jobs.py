@@ -0,0 +1,192 @@
+import time
+import random
+import email.utils
+
+# --- 설정 ---
+# 새 파일은 재시도보다 먼저 처리합니다. (priority가 클수록 먼저)
+PRIORITY_NEW = 10
+PRIORITY_RETRY = 0
+# 일시적인 실패(시간 초과, 연결 끊김, 429, 5xx)는 RETRY_BASE_DELAY초부터 두 배씩 늘려 기다린 뒤 다시 시도하고,
+# RETRY_MAX_ATTEMPTS번 실패하면 포기합니다. (--retry-failed로 다시 대기열에 넣을 수 있습니다)
+RETRY_BASE_DELAY = 60
+RETRY_MAX_DELAY = 24 * 60 * 60
+RETRY_MAX_ATTEMPTS = 8
+
+# 실패 종류. 일시적인 것만 자동으로 다시 시도합니다.
+TRANSIENT_FAILURES = {'network', 'rate_limited', 'server_error'}
+PERMANENT_FAILURES = {'not_found', 'http_error', 'parse'}
+# 캐시에 저장된 페이지(예전 실행에서 받은 잘린 페이지나 오류 페이지)를 파싱하지 못한 경우.
+# 캐시 항목은 기록 단계에서 지우므로(ResultWriter) 백오프 없이 바로 네트워크로 다시 받습니다.
+CACHE_FAILURES = {'cache_parse'}
+
+
+def setup_crawl_jobs(cursor):
+    """
+    크롤러 작업 테이블을 준비합니다. 크롤러가 다룬 파일마다 한 행이며,
+    next_attempt가 있는 행이 대기열입니다. (NULL이면 완료했거나 더 이상 자동으로 시도하지 않는 행)
+    etag/last_modified는 마지막으로 받은 페이지의 검증값으로, 갱신(--refresh) 때 조건부 요청에 씁니다.
+    새로 추가된 미수집 파일은 트리거로 대기열에 들어가고, 파일이 삭제되면 작업도 지워집니다.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS crawl_jobs (
+            file_id INTEGER PRIMARY KEY,
+            priority INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            failure_class TEXT,
+            last_error TEXT,
+            next_attempt REAL,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crawl_jobs_due ON crawl_jobs (next_attempt)")
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS crawl_jobs_files_ai AFTER INSERT ON files WHEN NEW.scraped_status = 0 BEGIN
+            INSERT OR IGNORE INTO crawl_jobs (file_id, priority, next_attempt) VALUES (NEW.id, {PRIORITY_NEW}, 0);
+        END''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS crawl_jobs_files_ad AFTER DELETE ON files BEGIN
+            DELETE FROM crawl_jobs WHERE file_id = OLD.id;
+        END''')
+    # 아직 수집하지 않은 파일은 새 작업으로, 예전에 실패한(-1) 파일은 한 번 더 시도하도록 넣습니다.
+    cursor.execute(f'''
+        INSERT OR IGNORE INTO crawl_jobs (file_id, priority, attempts, failure_class, next_attempt)
+        SELECT id, CASE WHEN scraped_status = 0 THEN {PRIORITY_NEW} ELSE {PRIORITY_RETRY} END,
+               scraped_status = -1, CASE WHEN scraped_status = -1 THEN 'unknown' END, 0
+        FROM files WHERE scraped_status IN (0, -1)''')
+
+
+def classify(result):
+    """fetch_product 결과의 실패 종류를 돌려줍니다. 성공이거나 304이면 None."""
+    if result['info'] or result.get('not_modified'):
+        return None
+    if result.get('from_cache'):
+        return 'cache_parse'
+    status = result.get('status')
+    if status is None:
+        return 'network'
+    if status == 200:
+        return 'parse'
+    if status == 429:
+        return 'rate_limited'
+    if status >= 500:
+        return 'server_error'
+    if status in (404, 410):
+        return 'not_found'
+    return 'http_error'
+
+
+def retry_delay(attempts, retry_after=None):
+    """attempts번째 실패 후 기다릴 시간(초). 지수 백오프에 지터를 더하고, 서버의 Retry-After보다 짧지 않게 합니다."""
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    delay *= random.uniform(0.75, 1.25)
+    if retry_after:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 초로 바꿉니다. 알 수 없으면 None."""
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return int(value)
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def due_jobs(cursor, limit, now=None):
+    """지금 처리할 작업 [(file_id, extracted_key)]을 우선순위, 예정 시각 순으로 돌려줍니다."""
+    cursor.execute('''
+        SELECT j.file_id, f.extracted_key FROM crawl_jobs AS j JOIN files AS f ON f.id = j.file_id
+        WHERE j.next_attempt <= ? ORDER BY j.priority DESC, j.next_attempt LIMIT ?''',
+                   (time.time() if now is None else now, limit))
+    return cursor.fetchall()
+
+
+def refresh_jobs(cursor, limit):
+    """갱신할 수집 완료 파일 [(file_id, extracted_key, etag, last_modified)]을 오래전에 받은 것부터 돌려줍니다."""
+    cursor.execute('''
+        SELECT f.id, f.extracted_key, j.etag, j.last_modified
+        FROM files AS f LEFT JOIN crawl_jobs AS j ON j.file_id = f.id
+        WHERE f.scraped_status = 1
+        ORDER BY COALESCE(j.fetched_at, 0)
+        LIMIT ?''', (limit,))
+    return cursor.fetchall()
+
+
+def record_results(cursor, results, now=None):
+    """
+    한 배치의 결과를 작업 테이블에 반영합니다. (커밋은 호출한 쪽에서 합니다)
+    성공/304는 대기열에서 빼고 검증값을 기록합니다. 실패는 종류에 따라 백오프 후 다시 시도하도록 예약하거나
+    (일시적 실패) 대기열에서 뺍니다(영구적 실패, 또는 RETRY_MAX_ATTEMPTS 초과). 캐시된 페이지의 파싱 실패는
+    바로 다시 받도록 예약합니다.
+    갱신(refresh) 중의 실패는 기존 수집 결과가 있으므로 기록하지 않습니다. 실패 종류별 개수 dict를 돌려줍니다.
+    """
+    now = time.time() if now is None else now
+    done = []
+    failures = {}
+    for result in results:
+        failure = classify(result)
+        if failure is None:
+            fetched = result.get('status') is not None and not result.get('from_cache')
+            done.append((result['id'], result.get('etag'), result.get('last_modified'), now if fetched else None,
+                         bool(result.get('not_modified'))))
+            continue
+        failures[failure] = failures.get(failure, 0) + 1
+        if result.get('refresh'):
+            continue
+        cursor.execute("SELECT attempts FROM crawl_jobs WHERE file_id = ?", (result['id'],))
+        row = cursor.fetchone()
+        attempts = (row[0] if row else 0) + 1
+        next_attempt = None
+        if failure in CACHE_FAILURES:
+            # 요청을 보낸 것이 아니므로 시도 횟수에 넣지 않습니다.
+            attempts -= 1
+            next_attempt = now
+        elif failure in TRANSIENT_FAILURES and attempts < RETRY_MAX_ATTEMPTS:
+            next_attempt = now + retry_delay(attempts, result.get('retry_after'))
+        cursor.execute('''
+            INSERT INTO crawl_jobs (file_id, priority, attempts, failure_class, last_error, next_attempt)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(file_id) DO UPDATE SET
+                priority = excluded.priority, attempts = excluded.attempts, failure_class = excluded.failure_class,
+                last_error = excluded.last_error, next_attempt = excluded.next_attempt''',
+                       (result['id'], PRIORITY_RETRY, attempts, failure, result.get('error'), next_attempt))
+    # 캐시에서 읽어 요청하지 않은 경우(fetched_at NULL)에는 이전 검증값을 그대로 둡니다.
+    # 304 응답은 검증값 헤더를 생략할 수 있으므로, 빠진 값은 이전 값을 남겨 다음 갱신도 조건부 요청이 되게 합니다.
+    cursor.executemany('''
+        INSERT INTO crawl_jobs (file_id, etag, last_modified, fetched_at) VALUES (?1, ?2, ?3, ?4)
+        ON CONFLICT(file_id) DO UPDATE SET
+            attempts = 0, failure_class = NULL, last_error = NULL, next_attempt = NULL,
+            etag = CASE WHEN excluded.fetched_at IS NULL THEN etag
+                        WHEN ?5 THEN COALESCE(excluded.etag, etag) ELSE excluded.etag END,
+            last_modified = CASE WHEN excluded.fetched_at IS NULL THEN last_modified
+                                 WHEN ?5 THEN COALESCE(excluded.last_modified, last_modified)
+                                 ELSE excluded.last_modified END,
+            fetched_at = COALESCE(excluded.fetched_at, fetched_at)''', done)
+    return failures
+
+
+def queue_summary(cursor, now=None):
+    """대기열 상태 dict: 지금 처리할 작업, 백오프 중인 작업(가장 빠른 예정 시각), 포기한 실패의 종류별 개수"""
+    now = time.time() if now is None else now
+    cursor.execute("SELECT COUNT(*) FROM crawl_jobs WHERE next_attempt <= ?", (now,))
+    due = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*), MIN(next_attempt) FROM crawl_jobs WHERE next_attempt > ?", (now,))
+    waiting, next_at = cursor.fetchone()
+    cursor.execute('''
+        SELECT failure_class, COUNT(*) FROM crawl_jobs
+        WHERE next_attempt IS NULL AND failure_class IS NOT NULL GROUP BY failure_class''')
+    return {'due': due, 'waiting': waiting, 'next_attempt': next_at, 'failed': dict(cursor.fetchall())}
+
+
+def requeue_failed(cursor):
+    """포기했거나 영구 실패로 분류된 작업을 모두 다시 대기열에 넣습니다. 넣은 개수를 돌려줍니다."""
+    cursor.execute('''
+        UPDATE crawl_jobs SET attempts = 0, next_attempt = 0, priority = ?
+        WHERE next_attempt IS NULL AND failure_class IS NOT NULL''', (PRIORITY_RETRY,))
+    return cursor.rowcount
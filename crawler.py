@@ -2,11 +2,26 @@ import requests
 import os
 import sqlite3
 import time
-from bs4 import BeautifulSoup
+import threading
+from multiprocessing import Pool
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+import db_schema
+from page_cache import PageCache
+from product_parser import parse_product_page
+from duplicate_index import normalize_title
+from key_extractor import product_id
+import crawl_jobs
+import cover_pack
+from cover_pack import CoverPack
+import metrics as metrics_module
+from metrics import metrics
 
 # --- 설정 ---
 DATABASE_FILE = 'file_index.db'
-BASE_URL = "https://www.dlsite.com/maniax/work/=/product_id/RJ{}.html"
+# {}에는 작품 번호(RJ123456, VJ012345 …)가 들어갑니다.
+BASE_URL = "https://www.dlsite.com/maniax/work/=/product_id/{}.html"
 
 # ===== 여기가 수정된 부분입니다 =====
 HEADERS = {
@@ -20,49 +35,259 @@ HEADERS = {
 }
 # ===== 수정 끝 =====
 
+# 동시에 보낼 최대 요청 수, 요청 제한 시간(초), 몇 개의 결과를 모아서 한 번에 커밋할지
+MAX_CONCURRENT_REQUESTS = 4
+REQUEST_TIMEOUT = 20
+WRITE_BATCH_SIZE = 50
+# 표지 이미지를 받을 때의 Accept 헤더
+COVER_ACCEPT = 'image/jpeg,image/png,image/gif,image/*;q=0.8'
+
+
+class TokenBucket:
+    """
+    초당 rate개의 토큰이 채워지는 토큰 버킷입니다. acquire()는 토큰이 생길 때까지 기다립니다.
+    capacity는 한꺼번에 보낼 수 있는 최대 요청 수(버스트)이며, rate가 0 이하이면 제한하지 않습니다.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def create_session(pool_size=MAX_CONCURRENT_REQUESTS):
+    """keep-alive 연결을 재사용하는 requests.Session을 만듭니다."""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
 def setup_database_for_scraping():
-    """스크래핑을 위한 데이터베이스 테이블들을 준비합니다."""
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("ALTER TABLE files ADD COLUMN product_name TEXT")
-        cursor.execute("ALTER TABLE files ADD COLUMN maker_name TEXT")
-        cursor.execute("ALTER TABLE files ADD COLUMN scraped_status INTEGER DEFAULT 0 NOT NULL")
-        print("`files` 테이블에 컬럼들을 추가했습니다.")
-    except sqlite3.OperationalError as e:
-        if "duplicate column name" in str(e):
-            print("`files` 테이블의 컬럼들이 이미 준비되었습니다.")
-        else: raise e
-    cursor.execute('CREATE TABLE IF NOT EXISTS genres (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE)')
-    cursor.execute('CREATE TABLE IF NOT EXISTS file_genres (file_id INTEGER, genre_id INTEGER, PRIMARY KEY (file_id, genre_id), FOREIGN KEY (file_id) REFERENCES files (id), FOREIGN KEY (genre_id) REFERENCES genres (id))')
-    print("`genres`, `file_genres` 테이블이 준비되었습니다.")
-    conn.commit()
-    conn.close()
+    """스크래핑을 위한 데이터베이스 테이블들을 준비합니다. (db_schema의 마이그레이션을 적용)"""
+    db_schema.setup_database(DATABASE_FILE)
+    print("스크래핑용 테이블이 준비되었습니다.")
 
 def extract_product_info(html_content):
-    """HTML 내용에서 작품명, 제작사명, 장르를 추출합니다."""
+    """
+    HTML 내용에서 작품명, 제작사명, 장르, 표지 주소를 추출합니다.
+    전체 트리를 만들지 않는 스트리밍 파서(product_parser)를 쓰며, 결과는 BeautifulSoup으로 찾던 것과 같습니다.
+    """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        work_name_h1 = soup.find('h1', id='work_name')
-        product_name = work_name_h1.get_text(strip=True) if work_name_h1 else None
-        maker_name_span = soup.find('span', class_='maker_name')
-        maker_name = maker_name_span.get_text(strip=True) if maker_name_span else None
-        genres = []
-        genre_header = soup.find('th', string='장르')
-        if genre_header:
-            genre_cell = genre_header.find_next_sibling('td')
-            if genre_cell:
-                genre_links = genre_cell.select('div.main_genre a')
-                genres = [link.get_text(strip=True) for link in genre_links]
-        if not product_name:
-            return None
-        return {'product_name': product_name, 'maker_name': maker_name, 'genres': genres}
+        with metrics.timer('crawl.parse'):
+            return parse_product_page(html_content)
     except Exception as e:
         print(f"  [DEBUG] HTML 파싱 중 예외 발생: {e}")
         return None
 
-def run_scraper():
-    """DB에서 작업을 가져와 스크래핑을 수행하고, 결과를 저장합니다."""
+def fetch_product(session, bucket, db_id, key, base_url=BASE_URL, cache=None, validators=None, refresh=False):
+    """
+    작품 페이지 하나를 가져와 파싱합니다. (작업 스레드에서 실행)
+    결과는 id, key, info(추출 결과), log(출력할 줄 목록), cached(캐시에 저장한 (해시, 크기))와
+    status(HTTP 응답 코드, 요청 실패면 None), error, retry_after, etag/last_modified(응답의 검증값)를 담은 dict입니다.
+
+    validators=(etag, last_modified)를 주면 조건부 요청(If-None-Match / If-Modified-Since)을 보내고,
+    304 응답이면 파싱하지 않고 not_modified=True로 돌려줍니다. refresh는 수집 완료 항목의 갱신인지 표시합니다.
+    """
+    url = base_url.format(product_id(key))
+    result = {'id': db_id, 'key': key, 'info': None, 'log': [], 'cached': None, 'status': None, 'error': None,
+              'retry_after': None, 'etag': None, 'last_modified': None, 'not_modified': False, 'refresh': refresh}
+    log = result['log']
+    scraped_info = None
+    headers = {}
+    if validators:
+        etag, last_modified = validators
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+    with metrics.timer('crawl.rate_wait'):
+        bucket.acquire()
+    try:
+        with metrics.timer('crawl.fetch'):
+            response = session.get(url, timeout=REQUEST_TIMEOUT, headers=headers or None)
+        metrics.observe('crawl.http_status', response.status_code)
+        result['status'] = response.status_code
+        result['etag'] = response.headers.get('ETag')
+        result['last_modified'] = response.headers.get('Last-Modified')
+        if response.status_code == 304:
+            result['not_modified'] = True
+            log.append("  [변경 없음] 이전에 받은 페이지와 같습니다.")
+        elif response.status_code == 200:
+            if cache is not None:
+                try:
+                    result['cached'] = cache.write_blob(response.content)
+                except OSError as e:
+                    log.append(f"  [캐시 오류] 페이지를 저장하지 못했습니다: {e}")
+
+            # ===== 한국어 페이지 수신 확인 디버깅 코드 =====
+            if '<html lang="ko-kr">' in response.text:
+                log.append("  [디버그] 한국어 페이지(ko-kr) 수신 확인!")
+            elif '<html lang="ja-jp">' in response.text:
+                log.append("  [디버그] !! 일본어 페이지(ja-jp)가 수신되었습니다. !!")
+            else:
+                log.append("  [디버그] 페이지 언어를 특정할 수 없습니다.")
+            # ===============================================
+
+            scraped_info = extract_product_info(response.content)
+            if scraped_info:
+                log.append(f"  [성공] '{scraped_info['product_name']}'")
+                if scraped_info['genres']:
+                    log.append(f"  [장르 발견] {', '.join(scraped_info['genres'])}")
+                else:
+                    log.append("  [장르 미발견]")
+            else:
+                log.append("  [실패] 페이지는 열었으나, 필요한 정보를 찾지 못했습니다.")
+        else:
+            result['error'] = f"HTTP {response.status_code}"
+            result['retry_after'] = crawl_jobs.parse_retry_after(response.headers.get('Retry-After'))
+            log.append(f"  [실패] 서버 응답 코드: {response.status_code}")
+    except requests.exceptions.RequestException as e:
+        metrics.observe('crawl.http_status', type(e).__name__)
+        result['error'] = f"{type(e).__name__}: {e}"
+        log.append(f"  [오류] 요청 중 예외 발생: {e}")
+    result['info'] = scraped_info
+    return result
+
+def parse_cached_product(cache, db_id, key, digest):
+    """네트워크 요청 없이 캐시에 저장된 페이지를 파싱합니다. (작업 스레드에서 실행)"""
+    result = {'id': db_id, 'key': key, 'info': None, 'log': ["  [캐시] 저장된 페이지를 사용합니다."], 'cached': None,
+              'from_cache': True}
+    metrics.count('crawl.cache_hit')
+    with metrics.timer('crawl.cache_read'):
+        html_content = cache.read_blob(digest)
+    if html_content is not None:
+        result['info'] = extract_product_info(html_content)
+    if result['info']:
+        result['log'].append(f"  [성공] '{result['info']['product_name']}'")
+    else:
+        result['log'].append("  [실패] 저장된 페이지에서 필요한 정보를 찾지 못했습니다. 캐시를 지우고 다시 받습니다.")
+    return result
+
+class ResultWriter:
+    """
+    스크래핑 결과를 모아 두었다가 batch_size개마다 한 트랜잭션으로 기록합니다. (순서와 무관)
+
+    장르 이름 → id 매핑은 처음에 한 번 읽어 메모리에 두고, 새 장르만 한꺼번에 추가합니다.
+    files 갱신과 file_genres 교체는 같은 트랜잭션에서 커밋되므로, 중간에 중단되어도
+    scraped_status=1인데 장르가 빠진 행은 생기지 않습니다.
+    """
+
+    def __init__(self, conn, cache=None, batch_size=WRITE_BATCH_SIZE):
+        self.conn = conn
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.pending = []
+        self.failures = {}  # 실패 종류 → 개수
+        cursor = conn.cursor()
+        cursor.execute("SELECT name, id FROM genres")
+        self.genre_ids = dict(cursor.fetchall())
+
+    def add(self, result):
+        self.pending.append(result)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """모아 둔 결과를 기록하고 커밋합니다."""
+        if not self.pending:
+            return
+        with metrics.timer('crawl.write'):
+            self._write()
+
+    def _write(self):
+        results = self.pending
+        self.pending = []
+        cursor = self.conn.cursor()
+        try:
+            new_genres = {}
+            new_names = {name for r in results if r['info'] for name in r['info'].get('genres', [])
+                         if name not in self.genre_ids}
+            if new_names:
+                cursor.executemany("INSERT OR IGNORE INTO genres (name) VALUES (?)", [(name,) for name in new_names])
+                names = list(new_names)
+                for i in range(0, len(names), 500):
+                    chunk = names[i:i + 500]
+                    cursor.execute(f"SELECT name, id FROM genres WHERE name IN ({','.join('?' * len(chunk))})", chunk)
+                    new_genres.update(cursor.fetchall())
+
+            scraped = []
+            links = []
+            covers = []
+            failed = []
+            for result in results:
+                db_id = result['id']
+                scraped_info = result['info']
+                if self.cache is not None and result.get('cached'):
+                    self.cache.record(cursor, result['key'], *result['cached'])
+                if self.cache is not None and result.get('from_cache') and not scraped_info:
+                    # 파싱할 수 없는 페이지가 캐시에 남아 있으면 계속 같은 실패를 하므로 지우고 다시 받습니다.
+                    self.cache.forget(cursor, result['key'])
+                if result.get('not_modified'):
+                    continue
+                if scraped_info:
+                    scraped.append((scraped_info['product_name'], normalize_title(scraped_info['product_name']),
+                                    scraped_info['maker_name'], db_id))
+                    for genre_name in scraped_info.get('genres', []):
+                        genre_id = self.genre_ids.get(genre_name) or new_genres.get(genre_name)
+                        if genre_id:
+                            links.append((db_id, genre_id))
+                    if scraped_info.get('cover_url'):
+                        covers.append((result['key'], scraped_info['cover_url']))
+                elif not result.get('refresh'):
+                    failed.append((db_id,))
+
+            cursor.executemany("UPDATE files SET product_name=?, title_key=?, maker_name=?, scraped_status=1 WHERE id=?", scraped)
+            # 기존 장르 연결은 새 결과로 교체합니다.
+            cursor.executemany("DELETE FROM file_genres WHERE file_id = ?", [(row[-1],) for row in scraped])
+            cursor.executemany("INSERT OR IGNORE INTO file_genres (file_id, genre_id) VALUES (?, ?)", links)
+            # 표지는 여기서 주소만 기록하고, 이미지는 fetch_covers(--covers)에서 따로 받습니다.
+            cover_pack.record_cover_urls(cursor, covers)
+            # 이미 수집한 항목은 나중에 실패해도 이전 결과를 그대로 둡니다.
+            cursor.executemany("UPDATE files SET scraped_status=-1 WHERE id=? AND scraped_status != 1", failed)
+            for failure, n in crawl_jobs.record_results(cursor, results).items():
+                self.failures[failure] = self.failures.get(failure, 0) + n
+            metrics.count('crawl.scraped', len(scraped))
+            metrics.count('crawl.failed', len(failed))
+            if self.cache is not None:
+                self.cache.evict(cursor)
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        # 커밋이 끝난 뒤에만 새 장르 id를 기억합니다.
+        self.genre_ids.update(new_genres)
+
+def run_scraper(limit=None, rate=None, concurrency=None, base_url=BASE_URL, batch_size=WRITE_BATCH_SIZE, cache=None,
+                refresh=False):
+    """
+    DB에서 작업을 가져와 스크래핑을 수행하고, 결과를 저장합니다.
+
+    limit/rate/concurrency를 넘기지 않으면 실행 중에 입력받습니다.
+    rate는 초당 최대 요청 수(토큰 버킷)이고, concurrency는 동시에 진행할 요청 수입니다.
+    결과는 끝나는 순서대로 batch_size개씩 모아서 기록합니다.
+    받아온 페이지는 cache(기본값: PageCache())에 저장되고, 이미 저장된 키는 다시 요청하지 않습니다.
+
+    작업은 crawl_jobs 대기열에서 예정 시각이 된 것만 가져옵니다. (새 파일 먼저, 실패한 항목은 백오프 후 재시도)
+    refresh=True이면 수집 완료 항목을 오래전에 받은 것부터 캐시 없이 조건부 요청으로 다시 받습니다.
+    """
     if not os.path.exists(DATABASE_FILE):
         print(f"오류: '{DATABASE_FILE}'를 찾을 수 없습니다. 먼저 input_file_0.py를 실행하세요.")
         return
@@ -70,78 +295,298 @@ def run_scraper():
     setup_database_for_scraping()
 
     try:
-        limit = int(input("이번에 몇 개의 항목을 처리할까요?: "))
-        delay = float(input("각 요청 사이에 몇 초를 대기할까요? (예: 2.5): "))
+        if limit is None:
+            limit = int(input("이번에 몇 개의 항목을 처리할까요?: "))
+        if rate is None:
+            rate = float(input("초당 최대 몇 개의 요청을 보낼까요? (예: 0.5, 0이면 제한 없음): "))
+        if concurrency is None:
+            concurrency = int(input(f"동시에 몇 개의 요청을 보낼까요? (예: {MAX_CONCURRENT_REQUESTS}): "))
     except ValueError:
         print("잘못된 입력입니다.")
         return
+    concurrency = max(1, concurrency)
+    if cache is None:
+        cache = PageCache()
 
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = db_schema.connect(DATABASE_FILE)
     cursor = conn.cursor()
-    cursor.execute("SELECT id, extracted_key FROM files WHERE scraped_status = 0 LIMIT ?", (limit,))
-    tasks = cursor.fetchall()
+    if refresh:
+        tasks = [(db_id, key, (etag, last_modified)) for db_id, key, etag, last_modified
+                 in crawl_jobs.refresh_jobs(cursor, limit)]
+    else:
+        tasks = [(db_id, key, None) for db_id, key in crawl_jobs.due_jobs(cursor, limit)]
 
     if not tasks:
-        print("\n모든 항목의 처리가 완료되었습니다.")
+        print("\n지금 처리할 항목이 없습니다.")
+        print_queue_summary(cursor)
         conn.close()
         return
 
-    print(f"\n총 {len(tasks)}개의 항목에 대한 정보 수집을 시작합니다.")
-    
-    for i, (db_id, key) in enumerate(tasks):
-        url = BASE_URL.format(key)
-        print(f"\n--- [{i+1}/{len(tasks)}] 처리 중: RJ{key} ---")
-        
-        scraped_info = None
-        try:
-            response = requests.get(url, headers=HEADERS, timeout=20)
-            if response.status_code == 200:
-                
-                # ===== 한국어 페이지 수신 확인 디버깅 코드 =====
-                if '<html lang="ko-kr">' in response.text:
-                    print("  [디버그] 한국어 페이지(ko-kr) 수신 확인!")
-                elif '<html lang="ja-jp">' in response.text:
-                    print("  [디버그] !! 일본어 페이지(ja-jp)가 수신되었습니다. !!")
-                else:
-                    print("  [디버그] 페이지 언어를 특정할 수 없습니다.")
-                # ===============================================
+    print(f"\n총 {len(tasks)}개의 항목에 대한 정보 수집을 시작합니다. (동시 요청 {concurrency}개, 초당 최대 {rate}개)")
 
-                scraped_info = extract_product_info(response.content)
-                if scraped_info:
-                    print(f"  [성공] '{scraped_info['product_name']}'")
-                    if scraped_info['genres']:
-                        print(f"  [장르 발견] {', '.join(scraped_info['genres'])}")
+    session = create_session(concurrency)
+    bucket = TokenBucket(rate)
+    start_time = time.perf_counter()
+    try:
+        done_count, failures = scrape_tasks(conn, tasks, session, bucket, concurrency, base_url, cache, batch_size, refresh)
+    finally:
+        session.close()
+
+    elapsed = time.perf_counter() - start_time
+    print("\n" + "="*40 + "\n이번 작업이 완료되었습니다.\n" + "="*40)
+    print(f"소요 시간: {elapsed:.1f}초 ({done_count / max(elapsed, 1e-9):.2f} 페이지/초)")
+    if failures:
+        print("이번 실패: " + ", ".join(f"{name} {n}개" for name, n in sorted(failures.items())))
+    print_queue_summary(cursor)
+    conn.close()
+
+def scrape_tasks(conn, tasks, session, bucket, concurrency, base_url=BASE_URL, cache=None, batch_size=WRITE_BATCH_SIZE,
+                 refresh=False, verbose=True):
+    """
+    작업 [(db_id, key, validators)]을 concurrency개씩 동시에 받아 결과를 conn에 기록하고,
+    (처리한 수, 실패 종류별 개수 dict)를 돌려줍니다. session/bucket은 호출한 쪽에서 만들고 닫으므로
+    여러 번 나눠 부를 때도 연결과 요청 속도 제한이 이어집니다. (pipeline.py 참고)
+    verbose=False이면 작품마다의 진행 로그를 출력하지 않습니다.
+    """
+    if cache is None:
+        cache = PageCache()
+    cursor = conn.cursor()
+    writer = ResultWriter(conn, cache, batch_size)
+    done_count = 0
+    task_iter = iter(tasks)
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            in_flight = set()
+            while True:
+                # 진행 중인 요청이 concurrency의 두 배를 넘지 않도록 조금씩 넣습니다.
+                for db_id, key, validators in task_iter:
+                    digest = None if refresh else cache.lookup(cursor, key)
+                    if digest:
+                        in_flight.add(executor.submit(parse_cached_product, cache, db_id, key, digest))
                     else:
-                        print("  [장르 미발견]")
-                else:
-                    print("  [실패] 페이지는 열었으나, 필요한 정보를 찾지 못했습니다.")
+                        in_flight.add(executor.submit(fetch_product, session, bucket, db_id, key, base_url, cache,
+                                                      validators, refresh))
+                    if len(in_flight) >= concurrency * 2:
+                        break
+                if not in_flight:
+                    break
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    done_count += 1
+                    if verbose:
+                        print(f"\n--- [{done_count}/{len(tasks)}] 처리 완료: {product_id(result['key'])} ---")
+                        for line in result['log']:
+                            print(line)
+                    writer.add(result)
+    finally:
+        # 중단되더라도 이미 받은 결과는 저장합니다.
+        writer.flush()
+    return done_count, writer.failures
+
+def fetch_cover(session, bucket, key, url):
+    """
+    표지 이미지 하나를 받아 썸네일로 만듭니다. (작업 스레드에서 실행)
+    결과는 key, info(cover_pack.make_thumbnail 결과), status, error, retry_after를 담은 dict입니다.
+    """
+    result = {'key': key, 'info': None, 'status': None, 'error': None, 'retry_after': None}
+    with metrics.timer('cover.rate_wait'):
+        bucket.acquire()
+    try:
+        with metrics.timer('cover.fetch'):
+            response = session.get(url, timeout=REQUEST_TIMEOUT, headers={'Accept': COVER_ACCEPT})
+        metrics.observe('cover.http_status', response.status_code)
+        result['status'] = response.status_code
+        if response.status_code == 200:
+            if len(response.content) > cover_pack.COVER_MAX_BYTES:
+                result['error'] = f"이미지가 너무 큽니다 ({len(response.content)} bytes)"
             else:
-                print(f"  [실패] 서버 응답 코드: {response.status_code}")
-        except requests.exceptions.RequestException as e:
-            print(f"  [오류] 요청 중 예외 발생: {e}")
-
-        # DB 업데이트 로직
-        if scraped_info:
-            cursor.execute("UPDATE files SET product_name=?, maker_name=?, scraped_status=1 WHERE id=?",(scraped_info['product_name'], scraped_info['maker_name'], db_id))
-            for genre_name in scraped_info.get('genres', []):
-                cursor.execute("INSERT OR IGNORE INTO genres (name) VALUES (?)", (genre_name,))
-                cursor.execute("SELECT id FROM genres WHERE name = ?", (genre_name,))
-                genre_id_result = cursor.fetchone()
-                if genre_id_result:
-                    genre_id = genre_id_result[0]
-                    cursor.execute("INSERT OR IGNORE INTO file_genres (file_id, genre_id) VALUES (?, ?)", (db_id, genre_id))
+                with metrics.timer('cover.thumbnail'):
+                    result['info'] = cover_pack.make_thumbnail(response.content)
+                if result['info'] is None:
+                    result['error'] = "이미지가 아닙니다"
         else:
-            cursor.execute("UPDATE files SET scraped_status=-1 WHERE id=?", (db_id,))
-        
-        conn.commit()
-
-        if i < len(tasks) - 1:
-            print(f"  ({delay}초 대기...)")
-            time.sleep(delay)
-    
-    conn.close()
-    print("\n" + "="*40 + "\n이번 작업이 완료되었습니다.\n" + "="*40)
+            result['error'] = f"HTTP {response.status_code}"
+            result['retry_after'] = crawl_jobs.parse_retry_after(response.headers.get('Retry-After'))
+    except requests.exceptions.RequestException as e:
+        metrics.observe('cover.http_status', type(e).__name__)
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+def fetch_covers(limit=None, rate=None, concurrency=None, base_url=BASE_URL, pack=None, batch_size=WRITE_BATCH_SIZE):
+    """
+    작품 페이지에서 찾아 둔 표지를 받아 썸네일로 만들고 팩 파일(pack, 기본값: CoverPack())에 저장합니다.
+    요청은 concurrency개를 동시에, 초당 rate개까지 보내고, 결과는 batch_size개마다 팩과 DB에 한 번에 기록합니다.
+    상대 주소인 표지는 그 작품의 페이지 주소(base_url) 기준으로 풉니다. limit가 None이면 받을 표지를 모두 받습니다.
+    """
+    if not os.path.exists(DATABASE_FILE):
+        print(f"오류: '{DATABASE_FILE}'를 찾을 수 없습니다.")
+        return
+
+    setup_database_for_scraping()
+
+    try:
+        if rate is None:
+            rate = float(input("초당 최대 몇 개의 요청을 보낼까요? (예: 0.5, 0이면 제한 없음): "))
+        if concurrency is None:
+            concurrency = int(input(f"동시에 몇 개의 요청을 보낼까요? (예: {MAX_CONCURRENT_REQUESTS}): "))
+    except ValueError:
+        print("잘못된 입력입니다.")
+        return
+    concurrency = max(1, concurrency)
+
+    conn = db_schema.connect(DATABASE_FILE)
+    cursor = conn.cursor()
+    jobs = cover_pack.pending_covers(cursor, limit)
+    if not jobs:
+        print("받을 표지가 없습니다. (이미 수집한 작품은 python crawler.py --reparse 로 표지 주소를 찾을 수 있습니다)")
+        conn.close()
+        return
+
+    print(f"표지 {len(jobs)}개를 받습니다. (동시 요청 {concurrency}개, 초당 최대 {rate}개)")
+    if pack is None:
+        pack = CoverPack()
+    session = create_session(concurrency)
+    bucket = TokenBucket(rate)
+    pending = []
+    failures = {}
+    stored = 0
+    done_count = 0
+    start_time = time.perf_counter()
+
+    def flush():
+        nonlocal stored
+        if not pending:
+            return
+        with metrics.timer('cover.write'):
+            try:
+                batch_failures = cover_pack.store_covers(cursor, pack, pending)
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+        stored += len(pending) - sum(batch_failures.values())
+        for failure, n in batch_failures.items():
+            failures[failure] = failures.get(failure, 0) + n
+        pending.clear()
+        print(f"  표지 {done_count}/{len(jobs)}개 처리")
+
+    job_iter = iter(jobs)
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            in_flight = set()
+            while True:
+                for key, source_url in job_iter:
+                    url = urljoin(base_url.format(product_id(key)), source_url)
+                    in_flight.add(executor.submit(fetch_cover, session, bucket, key, url))
+                    if len(in_flight) >= concurrency * 2:
+                        break
+                if not in_flight:
+                    break
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    pending.append(future.result())
+                    done_count += 1
+                if len(pending) >= batch_size:
+                    flush()
+    finally:
+        # 중단되더라도 이미 받은 표지는 저장합니다.
+        flush()
+        session.close()
+        pack.close()
+        conn.close()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"표지 저장 완료: {stored}개 ({elapsed:.1f}초, {done_count / max(elapsed, 1e-9):.2f}개/초)")
+    if failures:
+        print("실패: " + ", ".join(f"{name} {n}개" for name, n in sorted(failures.items()))
+              + " (일시적인 실패는 다음 실행 때 다시 받습니다)")
+
+def print_queue_summary(cursor):
+    """crawl_jobs 대기열 상태를 출력합니다."""
+    summary = crawl_jobs.queue_summary(cursor)
+    line = f"대기열: 지금 처리할 항목 {summary['due']}개, 재시도 대기 {summary['waiting']}개"
+    if summary['next_attempt']:
+        line += f" (다음 재시도 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(summary['next_attempt']))})"
+    print(line)
+    if summary['failed']:
+        print("포기한 항목: " + ", ".join(f"{name} {n}개" for name, n in sorted(summary['failed'].items()))
+              + " (python crawler.py --retry-failed 로 다시 시도)")
+
+def _reparse_worker(job):
+    """(key, 해시, 캐시 폴더)를 받아 캐시된 페이지를 파싱합니다. (별도 프로세스에서 실행)"""
+    key, digest, cache_dir = job
+    html_content = PageCache(cache_dir).read_blob(digest)
+    if html_content is None:
+        return key, None
+    return key, extract_product_info(html_content)
+
+def reparse_from_cache(processes=None, cache=None, batch_size=WRITE_BATCH_SIZE):
+    """
+    네트워크 요청 없이 캐시된 페이지만으로 작품명, 제작사, 장르를 다시 추출합니다.
+    extract_product_info를 고친 뒤 실행하면 전체를 다시 받을 필요가 없습니다.
+    파싱은 processes개(기본값: CPU 코어 수)의 프로세스에서 나눠서 합니다.
+    """
+    if not os.path.exists(DATABASE_FILE):
+        print(f"오류: '{DATABASE_FILE}'를 찾을 수 없습니다.")
+        return
+
+    setup_database_for_scraping()
+    if cache is None:
+        cache = PageCache()
+
+    conn = db_schema.connect(DATABASE_FILE)
+    cursor = conn.cursor()
+    cursor.execute("SELECT extracted_key, content_hash FROM page_cache")
+    jobs = [(key, digest, cache.cache_dir) for key, digest in cursor.fetchall()]
+    if not jobs:
+        print("캐시된 페이지가 없습니다.")
+        conn.close()
+        return
+
+    processes = processes or os.cpu_count() or 1
+    print(f"캐시된 페이지 {len(jobs)}개를 {processes}개의 프로세스로 다시 파싱합니다.")
+    updated = 0
+    failed = 0
+    writer = ResultWriter(conn, batch_size=batch_size)
+    start_time = time.perf_counter()
+    try:
+        with Pool(processes) as pool:
+            for key, scraped_info in pool.imap_unordered(_reparse_worker, jobs, chunksize=16):
+                if not scraped_info:
+                    failed += 1
+                    continue
+                # 같은 키를 가진 파일이 여러 개일 수 있습니다.
+                cursor.execute("SELECT id FROM files WHERE extracted_key = ?", (key,))
+                for (db_id,) in cursor.fetchall():
+                    writer.add({'id': db_id, 'key': key, 'info': scraped_info, 'log': [], 'cached': None})
+                    updated += 1
+    finally:
+        writer.flush()
+        conn.close()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"다시 파싱 완료: {updated}개 항목 갱신, {failed}개 페이지 실패 ({elapsed:.1f}초)")
 
 
 if __name__ == '__main__':
-    run_scraper()
\ No newline at end of file
+    # python crawler.py --reparse 로 실행하면 캐시된 페이지만 다시 파싱합니다.
+    # --refresh: 수집 완료 항목을 조건부 요청으로 갱신, --retry-failed: 포기한 항목을 다시 대기열에 넣고 실행
+    # --covers: 찾아 둔 표지 이미지를 받아 썸네일 팩(covers.pack)에 저장
+    # --metrics[=파일.json]: 단계별 시간과 응답 코드 분포 출력, --profile[=파일.prof]: cProfile 결과 저장
+    args = metrics_module.configure(name='crawler')
+    if '--reparse' in args:
+        reparse_from_cache()
+        metrics_module.finish('reparse_from_cache')
+    elif '--covers' in args:
+        fetch_covers()
+        metrics_module.finish('fetch_covers')
+    else:
+        if '--retry-failed' in args:
+            setup_database_for_scraping()
+            conn = db_schema.connect(DATABASE_FILE)
+            with conn:
+                print(f"포기한 항목 {crawl_jobs.requeue_failed(conn.cursor())}개를 다시 대기열에 넣었습니다.")
+            conn.close()
+        run_scraper(refresh='--refresh' in args)
+        metrics_module.finish('run_scraper')
\ No newline at end of file
@@ -0,0 +1,298 @@
+import os
+import sys
+import sqlite3
+
+from page_cache import PageCache
+from search_index import setup_search_index
+from duplicate_index import setup_duplicate_index
+from crawl_jobs import setup_crawl_jobs
+from filter_summary import setup_maker_summary
+from catalog import setup_change_log
+from cover_pack import setup_covers
+
+# --- 설정 ---
+DATABASE_FILE = 'file_index.db'
+# 다른 프로그램(예: 크롤러 실행 중 라이브러리 앱)이 DB를 잠그고 있을 때 기다릴 최대 시간(ms)
+BUSY_TIMEOUT_MS = 5000
+
+
+# --- 마이그레이션 ---
+# 각 마이그레이션은 (버전, 설명, 함수) 이며, DB의 PRAGMA user_version보다 높은 것만 순서대로 실행됩니다.
+# 이미 배포된 마이그레이션은 고치지 말고 새 버전을 뒤에 추가하세요.
+
+def _columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+def _add_columns(cursor, table, definitions):
+    existing = _columns(cursor, table)
+    for definition in definitions:
+        if definition.split()[0] not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {definition}")
+
+def _migrate_base_tables(cursor):
+    """이전 버전의 세 프로그램이 각자 만들던 테이블과 컬럼을 한 번에 맞춥니다."""
+    # extracted_key: 파일명에서 추출한 문자열, file_path: 파일의 전체 경로
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS files (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            extracted_key TEXT NOT NULL,
+            file_path TEXT NOT NULL UNIQUE
+        )
+    ''')
+    _add_columns(cursor, 'files', [
+        # 증분 스캔용: 파일이 있는 폴더, 크기, 수정 시각(ns), inode
+        "dir_path TEXT",
+        "file_size INTEGER",
+        "file_mtime INTEGER",
+        "file_inode INTEGER",
+        # 크롤러가 채우는 작품 정보
+        "product_name TEXT",
+        "maker_name TEXT",
+        "scraped_status INTEGER DEFAULT 0 NOT NULL",
+        # 라이브러리 앱의 숨김 표시
+        "is_hidden INTEGER DEFAULT 0 NOT NULL",
+    ])
+    # 폴더별 mtime과 파일 개수 (mtime_ns가 NULL이면 다음 스캔 때 반드시 다시 읽습니다)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS dirs (
+            path TEXT PRIMARY KEY,
+            parent TEXT,
+            mtime_ns INTEGER,
+            file_count INTEGER NOT NULL DEFAULT 0,
+            matched_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('CREATE TABLE IF NOT EXISTS genres (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE)')
+    cursor.execute('CREATE TABLE IF NOT EXISTS file_genres (file_id INTEGER, genre_id INTEGER, PRIMARY KEY (file_id, genre_id), FOREIGN KEY (file_id) REFERENCES files (id), FOREIGN KEY (genre_id) REFERENCES genres (id))')
+    PageCache.setup(cursor)
+    # 이전 버전에서 기록된 행은 dir_path가 비어 있으므로 채워 줍니다.
+    cursor.execute("SELECT id, file_path FROM files WHERE dir_path IS NULL")
+    backfill = [(os.path.dirname(path), file_id) for file_id, path in cursor.fetchall()]
+    if backfill:
+        cursor.executemany("UPDATE files SET dir_path = ? WHERE id = ?", backfill)
+
+def _migrate_indexes(cursor):
+    """자주 쓰는 조회가 전체 스캔을 하지 않도록 인덱스를 추가합니다."""
+    # 수집 상태로 고르는 조회: crawl_jobs 대기열을 처음 채울 때의 WHERE scraped_status IN (0, -1)
+    # (크롤러의 작업 목록은 이제 crawl_jobs 대기열에서 읽습니다)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_status_key ON files (scraped_status, extracted_key)")
+    # 목록 화면: scraped_status = 1 AND is_hidden = 0 ORDER BY product_name
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_listing ON files (scraped_status, is_hidden, product_name)")
+    # 제작사 필터와 제작사 목록
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_maker ON files (maker_name, scraped_status, is_hidden)")
+    # 중복 작품 묶음 (GROUP BY product_name, WHERE product_name = ?)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_product_name ON files (product_name, is_hidden, scraped_status)")
+    # 장르 필터: file_genres를 genre_id로 찾기
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_genres_genre ON file_genres (genre_id, file_id)")
+    # 증분 스캔
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_dir_path ON files (dir_path)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_inode ON files (file_inode)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_dirs_parent ON dirs (parent)")
+
+def _migrate_search_index(cursor):
+    """작품명/제작사/장르 FTS5 검색 색인 (SQLite에 FTS5가 없으면 건너뜁니다)"""
+    setup_search_index(cursor)
+
+def _migrate_duplicate_index(cursor):
+    """정규화한 작품명(title_key)과 extracted_key 기준의 중복 묶음 테이블"""
+    _add_columns(cursor, 'files', ["title_key TEXT"])
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_title_key ON files (title_key)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_extracted_key ON files (extracted_key)")
+    setup_duplicate_index(cursor)
+
+def _migrate_content_hash(cursor):
+    """내용 해시 중복 검사(content_hash.py)용 컬럼과 인덱스, 'content' 중복 묶음 트리거"""
+    _add_columns(cursor, 'files', [
+        # 앞/뒤 일부로 만든 부분 해시와 전체 해시, 그리고 해시를 계산할 때의 크기/mtime
+        "partial_hash TEXT",
+        "content_hash TEXT",
+        "hash_size INTEGER",
+        "hash_mtime INTEGER",
+    ])
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_size ON files (file_size)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_content_hash ON files (content_hash)")
+    setup_duplicate_index(cursor)
+
+def _migrate_key_rule(cursor):
+    """extracted_key를 찾은 품번 규칙 이름(key_extractor.KEY_RULES)을 기록하는 컬럼"""
+    _add_columns(cursor, 'files', ["key_rule TEXT"])
+    # 이전 버전은 RJ 규칙 하나만 있었습니다.
+    cursor.execute("UPDATE files SET key_rule = 'RJ' WHERE key_rule IS NULL")
+
+def _migrate_crawl_jobs(cursor):
+    """크롤러 재시도 대기열과 페이지 검증값(ETag/Last-Modified) 테이블"""
+    setup_crawl_jobs(cursor)
+
+def _migrate_maker_summary(cursor):
+    """라이브러리 앱 시작 때 제작사 목록을 files 전체 대신 읽는 요약 테이블"""
+    setup_maker_summary(cursor)
+
+def _migrate_catalog_changes(cursor):
+    """라이브러리 앱의 인메모리 카탈로그(catalog.py)가 바뀐 작품만 다시 읽도록 하는 변경 기록"""
+    setup_change_log(cursor)
+
+def _migrate_covers(cursor):
+    """작품 표지 썸네일의 주소와 팩 파일(cover_pack.py) 안 위치"""
+    setup_covers(cursor)
+
+def _normalized(path):
+    """main.normalize_root와 같은 형태. 상대 경로는 어느 폴더 기준인지 알 수 없으므로 그대로 둡니다."""
+    return os.path.normpath(path) if path and os.path.isabs(path) else path
+
+def _migrate_normalize_paths(cursor):
+    """
+    예전 버전은 루트 폴더를 입력받은 그대로(Windows 폴더 선택 창의 'C:/...', 끝의 '/' 등) 이어 붙여 기록했습니다.
+    지금 스캐너/감시 모드/파이프라인이 기록하는 경로와 같아지도록 files와 dirs의 절대 경로를 정리합니다.
+    같은 파일이 이미 정리된 경로로도 기록되어 있으면(경로가 달라 중복으로 들어간 행) 수집한 쪽을 남깁니다.
+    """
+    cursor.execute("SELECT id, file_path, dir_path, scraped_status FROM files")
+    for file_id, path, dir_path, status in cursor.fetchall():
+        new_path, new_dir = _normalized(path), _normalized(dir_path)
+        if (new_path, new_dir) == (path, dir_path):
+            continue
+        if new_path != path:
+            cursor.execute("SELECT id, scraped_status FROM files WHERE file_path = ?", (new_path,))
+            twin = cursor.fetchone()
+            if twin:
+                # 이미 수집한 행을, 둘 다 같으면 먼저 기록된 행을 남깁니다.
+                drop = file_id if (twin[1], -twin[0]) >= (status, -file_id) else twin[0]
+                cursor.execute("DELETE FROM file_genres WHERE file_id = ?", (drop,))
+                cursor.execute("DELETE FROM files WHERE id = ?", (drop,))
+                if drop == file_id:
+                    continue
+        cursor.execute("UPDATE files SET file_path = ?, dir_path = ? WHERE id = ?", (new_path, new_dir, file_id))
+
+    cursor.execute("SELECT path, parent FROM dirs")
+    for path, parent in cursor.fetchall():
+        new_path, new_parent = _normalized(path), _normalized(parent)
+        if (new_path, new_parent) == (path, parent):
+            continue
+        if new_path != path:
+            cursor.execute("SELECT 1 FROM dirs WHERE path = ?", (new_path,))
+            if cursor.fetchone():
+                cursor.execute("DELETE FROM dirs WHERE path = ?", (path,))
+                continue
+        # 다음 스캔에서 폴더를 다시 읽도록 mtime은 지웁니다.
+        cursor.execute("UPDATE dirs SET path = ?, parent = ?, mtime_ns = NULL WHERE path = ?", (new_path, new_parent, path))
+
+MIGRATIONS = [
+    (1, "기본 테이블과 컬럼", _migrate_base_tables),
+    (2, "조회용 인덱스", _migrate_indexes),
+    (3, "FTS5 검색 색인", _migrate_search_index),
+    (4, "중복 묶음 테이블", _migrate_duplicate_index),
+    (5, "내용 해시 컬럼", _migrate_content_hash),
+    (6, "품번 규칙 컬럼", _migrate_key_rule),
+    (7, "크롤러 작업 대기열", _migrate_crawl_jobs),
+    (8, "제작사 목록 요약 테이블", _migrate_maker_summary),
+    (9, "카탈로그 변경 기록", _migrate_catalog_changes),
+    (10, "표지 썸네일", _migrate_covers),
+    (11, "경로 표기 정리", _migrate_normalize_paths),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def connect(path=None):
+    """busy_timeout과 WAL에 맞는 동기화 설정을 적용한 연결을 엽니다."""
+    conn = sqlite3.connect(path or DATABASE_FILE)
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+def migrate(conn):
+    """
+    DB를 최신 스키마로 올립니다. 실행한 마이그레이션 버전 목록을 돌려줍니다.
+    각 마이그레이션은 하나의 트랜잭션으로 적용되고, 끝나면 user_version이 그 버전으로 바뀝니다.
+    """
+    # WAL 모드는 DB 파일에 기록되므로 한 번만 바꾸면 됩니다. (트랜잭션 밖에서만 가능)
+    conn.execute("PRAGMA journal_mode = WAL")
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA user_version")
+    current = cursor.fetchone()[0]
+    applied = []
+    for version, description, func in MIGRATIONS:
+        if version <= current:
+            continue
+        cursor.execute("BEGIN")
+        try:
+            func(cursor)
+            cursor.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"DB 스키마 버전 {version} 적용: {description}")
+        applied.append(version)
+    return applied
+
+def setup_database(path=None):
+    """DB 파일을 열어 최신 스키마로 올리고 닫습니다."""
+    conn = connect(path)
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+
+
+# --- 실행 계획 검사 ---
+# (이름, SQL, 파라미터) — 프로그램에서 자주 실행되는 조회들입니다.
+HOT_QUERIES = [
+    ("크롤러 대기열",
+     "SELECT j.file_id, f.extracted_key FROM crawl_jobs AS j JOIN files AS f ON f.id = j.file_id "
+     "WHERE j.next_attempt <= ? ORDER BY j.priority DESC, j.next_attempt LIMIT ?", (0, 100)),
+    ("제작사 필터", "SELECT id FROM files WHERE maker_name = ? AND scraped_status = 1 AND is_hidden = 0", ('x',)),
+    ("제작사 목록", "SELECT name FROM maker_counts ORDER BY name", ()),
+    ("장르 목록", "SELECT name FROM genres ORDER BY name", ()),
+    ("장르 필터", "SELECT fg.file_id FROM file_genres fg JOIN genres g ON fg.genre_id = g.id WHERE g.name = ?", ('x',)),
+    ("카탈로그 변경 기록", "SELECT DISTINCT file_id FROM catalog_changes WHERE seq > ?", (0,)),
+    ("장르 id로 작품 찾기", "SELECT file_id FROM file_genres WHERE genre_id = ?", (1,)),
+    ("작품 목록",
+     "SELECT f.id, f.product_name FROM files AS f WHERE f.scraped_status = 1 AND f.is_hidden = 0 ORDER BY f.product_name", ()),
+    ("중복 묶음 목록", "SELECT group_key FROM dup_groups WHERE kind = 'title' AND file_count > 1", ()),
+    ("중복 항목만 보기", "SELECT group_key FROM dup_groups WHERE kind = 'key' AND visible_count > 1", ()),
+    ("중복 묶음의 파일 (작품명)",
+     "SELECT id, is_hidden, file_path FROM files WHERE title_key = ? ORDER BY is_hidden, file_path", ('x',)),
+    ("중복 묶음의 파일 (품번)",
+     "SELECT id, is_hidden, file_path FROM files WHERE extracted_key = ? ORDER BY is_hidden, file_path", ('x',)),
+    ("폴더의 파일 (증분 스캔)",
+     "SELECT id, file_path, file_size, file_mtime, file_inode, extracted_key FROM files WHERE dir_path = ?", ('x',)),
+    ("같은 키의 파일", "SELECT id FROM files WHERE extracted_key = ?", ('x',)),
+    ("크기가 겹치는 파일", "SELECT file_size FROM files WHERE file_size > 0 GROUP BY file_size HAVING COUNT(*) > 1", ()),
+    ("중복 묶음의 파일 (내용)", "SELECT id FROM files WHERE content_hash = ?", ('x',)),
+    ("받을 표지", "SELECT extracted_key, source_url FROM covers WHERE status = 0 ORDER BY attempts LIMIT ?", (100,)),
+    ("작품 표지",
+     "SELECT c.offset, c.length, c.format FROM files AS f JOIN covers AS c ON c.extracted_key = f.extracted_key "
+     "WHERE f.id = ? AND c.status = 1", (1,)),
+]
+
+def check_query_plans(conn, queries=None):
+    """
+    HOT_QUERIES의 실행 계획을 확인해, 인덱스 없이 테이블 전체를 읽는 단계가 있는 조회를
+    [(이름, 실행 계획 줄)] 목록으로 돌려줍니다. 빈 목록이면 통과입니다.
+    """
+    full_scans = []
+    cursor = conn.cursor()
+    for name, sql, params in queries or HOT_QUERIES:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        for row in cursor.fetchall():
+            detail = row[-1]
+            if detail.startswith('SCAN ') and ' USING ' not in detail:
+                full_scans.append((name, detail))
+    return full_scans
+
+
+if __name__ == '__main__':
+    # python db_schema.py [DB 경로] : 스키마를 최신으로 올리고 자주 쓰는 조회의 실행 계획을 검사합니다.
+    path = sys.argv[1] if len(sys.argv) > 1 else DATABASE_FILE
+    conn = connect(path)
+    migrate(conn)
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA user_version")
+    print(f"'{path}' 스키마 버전: {cursor.fetchone()[0]}")
+    problems = check_query_plans(conn)
+    conn.close()
+    if problems:
+        for name, detail in problems:
+            print(f"- 전체 스캔: {name}: {detail}")
+        sys.exit(1)
+    print(f"자주 쓰는 조회 {len(HOT_QUERIES)}개 모두 인덱스를 사용합니다.")
@@ -0,0 +1,121 @@
+import re
+import unicodedata
+
+# 중복 묶음 테이블. kind는 'title'(정규화한 작품명), 'key'(extracted_key), 'content'(내용 해시)입니다.
+DUPLICATE_TABLE = 'dup_groups'
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_title(title):
+    """
+    중복 판정용 작품명 키를 만듭니다.
+    전각/반각(NFKC), 대소문자(casefold), 공백(연속 공백을 하나로, 앞뒤 공백 제거) 차이를 무시합니다.
+    """
+    if title is None:
+        return None
+    folded = unicodedata.normalize('NFKC', title).casefold()
+    return _WHITESPACE.sub(' ', folded).strip() or None
+
+
+# (kind, files 컬럼, 묶음에 포함되는 조건). 조건 안의 {row}는 NEW/OLD 또는 files로 바뀝니다.
+GROUP_KINDS = [
+    ('title', 'title_key', "{row}.scraped_status = 1 AND {row}.title_key IS NOT NULL"),
+    ('key', 'extracted_key', "{row}.scraped_status = 1"),
+    # 내용 해시는 스크래핑 여부와 관계없이 디스크의 같은 파일을 찾습니다. (content_hash.py가 채웁니다)
+    ('content', 'content_hash', "{row}.content_hash IS NOT NULL"),
+]
+
+
+def _group_kinds(cursor):
+    """files에 컬럼이 있는 묶음 종류만 돌려줍니다. (content_hash는 스키마 버전 5부터 있습니다)"""
+    cursor.execute("PRAGMA table_info(files)")
+    columns = {row[1] for row in cursor.fetchall()}
+    return [kind for kind in GROUP_KINDS if kind[1] in columns]
+
+
+def setup_duplicate_index(cursor):
+    """
+    files의 중복 묶음(같은 정규화 작품명 / 같은 extracted_key / 같은 내용 해시)별 파일 수를 유지하는
+    테이블과 트리거를 준비합니다. 작품명/품번 묶음은 스크래핑된(scraped_status = 1) 파일만 세고,
+    visible_count는 그중 숨기지 않은 파일 수입니다.
+    트리거는 files에 있는 컬럼에 맞춰 매번 다시 만들고, 테이블을 처음 만들 때는 기존 데이터로 채웁니다.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (DUPLICATE_TABLE,))
+    created = cursor.fetchone() is None
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {DUPLICATE_TABLE} (
+            kind TEXT NOT NULL,
+            group_key TEXT NOT NULL,
+            file_count INTEGER NOT NULL DEFAULT 0,
+            visible_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, group_key)
+        ) WITHOUT ROWID
+    ''')
+    # 화면에서는 파일이 2개 이상인 묶음만 찾습니다.
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{DUPLICATE_TABLE}_files ON {DUPLICATE_TABLE} (kind, file_count)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{DUPLICATE_TABLE}_visible ON {DUPLICATE_TABLE} (kind, visible_count)")
+
+    kinds = _group_kinds(cursor)
+
+    def add(row):
+        statements = []
+        for kind, column, condition in kinds:
+            member = condition.format(row=row)
+            statements.append(f"""
+            INSERT OR IGNORE INTO {DUPLICATE_TABLE} (kind, group_key) SELECT '{kind}', {row}.{column} WHERE {member};
+            UPDATE {DUPLICATE_TABLE} SET file_count = file_count + 1, visible_count = visible_count + ({row}.is_hidden = 0)
+            WHERE kind = '{kind}' AND group_key = {row}.{column} AND {member};""")
+        return ''.join(statements)
+
+    def remove(row):
+        statements = []
+        for kind, column, condition in kinds:
+            member = condition.format(row=row)
+            statements.append(f"""
+            UPDATE {DUPLICATE_TABLE} SET file_count = file_count - 1, visible_count = visible_count - ({row}.is_hidden = 0)
+            WHERE kind = '{kind}' AND group_key = {row}.{column} AND {member};
+            DELETE FROM {DUPLICATE_TABLE} WHERE kind = '{kind}' AND group_key = {row}.{column} AND file_count <= 0;""")
+        return ''.join(statements)
+
+    def any_member(row):
+        return ' OR '.join(f"({condition.format(row=row)})" for _, _, condition in kinds)
+
+    watched = ', '.join(sorted({column for _, column, _ in kinds} | {'scraped_status', 'is_hidden'}))
+    for name in ('ai', 'ad', 'au'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {DUPLICATE_TABLE}_files_{name}")
+    cursor.execute(f"""
+        CREATE TRIGGER {DUPLICATE_TABLE}_files_ai AFTER INSERT ON files
+        WHEN {any_member('NEW')} BEGIN {add('NEW')}
+        END""")
+    cursor.execute(f"""
+        CREATE TRIGGER {DUPLICATE_TABLE}_files_ad AFTER DELETE ON files
+        WHEN {any_member('OLD')} BEGIN {remove('OLD')}
+        END""")
+    cursor.execute(f"""
+        CREATE TRIGGER {DUPLICATE_TABLE}_files_au AFTER UPDATE OF {watched} ON files
+        WHEN {any_member('OLD')} OR {any_member('NEW')} BEGIN {remove('OLD')} {add('NEW')}
+        END""")
+
+    if created:
+        rebuild_duplicate_index(cursor)
+    return True
+
+
+def rebuild_duplicate_index(cursor):
+    """files의 title_key를 다시 계산하고 중복 묶음 테이블을 처음부터 채웁니다."""
+    cursor.execute("SELECT id, product_name, title_key FROM files WHERE product_name IS NOT NULL OR title_key IS NOT NULL")
+    changed = []
+    for file_id, name, old_key in cursor.fetchall():
+        title_key = normalize_title(name)
+        if title_key != old_key:
+            changed.append((title_key, file_id))
+    if changed:
+        cursor.executemany("UPDATE files SET title_key = ? WHERE id = ?", changed)
+    cursor.execute(f"DELETE FROM {DUPLICATE_TABLE}")
+    for kind, column, condition in _group_kinds(cursor):
+        cursor.execute(f"""
+            INSERT INTO {DUPLICATE_TABLE} (kind, group_key, file_count, visible_count)
+            SELECT ?, {column}, COUNT(*), SUM(is_hidden = 0)
+            FROM files WHERE {condition.format(row='files')}
+            GROUP BY {column}""", (kind,))
@@ -0,0 +1,61 @@
+# 제작사 필터 목록용 요약 테이블. 제작사 이름마다 한 행이며 file_count는 그 제작사의 파일 수입니다.
+MAKER_TABLE = 'maker_counts'
+
+
+def setup_maker_summary(cursor):
+    """
+    제작사 목록(files의 DISTINCT maker_name)을 files 전체를 훑지 않고 읽을 수 있도록
+    제작사별 파일 수를 유지하는 테이블과 트리거를 준비합니다. 파일 수가 0이 된 제작사는 지웁니다.
+    테이블을 처음 만들 때는 기존 데이터로 채웁니다.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (MAKER_TABLE,))
+    created = cursor.fetchone() is None
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {MAKER_TABLE} (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            file_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    def add(row):
+        return f"""
+            INSERT OR IGNORE INTO {MAKER_TABLE} (name) VALUES ({row}.maker_name);
+            UPDATE {MAKER_TABLE} SET file_count = file_count + 1 WHERE name = {row}.maker_name;"""
+
+    def remove(row):
+        return f"""
+            UPDATE {MAKER_TABLE} SET file_count = file_count - 1 WHERE name = {row}.maker_name;
+            DELETE FROM {MAKER_TABLE} WHERE name = {row}.maker_name AND file_count <= 0;"""
+
+    for name in ('ai', 'ad', 'au_old', 'au_new'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {MAKER_TABLE}_files_{name}")
+    cursor.execute(f"""
+        CREATE TRIGGER {MAKER_TABLE}_files_ai AFTER INSERT ON files
+        WHEN NEW.maker_name IS NOT NULL BEGIN {add('NEW')}
+        END""")
+    cursor.execute(f"""
+        CREATE TRIGGER {MAKER_TABLE}_files_ad AFTER DELETE ON files
+        WHEN OLD.maker_name IS NOT NULL BEGIN {remove('OLD')}
+        END""")
+    # 제작사가 바뀌면 이전 제작사에서 빼고 새 제작사에 더합니다. (NULL ↔ 값 변경도 있으므로 둘로 나눕니다)
+    cursor.execute(f"""
+        CREATE TRIGGER {MAKER_TABLE}_files_au_old AFTER UPDATE OF maker_name ON files
+        WHEN OLD.maker_name IS NOT NULL AND OLD.maker_name IS NOT NEW.maker_name BEGIN {remove('OLD')}
+        END""")
+    cursor.execute(f"""
+        CREATE TRIGGER {MAKER_TABLE}_files_au_new AFTER UPDATE OF maker_name ON files
+        WHEN NEW.maker_name IS NOT NULL AND OLD.maker_name IS NOT NEW.maker_name BEGIN {add('NEW')}
+        END""")
+
+    if created:
+        rebuild_maker_summary(cursor)
+    return True
+
+
+def rebuild_maker_summary(cursor):
+    """제작사 요약 테이블을 files에서 처음부터 다시 채웁니다."""
+    cursor.execute(f"DELETE FROM {MAKER_TABLE}")
+    cursor.execute(f"""
+        INSERT INTO {MAKER_TABLE} (name, file_count)
+        SELECT maker_name, COUNT(*) FROM files WHERE maker_name IS NOT NULL GROUP BY maker_name""")
@@ -0,0 +1,147 @@
+import os
+import re
+import json
+from bisect import bisect_right
+from itertools import product
+
+# --- 설정 ---
+# 이 파일이 있으면 아래 KEY_RULES 대신 파일의 규칙을 사용합니다. (형식은 KEY_RULES와 같은 JSON 배열)
+KEY_RULES_FILE = 'key_rules.json'
+
+# 품번 규칙: (규칙 이름, 접두어 목록, 최소 숫자 자릿수, 키 형식, 단어 시작에서만 찾을지)
+# - 접두어는 대소문자를 구분하지 않는 문자열입니다. (정규식이 아님)
+# - 키 형식의 {digits}는 찾은 숫자로 바뀌며, 결과가 files.extracted_key에 저장됩니다.
+#   RJ는 예전부터 숫자만 저장해 왔으므로 그대로 두고, 다른 접두어는 접두어까지 저장합니다.
+# - 단어 시작에서만 찾으면 'are123456'처럼 영문자 뒤에 붙은 접두어는 무시합니다.
+KEY_RULES = [
+    ('RJ', ['rj', '거'], 5, '{digits}', False),
+    ('VJ', ['vj'], 5, 'VJ{digits}', True),
+    ('BJ', ['bj'], 5, 'BJ{digits}', True),
+    ('RE', ['re'], 5, 'RE{digits}', True),
+]
+
+# 배치 추출 때 파일 이름을 이어 붙이는 구분자. 파일 이름에는 NUL이 들어갈 수 없습니다.
+_SEPARATOR = '\0'
+
+
+def product_id(key):
+    """extracted_key를 DLsite 작품 번호로 바꿉니다. (숫자만 있는 키는 RJ 작품입니다)"""
+    return f"RJ{key}" if key.isdigit() else key
+
+
+def _case_variants(literal):
+    """'rj' → ['rj', 'rJ', 'Rj', 'RJ']. 대소문자 무시(re.IGNORECASE) 대신 쓰면 정규식이 훨씬 빨라집니다."""
+    return [''.join(chars) for chars in product(*[sorted({c.lower(), c.upper()}) for c in literal])]
+
+
+class KeyExtractor:
+    """
+    여러 품번 규칙을 정규식 하나로 합쳐 파일 이름에서 키를 찾습니다.
+
+    - 규칙마다 re.search를 따로 돌리지 않고, 모든 접두어를 문자열 그대로 나열한 정규식
+      '(rj|RJ|…|vj|VJ|…)(\\d{n,})' 하나만 실행합니다. 규칙별 그룹이나 lookbehind, IGNORECASE를 넣으면
+      정규식 엔진이 위치마다 모든 분기를 시도해 몇 배 느려지므로, 어느 규칙인지와 단어 시작/자릿수 조건은
+      찾은 뒤에 접두어로 규칙을 찾아 파이썬에서 확인합니다.
+    - extract는 먼저 소문자로 바꾼 이름에 접두어 문자열이 하나라도 있는지 확인하고,
+      없으면 정규식을 실행하지 않습니다. (대부분의 파일은 품번이 없습니다)
+    - extract_batch는 폴더 목록 전체를 이어 붙여 정규식을 한 번만 돌리므로 파일마다 드는 호출 비용이 없습니다.
+    결과는 (규칙 이름, 키) 튜플입니다.
+
+    DB에는 파일마다 키 하나(files.extracted_key, key_rule)만 저장하므로, 스캐너는 extract_batch의 기본값
+    (이름마다 처음 찾은 키)을 씁니다. 'RJ01234567 VJ012345.zip'처럼 품번이 여러 개인 이름의 나머지 키는
+    extract_all이나 extract_batch(all_keys=True)로만 얻을 수 있고 저장되지 않습니다.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = [tuple(rule) for rule in (rules if rules is not None else KEY_RULES)]
+        if not self.rules:
+            raise ValueError("품번 규칙이 하나도 없습니다.")
+        # 소문자 접두어 → 규칙. 같은 접두어가 여러 규칙에 있으면 앞의 규칙이 우선입니다.
+        self.prefix_rules = {}
+        for rule in self.rules:
+            for prefix in rule[1]:
+                self.prefix_rules.setdefault(prefix.lower(), rule)
+        variants = [v for prefix in self.prefix_rules for v in _case_variants(prefix)]
+        # 'rej'와 're'처럼 겹치는 접두어는 긴 것을 먼저 시도합니다.
+        alternation = '|'.join(re.escape(v) for v in sorted(variants, key=len, reverse=True))
+        min_digits = min(int(rule[2]) for rule in self.rules)
+        self.pattern = re.compile(f"({alternation})(\\d{{{min_digits},}})")
+        self.literals = tuple(sorted(self.prefix_rules))
+
+    def _result(self, text, match):
+        """정규식이 찾은 후보가 규칙 조건에 맞으면 (규칙 이름, 키)를, 아니면 None을 돌려줍니다."""
+        prefix, digits = match.groups()
+        name, _, min_digits, key_format, word_start = self.prefix_rules[prefix.lower()]
+        if len(digits) < min_digits:
+            return None
+        if word_start:
+            position = match.start()
+            if position and text[position - 1].isascii() and text[position - 1].isalpha():
+                return None
+        return name, key_format.format(digits=digits)
+
+    def extract(self, filename):
+        """파일 이름에서 처음 찾은 (규칙 이름, 키)를 돌려줍니다. 없으면 None."""
+        lowered = filename.lower()
+        for literal in self.literals:
+            if literal in lowered:
+                break
+        else:
+            return None
+        for match in self.pattern.finditer(filename):
+            found = self._result(filename, match)
+            if found:
+                return found
+        return None
+
+    def extract_all(self, filename):
+        """파일 이름에 들어 있는 모든 (규칙 이름, 키)를 순서대로 돌려줍니다."""
+        results = []
+        for match in self.pattern.finditer(filename):
+            found = self._result(filename, match)
+            if found:
+                results.append(found)
+        return results
+
+    def extract_batch(self, filenames, all_keys=False):
+        """
+        여러 파일 이름을 한 번에 처리해 이름마다 extract(all_keys=True이면 extract_all)의 결과를 담은 목록을 돌려줍니다.
+        """
+        results = [[] for _ in filenames] if all_keys else [None] * len(filenames)
+        if not filenames:
+            return results
+        text = _SEPARATOR.join(filenames)
+        # 각 이름이 text에서 시작하는 위치
+        starts = []
+        position = 0
+        for filename in filenames:
+            starts.append(position)
+            position += len(filename) + 1
+        for match in self.pattern.finditer(text):
+            found = self._result(text, match)
+            if found is None:
+                continue
+            index = bisect_right(starts, match.start()) - 1
+            if all_keys:
+                results[index].append(found)
+            elif results[index] is None:
+                results[index] = found
+        return results
+
+
+def load_rules(path=KEY_RULES_FILE):
+    """path의 JSON 규칙 목록을 읽습니다. 파일이 없으면 기본 KEY_RULES를 돌려줍니다."""
+    if not os.path.exists(path):
+        return KEY_RULES
+    with open(path, encoding='utf-8') as f:
+        return [tuple(rule) for rule in json.load(f)]
+
+
+_default_extractor = None
+
+def default_extractor():
+    """KEY_RULES_FILE(없으면 KEY_RULES)로 만든 추출기를 한 번만 만들어 재사용합니다."""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = KeyExtractor(load_rules())
+    return _default_extractor
@@ -4,107 +4,571 @@ import sqlite3
 import os
 import subprocess
 import sys
+import queue
+import threading
+import time
+import base64
+import copy
+import io
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import db_schema
+from library_db import LibraryDB, QueryCache, QUERIES, open_read_connection
+from search_index import SEARCH_TABLE, keyword_match_query
+from duplicate_index import DUPLICATE_TABLE
+from catalog import Catalog, CatalogResult, GenreFilter, genre_filter
+from cover_pack import CoverPack
+import metrics as metrics_module
+from metrics import metrics
+
+# Pillow가 있으면 Tk가 직접 읽지 못하는 JPEG/WebP 표지도 보여 줍니다.
+try:
+    from PIL import Image, ImageTk
+except ImportError:
+    Image = ImageTk = None
 
 # --- 설정 ---
 DATABASE_FILE = 'file_index.db'
+# 목록 화면은 결과를 이 개수씩 읽고, 최근에 읽은 페이지 몇 개만 메모리에 둡니다.
+RESULT_PAGE_SIZE = 200
+RESULT_CACHED_PAGES = 8
+# 입력이 멈추고 이 시간(ms)이 지나면 검색을 시작하고, 검색 중에는 이 간격으로 결과를 확인합니다.
+SEARCH_DEBOUNCE_MS = 250
+SEARCH_POLL_MS = 15
+# 여러 파일을 지울 때 디스크에서 동시에 지울 파일 수 (네트워크 드라이브에서는 동시에 지우는 편이 빠릅니다)
+DELETE_WORKERS = 8
+PROGRESS_POLL_MS = 50
+# 검색어 없이 제작사/장르로만 거르는 검색은 메모리에 올린 카탈로그(catalog.py)의 비트맵으로 처리합니다.
+# (처음 한 번 전체를 읽어야 하므로 첫 검색 결과가 나온 뒤 백그라운드에서 읽습니다)
+USE_CATALOG = True
+# 상세 정보 칸의 표지: 긴 변이 이 크기(px) 이하가 되도록 줄여 보여 주고, 최근에 본 표지를 이 개수까지 들고 있습니다.
+COVER_DISPLAY_SIZE = 160
+COVER_CACHE_SIZE = 100
+COVER_POLL_MS = 30
 
 # --- 데이터베이스 설정 및 함수 ---
 
 def setup_database():
-    """앱 시작 시 DB를 확인하고 'is_hidden' 컬럼이 없으면 추가합니다."""
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("ALTER TABLE files ADD COLUMN is_hidden INTEGER DEFAULT 0 NOT NULL")
-        print("`files` 테이블에 'is_hidden' 컬럼을 추가했습니다.")
-    except sqlite3.OperationalError as e:
-        if "duplicate column name" not in str(e):
-            raise e
-    conn.commit()
-    conn.close()
+    """앱 시작 시 DB를 확인하고 스키마가 오래되었으면 최신으로 올립니다."""
+    db_schema.setup_database(DATABASE_FILE)
+
+_db = None
+
+def get_db():
+    """DATABASE_FILE에 대한 공유 LibraryDB를 돌려줍니다. (경로가 바뀌면 새로 엽니다)"""
+    global _db
+    if _db is None or _db.path != DATABASE_FILE:
+        if _db is not None:
+            _db.close()
+        _db = LibraryDB(DATABASE_FILE)
+    return _db
 
 def delete_record_from_db(file_id):
     """ID를 기반으로 DB에서 파일 레코드와 관련 장르 링크를 삭제합니다."""
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
+    return delete_records_from_db([file_id])
+
+def delete_records_from_db(file_ids):
+    """여러 파일의 레코드와 장르 링크를 한 트랜잭션으로 삭제합니다."""
+    params = [(file_id,) for file_id in file_ids]
     try:
-        cursor.execute("DELETE FROM file_genres WHERE file_id = ?", (file_id,))
-        cursor.execute("DELETE FROM files WHERE id = ?", (file_id,))
-        conn.commit()
+        db = get_db()
+        db.write([('delete_file_genres', params), ('delete_file', params)])
+        db.forget_details(file_ids)
         return True, "DB 레코드 삭제 성공."
     except sqlite3.Error as e:
-        conn.rollback()
         return False, f"DB 오류: {e}"
-    finally:
-        conn.close()
+
+def set_hidden_many(statuses):
+    """{id: 숨김 여부}를 한 트랜잭션으로 기록합니다."""
+    try:
+        get_db().write([('set_hidden', [(int(hidden), file_id) for file_id, hidden in statuses.items()])])
+        return True, "숨김 상태 변경 성공."
+    except sqlite3.Error as e:
+        return False, f"DB 오류: {e}"
+
+def remove_files_from_disk(files, workers=DELETE_WORKERS, progress=None):
+    """
+    {id: 경로}의 파일을 workers개의 스레드에서 지웁니다. 이미 없는 파일은 지운 것으로 칩니다.
+    progress(끝난 수, 전체 수)를 파일마다 부르고, (지운 id 목록, [(id, 경로, 오류)])를 돌려줍니다.
+    """
+    def remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    removed = []
+    errors = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(remove, path): (file_id, path) for file_id, path in files.items()}
+        for done, future in enumerate(as_completed(futures), 1):
+            file_id, path = futures[future]
+            try:
+                future.result()
+                removed.append(file_id)
+            except OSError as e:
+                errors.append((file_id, path, e))
+            if progress:
+                progress(done, len(futures))
+    return removed, errors
 
 def get_all_makers():
-    """DB에서 모든 제작사 목록을 가져옵니다."""
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    cursor.execute("SELECT DISTINCT maker_name FROM files WHERE maker_name IS NOT NULL ORDER BY maker_name")
-    makers = [r[0] for r in cursor.fetchall()]
-    conn.close()
-    return makers
+    """DB에서 모든 제작사 목록을 가져옵니다. (DB가 바뀌지 않았으면 기억해 둔 목록)"""
+    db = get_db()
+    return list(db.cached(('makers',), lambda: [r[0] for r in db.fetch_all('makers')]))
 
 def get_all_genres():
-    """DB에서 모든 장르 목록을 가져옵니다."""
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM genres ORDER BY name")
-    genres = [r[0] for r in cursor.fetchall()]
-    conn.close()
-    return genres
-
-def search_works(keyword="", selected_maker="", selected_genre="", show_duplicates_only=False):
-    """작품을 검색합니다 (숨김 파일 제외)."""
-    if not os.path.exists(DATABASE_FILE):
-        messagebox.showerror("오류", f"'{DATABASE_FILE}'를 찾을 수 없습니다.")
-        return []
+    """DB에서 모든 장르 목록을 가져옵니다. (DB가 바뀌지 않았으면 기억해 둔 목록)"""
+    db = get_db()
+    return list(db.cached(('genres',), lambda: [r[0] for r in db.fetch_all('genres')]))
+
+def load_filter_lists(conn):
+    """
+    (제작사 목록, 장르 목록)을 conn으로 읽습니다. (앱 시작 때 백그라운드 스레드에서 실행)
+    제작사는 요약 테이블, 장르는 genres에서 읽으므로 라이브러리 크기와 관계없이 빠릅니다.
+    """
+    makers = [r[0] for r in conn.execute(QUERIES['makers'])]
+    genres = [r[0] for r in conn.execute(QUERIES['genres'])]
+    return makers, genres
 
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    base_query = """
-        SELECT f.id, f.product_name, f.maker_name, f.file_path, GROUP_CONCAT(g.name, ', ') AS genres
-        FROM files AS f
-        LEFT JOIN file_genres AS fg ON f.id = fg.file_id
-        LEFT JOIN genres AS g ON fg.genre_id = g.id
+def _search_query_parts(cursor, keyword, selected_maker, selected_genre, show_duplicates_only, use_index):
+    """
+    search_works 조건에 맞는 FROM/WHERE 절, 파라미터, 정렬 컬럼 목록을 만듭니다.
+    정렬 컬럼의 마지막은 항상 f.id이므로 정렬 키가 행마다 달라 키셋 커서로 쓸 수 있습니다.
     """
+    from_clause = "FROM files AS f"
     conditions = ["f.scraped_status = 1", "f.is_hidden = 0"]
     params = []
+    order_columns = ["f.product_name", "f.id"]
+    match_query = keyword_match_query(keyword) if keyword and use_index else None
+    if match_query:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (SEARCH_TABLE,))
+        if cursor.fetchone() is None:
+            match_query = None
+    if match_query:
+        # CROSS JOIN으로 색인 결과를 바깥 루프로 고정합니다. (COUNT(*)에서 files 전체를 먼저 읽지 않도록)
+        from_clause = (f"FROM (SELECT rowid, rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH ?) AS m"
+                       " CROSS JOIN files AS f ON f.id = m.rowid")
+        params.append(match_query)
+        order_columns.insert(0, "m.rank")
     if keyword:
         conditions.append("(f.product_name LIKE ? OR f.maker_name LIKE ?)")
         params.extend([f"%{keyword}%", f"%{keyword}%"])
     if selected_maker and selected_maker != '[전체]':
         conditions.append("f.maker_name = ?")
         params.append(selected_maker)
-    if selected_genre and selected_genre != '[전체]':
-        conditions.append("f.id IN (SELECT fg.file_id FROM file_genres fg JOIN genres g ON fg.genre_id = g.id WHERE g.name = ?)")
-        params.append(selected_genre)
+    genres = genre_filter(selected_genre)
+    if genres:
+        # 장르 조건은 하나의 장르 이름이거나 GenreFilter(모두 포함, 하나 이상 포함, 제외)입니다.
+        genre_files = "SELECT fg.file_id FROM file_genres fg JOIN genres g ON fg.genre_id = g.id WHERE g.name"
+        for genre in genres.all:
+            conditions.append(f"f.id IN ({genre_files} = ?)")
+            params.append(genre)
+        if genres.any:
+            conditions.append(f"f.id IN ({genre_files} IN ({','.join('?' * len(genres.any))}))")
+            params.extend(genres.any)
+        if genres.none:
+            conditions.append(f"f.id NOT IN ({genre_files} IN ({','.join('?' * len(genres.none))}))")
+            params.extend(genres.none)
     if show_duplicates_only:
-        conditions.append("f.product_name IN (SELECT product_name FROM files WHERE is_hidden = 0 GROUP BY product_name HAVING COUNT(id) > 1)")
-    
-    final_query = base_query + " WHERE " + " AND ".join(conditions) + " GROUP BY f.id ORDER BY f.product_name"
-    
-    try:
+        # 중복 묶음 테이블에서 숨기지 않은 파일이 2개 이상인 묶음(정규화한 작품명, 같은 품번, 같은 내용)의 파일만 찾습니다.
+        # 검색어 색인을 쓰지 않을 때는 묶음 쪽에서 출발해 files 전체를 훑지 않게 합니다.
+        duplicate_ids = " UNION ".join(
+            f"SELECT f2.id FROM {DUPLICATE_TABLE} AS d CROSS JOIN files AS f2 ON f2.{column} = d.group_key"
+            f" WHERE d.kind = '{kind}' AND d.visible_count > 1"
+            for kind, column in (('title', 'title_key'), ('key', 'extracted_key'), ('content', 'content_hash')))
+        if match_query:
+            conditions.append(f"f.id IN ({duplicate_ids})")
+        else:
+            from_clause = f"FROM ({duplicate_ids}) AS dup CROSS JOIN files AS f ON f.id = dup.id"
+    return from_clause + " WHERE " + " AND ".join(conditions), params, order_columns
+
+def search_key(keyword="", selected_maker="", selected_genre="", show_duplicates_only=False, use_index=True):
+    """
+    검색 조건을 결과 캐시(QueryCache)의 키로 쓸 튜플로 바꿉니다.
+    결과가 같은 조건은 같은 키가 됩니다. (제작사 ''와 '[전체]', 장르를 고른 순서, 검색어가 없을 때의 use_index)
+    """
+    maker = selected_maker if selected_maker and selected_maker != '[전체]' else None
+    genres = genre_filter(selected_genre)
+    if genres:
+        genres = GenreFilter(*(tuple(sorted(set(names))) for names in genres))
+    return keyword or '', maker, genres, bool(show_duplicates_only), bool(use_index) if keyword else True
+
+# 목록에 필요한 컬럼만 읽습니다. 장르와 경로는 선택한 작품만 get_db().work_details()로 읽습니다.
+_WORK_COLUMNS = "f.id, f.product_name, f.maker_name"
+
+def _work_from_row(r):
+    return {'id': r[0], 'product_name': r[1], 'maker_name': r[2]}
+
+def search_works(keyword="", selected_maker="", selected_genre="", show_duplicates_only=False, use_index=True):
+    """
+    작품을 검색합니다 (숨김 파일 제외).
+    검색어가 있으면 FTS5 색인으로 후보를 좁힌 뒤 기존 LIKE 조건으로 다시 확인하므로 결과는 LIKE 검색과 같고,
+    관련도(bm25) 순으로 정렬됩니다. 색인으로 찾을 수 없는 짧은 검색어는 LIKE로만 찾습니다.
+    결과에는 목록 표시용 id, product_name, maker_name만 들어 있습니다.
+    같은 조건(search_key)으로 다시 검색하면 DB가 바뀌지 않은 동안은 기억해 둔 결과를 돌려줍니다.
+    """
+    if not os.path.exists(DATABASE_FILE):
+        messagebox.showerror("오류", f"'{DATABASE_FILE}'를 찾을 수 없습니다.")
+        return []
+
+    db = get_db()
+
+    def query():
+        cursor = db.reader.cursor()
+        where, params, order_columns = _search_query_parts(cursor, keyword, selected_maker, selected_genre, show_duplicates_only, use_index)
+        final_query = f"SELECT {_WORK_COLUMNS} {where} ORDER BY {', '.join(order_columns)}"
         cursor.execute(final_query, tuple(params))
-        results = cursor.fetchall()
+        return [_work_from_row(r) for r in cursor.fetchall()]
+
+    try:
+        works = db.cached(('search_works',) + search_key(keyword, selected_maker, selected_genre,
+                                                         show_duplicates_only, use_index), query)
     except sqlite3.Error as e:
         messagebox.showerror("DB 오류", f"데이터베이스 조회 중 오류 발생: {e}")
         return []
-    finally:
-        conn.close()
         
-    return [{'id': r[0], 'product_name': r[1], 'maker_name': r[2], 'file_path': r[3], 'genres': r[4] or "N/A"} for r in results]
+    return list(works)
+
+
+class ResultPager:
+    """
+    search_works와 같은 조건의 결과를 키셋 커서(페이지 앞 행의 정렬 키)로 page_size개씩 읽습니다.
+    OFFSET으로 앞 행을 다시 읽지 않고, 페이지 경계의 정렬 키만 기억해 두었다가 그 다음부터 읽습니다.
+    행 데이터는 최근에 읽은 페이지 몇 개만 보관하므로 결과가 아무리 많아도 메모리 사용량이 일정합니다.
+
+    conn을 주지 않으면 공유 읽기 연결(get_db().reader)을 씁니다. 다른 스레드에서 만든 pager를 넘겨받으면
+    conn 속성을 받은 쪽 스레드의 연결로 바꿔서 이어 읽습니다.
+    """
+
+    def __init__(self, keyword="", selected_maker="", selected_genre="", show_duplicates_only=False,
+                 use_index=True, page_size=RESULT_PAGE_SIZE, cached_pages=RESULT_CACHED_PAGES, conn=None):
+        self.page_size = page_size
+        self.cached_pages = cached_pages
+        self.conn = conn or get_db().reader
+        cursor = self.conn.cursor()
+        self.where, self.params, order_columns = _search_query_parts(
+            cursor, keyword, selected_maker, selected_genre, show_duplicates_only, use_index)
+        self.order_by = ', '.join(order_columns)
+        self.key_width = len(order_columns)
+        # 페이지 번호 → 그 페이지 바로 앞 행의 정렬 키 (0페이지는 None)
+        self.page_keys = {0: None}
+        self.pages = OrderedDict()
+        self.total = None
+
+    def _after(self, key):
+        """key 다음 행부터 읽는 WHERE 절과 파라미터를 돌려줍니다."""
+        if key is None:
+            return self.where, list(self.params)
+        placeholders = ', '.join('?' * self.key_width)
+        return f"{self.where} AND ({self.order_by}) > ({placeholders})", list(self.params) + list(key)
+
+    def count(self):
+        """조건에 맞는 전체 행 수 (한 번만 셉니다)"""
+        if self.total is None:
+            cursor = self.conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) {self.where}", self.params)
+            self.total = cursor.fetchone()[0]
+        return self.total
+
+    def _page_key(self, index):
+        """index 페이지 앞 행의 정렬 키를 찾습니다. 없으면 가장 가까운 앞 페이지에서 한 번에 건너뜁니다."""
+        if index in self.page_keys:
+            return self.page_keys[index]
+        known = max(i for i in self.page_keys if i < index)
+        where, params = self._after(self.page_keys[known])
+        cursor = self.conn.cursor()
+        # 정렬 키만 읽고 건너뛰므로 행 데이터(장르 등)는 만들지 않습니다.
+        cursor.execute(f"SELECT {self.order_by} {where} ORDER BY {self.order_by} LIMIT 1 OFFSET ?",
+                       params + [(index - known) * self.page_size - 1])
+        row = cursor.fetchone()
+        key = tuple(row) if row else None
+        if key is not None:
+            self.page_keys[index] = key
+        return key
+
+    def page(self, index):
+        """index 페이지의 (id, 작품명, 제작사) 목록"""
+        if index in self.pages:
+            self.pages.move_to_end(index)
+            return self.pages[index]
+        rows = []
+        if index == 0 or self._page_key(index) is not None:
+            where, params = self._after(self.page_keys[index])
+            cursor = self.conn.cursor()
+            cursor.execute(f"SELECT {_WORK_COLUMNS}, {self.order_by} {where} ORDER BY {self.order_by} LIMIT ?",
+                           params + [self.page_size])
+            rows = cursor.fetchall()
+            if len(rows) == self.page_size:
+                self.page_keys.setdefault(index + 1, tuple(rows[-1][-self.key_width:]))
+        # 행마다 dict를 만들지 않고 (id, 작품명, 제작사) 튜플만 보관합니다.
+        works = [r[:3] for r in rows]
+        self.pages[index] = works
+        if len(self.pages) > self.cached_pages:
+            self.pages.popitem(last=False)
+        return works
+
+    def rows(self, start, count):
+        """start번째 행부터 최대 count개의 (id, 작품명, 제작사) 목록"""
+        works = []
+        index = start // self.page_size
+        offset = start - index * self.page_size
+        while len(works) < count:
+            page = self.page(index)
+            works.extend(page[offset:offset + count - len(works)])
+            if len(page) < self.page_size:
+                break
+            index += 1
+            offset = 0
+        return works
+
+    def discard(self, file_ids):
+        """
+        삭제하거나 숨긴 행을 결과에서 뺍니다. 다시 검색하지 않고, 그 행이 들어 있던 가장 앞 페이지부터
+        뒤의 페이지와 경계만 버려서 다음에 읽을 때 그 페이지부터 다시 읽게 합니다.
+        """
+        file_ids = set(file_ids)
+        if not file_ids:
+            return
+        changed = [index for index, page in self.pages.items() if any(work[0] in file_ids for work in page)]
+        # 보관한 페이지에 없는 행이 섞여 있으면 위치를 알 수 없으므로 처음부터 다시 읽습니다.
+        found = sum(1 for page in self.pages.values() for work in page if work[0] in file_ids)
+        first = min(changed) if changed and found == len(file_ids) else 0
+        for index in [i for i in self.pages if i >= first]:
+            del self.pages[index]
+        self.page_keys = {i: key for i, key in self.page_keys.items() if i <= first}
+        if self.total is not None:
+            self.total = max(0, self.total - len(file_ids))
+
+    def copy(self):
+        """같은 결과를 따로 읽는 pager. 센 개수와 보관한 페이지를 함께 가져가므로 다시 조회하지 않습니다."""
+        pager = copy.copy(self)
+        pager.page_keys = dict(self.page_keys)
+        pager.pages = OrderedDict(self.pages)
+        return pager
+
+    def close(self):
+        """보관한 페이지를 버립니다. (연결은 공유하므로 닫지 않습니다)"""
+        self.pages.clear()
+
+
+class SearchWorker:
+    """
+    검색(ResultPager 생성, 전체 개수와 첫 페이지 조회)을 백그라운드 스레드 하나에서 실행합니다.
+    새 검색이 들어오면 진행 중인 오래된 조회는 Connection.interrupt()로 중단하고,
+    밀려 있는 요청은 마지막 것만 처리합니다. 결과는 (검색 번호, pager 또는 sqlite3.Error)로 results 큐에 넣습니다.
+    같은 조건(search_key)의 결과는 DB가 바뀌기 전까지 QueryCache에 두었다가 복사본을 돌려줍니다.
+    (초기화나 중복 보기를 껐다 켜는 것처럼 같은 검색을 반복할 때 SQLite를 다시 읽지 않습니다)
+    """
+
+    def __init__(self):
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.lock = threading.Lock()
+        self.active = None  # 조회 중인 검색 번호
+        # 이 스레드 전용 읽기 연결 (처음 검색할 때 엽니다)
+        self.conn = None
+        # 이 스레드 전용 인메모리 카탈로그 (USE_CATALOG이면 첫 검색 뒤 한가할 때 읽습니다)
+        self.catalog = None
+        self.cache = QueryCache('search')
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, generation, filters):
+        """filters: ResultPager에 넘길 (검색어, 제작사, 장르, 중복만 보기). generation은 계속 커지는 검색 번호입니다."""
+        self.requests.put((generation, filters))
+        with self.lock:
+            if self.active is not None and self.active < generation:
+                self.conn.interrupt()
+
+    def _run(self):
+        while True:
+            request = self.requests.get()
+            while True:
+                try:
+                    request = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+            generation, filters = request
+            result = self._search(generation, filters)
+            if result is not None:
+                self.results.put((generation, result))
+            if USE_CATALOG and self.catalog is None and self.conn is not None and self.requests.empty():
+                self._load_catalog()
+
+    def _load_catalog(self):
+        """카탈로그를 처음 읽습니다. (중간에 들어온 검색은 읽기가 끝난 뒤 처리합니다)"""
+        catalog = Catalog()
+        try:
+            with metrics.timer('search.catalog_load'):
+                catalog.load(self.conn)
+        except sqlite3.Error:
+            return
+        self.catalog = catalog
+
+    def _search(self, generation, filters):
+        try:
+            if self.conn is None:
+                # interrupt()는 UI 스레드에서 부르므로 check_same_thread를 끕니다.
+                self.conn = open_read_connection(DATABASE_FILE, check_same_thread=False)
+            with self.lock:
+                self.active = generation
+            if not self.requests.empty():
+                # 준비하는 사이에 새 검색이 들어왔습니다.
+                return None
+            result = self.cache.get(self.conn, search_key(*filters), lambda: self._query(filters))
+            # 화면에서 삭제한 행을 빼는 등 결과를 고치므로, 기억해 둔 결과 대신 복사본을 넘깁니다.
+            return result.copy()
+        except sqlite3.Error as e:
+            if isinstance(e, sqlite3.OperationalError) and str(e) == 'interrupted':
+                metrics.count('search.interrupted')
+                return None
+            return e
+        finally:
+            with self.lock:
+                self.active = None
+
+    def _query(self, filters):
+        keyword, maker, genre, duplicates_only = filters
+        if self.catalog is not None and not keyword and not duplicates_only:
+            # 제작사/장르 조건만 있으면 SQL 대신 카탈로그의 비트맵으로 거릅니다.
+            with metrics.timer('search.catalog'):
+                self.catalog.refresh(self.conn)
+                return CatalogResult(self.catalog, maker, genre_filter(genre))
+        with metrics.timer('search.query'):
+            pager = ResultPager(*filters, conn=self.conn)
+            pager.count()
+            pager.page(0)
+        return pager
+
+
+class CoverCache:
+    """
+    상세 정보 칸에 띄울 표지 이미지(PhotoImage)를 최근에 본 COVER_CACHE_SIZE개까지 들고 있는 LRU입니다.
+    DB와 표지 팩 파일(cover_pack.CoverPack)은 백그라운드 스레드에서 읽고(밀린 요청은 마지막 것만),
+    PhotoImage는 UI 스레드에서 만든 뒤 on_ready(file_id, 이미지 또는 None)를 부릅니다.
+    목록을 넘기는 동안 UI 스레드는 디스크를 기다리지 않습니다.
+    """
+
+    def __init__(self, root, on_ready, size=COVER_CACHE_SIZE):
+        self.root = root
+        self.on_ready = on_ready
+        self.size = size
+        self.images = OrderedDict()
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.waiting = None  # 표지를 기다리는 작품 id (가장 최근 요청)
+        self.poll_after_id = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def show(self, file_id):
+        """file_id의 표지를 on_ready로 넘깁니다. 캐시에 있으면 바로, 없으면 읽힌 뒤에 부릅니다."""
+        image = self.images.get(file_id)
+        if image is not None:
+            self.images.move_to_end(file_id)
+            metrics.count('cover.hit')
+            self.waiting = None
+            self.on_ready(file_id, image)
+            return
+        metrics.count('cover.miss')
+        self.waiting = file_id
+        self.requests.put(file_id)
+        if self.poll_after_id is None:
+            self.poll_after_id = self.root.after(COVER_POLL_MS, self.poll)
+
+    def forget(self, file_ids):
+        for file_id in file_ids:
+            self.images.pop(file_id, None)
+
+    def poll(self):
+        self.poll_after_id = None
+        while True:
+            try:
+                file_id, data, fmt = self.results.get_nowait()
+            except queue.Empty:
+                break
+            image = self._make_image(data, fmt) if data else None
+            if image is not None:
+                self.images[file_id] = image
+                self.images.move_to_end(file_id)
+                if len(self.images) > self.size:
+                    self.images.popitem(last=False)
+            if file_id == self.waiting:
+                self.waiting = None
+                self.on_ready(file_id, image)
+        if self.waiting is not None:
+            self.poll_after_id = self.root.after(COVER_POLL_MS, self.poll)
+
+    def _make_image(self, data, fmt):
+        """팩에서 읽은 bytes로 COVER_DISPLAY_SIZE에 맞춘 PhotoImage를 만듭니다. 보여 줄 수 없으면 None."""
+        try:
+            with metrics.timer('cover.decode'):
+                if fmt in ('png', 'gif'):
+                    image = tk.PhotoImage(master=self.root, data=base64.b64encode(data), format=fmt)
+                    factor = -(-max(image.width(), image.height()) // COVER_DISPLAY_SIZE)
+                    return image.subsample(factor) if factor > 1 else image
+                if ImageTk is not None:
+                    with Image.open(io.BytesIO(data)) as source:
+                        source.thumbnail((COVER_DISPLAY_SIZE, COVER_DISPLAY_SIZE))
+                        return ImageTk.PhotoImage(source, master=self.root)
+        except (tk.TclError, OSError, ValueError):
+            pass
+        return None
+
+    def _run(self):
+        conn = None
+        pack = CoverPack()
+        while True:
+            file_id = self.requests.get()
+            while True:
+                try:
+                    file_id = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+            data = fmt = None
+            try:
+                if conn is None:
+                    conn = open_read_connection(DATABASE_FILE)
+                with metrics.timer('cover.load'):
+                    row = conn.execute(QUERIES['cover'], (file_id,)).fetchone()
+                    if row:
+                        data, fmt = pack.read(row[0], row[1]), row[2]
+            except (sqlite3.Error, OSError):
+                pass
+            self.results.put((file_id, data, fmt))
 
 
 # --- 메인 애플리케이션 클래스 ---
 class LibraryApp:
-    def __init__(self, root):
+    def __init__(self, root, started=None):
         self.root = root
         self.root.title("My Game Library")
         self.root.geometry("800x700")
         self.works_data = []
+        # 화면에 보이는 행의 작품 id → works_data 안의 위치
+        self.row_positions = {}
+        # 가상 목록: Treeview에는 화면에 보이는 행만 넣고, 스크롤 위치(first_row)에 맞춰 pager에서 다시 채웁니다.
+        self.pager = None
+        self.first_row = 0
+        self.visible_rows = 30
+        self.current_selected_id = None
+        self.current_selected_path = None
+        # 여러 개 선택: 화면 밖으로 스크롤된 행의 선택도 id로 기억해 둡니다.
+        self.selected_ids = set()
+        # 백그라운드 검색: 요청할 때마다 search_generation을 올리고, 가장 최근 번호의 결과만 화면에 표시합니다.
+        self.search_worker = SearchWorker()
+        self.search_generation = 0
+        self.shown_generation = 0
+        self.search_started = 0.0
+        self.last_filters = None
+        self.search_after_id = None
+        self.poll_after_id = None
+        # 시작 측정: started(프로그램 시작 시각)부터 창이 처음 그려질 때(startup.first_frame)와
+        # 제작사/장르 목록과 첫 검색 결과가 모두 채워질 때(startup.interactive)까지
+        self.started = started or time.perf_counter()
+        self.startup_pending = {'filters', 'search'}
+        self.filter_results = queue.Queue()
         style = ttk.Style()
         style.configure("Delete.TButton", foreground="red", font=('맑은 고딕', 9, 'bold'))
 
@@ -125,7 +589,14 @@ class LibraryApp:
         ttk.Label(filter_frame, text="장르:").pack(side=tk.LEFT)
         self.genre_combo = ttk.Combobox(filter_frame, width=20, state='readonly')
         self.genre_combo.pack(side=tk.LEFT, padx=5)
-        self.populate_filters()
+        # 장르 여러 개(모두 포함/하나 이상/제외)를 고르면 genre_combo에는 MULTI_GENRE_TEXT가 표시됩니다.
+        self.genre_filter = None
+        genre_button = ttk.Button(filter_frame, text="여러 장르...", command=self.open_genre_filter)
+        genre_button.pack(side=tk.LEFT)
+        # 목록은 백그라운드에서 읽어 채우고, 그 전까지는 [전체]만 고를 수 있습니다.
+        self.populate_filters([], [])
+        self.maker_combo.set('[전체]')
+        self.genre_combo.set('[전체]')
         self.show_duplicates_var = tk.BooleanVar()
         duplicates_check = ttk.Checkbutton(filter_frame, text="중복 항목만 보기", variable=self.show_duplicates_var, command=self.perform_search)
         duplicates_check.pack(side=tk.LEFT, padx=15)
@@ -138,11 +609,28 @@ class LibraryApp:
         self.tree=ttk.Treeview(list_frame, columns=("ID","Title","Maker"), show="headings")
         self.tree.heading("ID",text="ID"); self.tree.heading("Title",text="작품명"); self.tree.heading("Maker",text="제작사")
         self.tree.column("ID",width=60,anchor='center'); self.tree.column("Title",width=400); self.tree.column("Maker",width=200)
-        scrollbar=ttk.Scrollbar(list_frame,orient=tk.VERTICAL,command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set); scrollbar.pack(side=tk.RIGHT,fill=tk.Y); self.tree.pack(side=tk.LEFT,fill=tk.BOTH,expand=True)
+        # 스크롤바는 Treeview가 아니라 전체 결과 수 기준의 가상 위치를 나타냅니다.
+        self.scrollbar=ttk.Scrollbar(list_frame,orient=tk.VERTICAL,command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT,fill=tk.Y); self.tree.pack(side=tk.LEFT,fill=tk.BOTH,expand=True)
+        self.tree.bind("<Configure>", self.on_tree_resize)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_rows(3))
+        self.tree.bind("<Up>", lambda event: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self.move_selection(-self.visible_rows))
+        self.tree.bind("<Next>", lambda event: self.move_selection(self.visible_rows))
         
         detail_frame = ttk.Frame(root, padding="10")
         detail_frame.pack(fill=tk.X)
+        # 표지 칸은 크기를 고정해 두어 표지가 있든 없든 옆의 글자가 움직이지 않습니다.
+        cover_frame = ttk.Frame(detail_frame, width=COVER_DISPLAY_SIZE, height=COVER_DISPLAY_SIZE)
+        cover_frame.pack(side=tk.LEFT, padx=(0, 10))
+        cover_frame.pack_propagate(False)
+        self.cover_label = ttk.Label(cover_frame, anchor='center')
+        self.cover_label.pack(fill=tk.BOTH, expand=True)
+        self.cover_image = None
+        self.covers = CoverCache(root, self.show_cover)
         self.detail_text = tk.Text(detail_frame, height=7, state='disabled', wrap='word', font=("맑은 고딕", 10))
         self.detail_text.pack(fill=tk.X, expand=True, side=tk.LEFT)
         
@@ -150,54 +638,256 @@ class LibraryApp:
         action_button_frame.pack(side=tk.RIGHT, padx=10)
         open_folder_button = ttk.Button(action_button_frame, text="폴더 열기", command=self.open_file_location)
         open_folder_button.pack(fill=tk.X, ipady=5)
-        delete_button = ttk.Button(action_button_frame, text="파일 삭제", command=self.delete_selected_item, style="Delete.TButton")
+        delete_button = ttk.Button(action_button_frame, text="파일 삭제", command=self.delete_selected_items, style="Delete.TButton")
         delete_button.pack(fill=tk.X, ipady=5, pady=(10,0))
         
         self.tree.bind("<<TreeviewSelect>>", self.on_item_select)
         self.search_entry.bind("<Return>", lambda event: self.perform_search())
+        self.search_entry.bind("<KeyRelease>", self.schedule_search)
+        self.maker_combo.bind("<<ComboboxSelected>>", self.schedule_search)
+        self.genre_combo.bind("<<ComboboxSelected>>", self.schedule_search)
+        # 창을 먼저 띄우고, 제작사/장르 목록과 첫 검색은 백그라운드 스레드에서 읽습니다.
+        self.root.bind("<Map>", self.on_first_map, add='+')
+        threading.Thread(target=self._load_filters, daemon=True).start()
+        self.root.after(SEARCH_POLL_MS, self.poll_filters)
         self.perform_search()
 
-    def populate_filters(self):
-        makers = get_all_makers()
-        genres = get_all_genres()
+    def populate_filters(self, makers, genres):
         self.maker_combo['values'] = ['[전체]'] + makers
-        self.maker_combo.set('[전체]')
         self.genre_combo['values'] = ['[전체]'] + genres
-        self.genre_combo.set('[전체]')
+
+    def _load_filters(self):
+        """(백그라운드 스레드) 제작사/장르 목록을 자기 연결로 읽어 filter_results에 넣습니다."""
+        try:
+            conn = open_read_connection(DATABASE_FILE)
+            try:
+                self.filter_results.put(load_filter_lists(conn))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.filter_results.put(e)
+
+    def poll_filters(self):
+        try:
+            result = self.filter_results.get_nowait()
+        except queue.Empty:
+            self.root.after(SEARCH_POLL_MS, self.poll_filters)
+            return
+        if isinstance(result, sqlite3.Error):
+            messagebox.showerror("DB 오류", f"제작사/장르 목록을 읽는 중 오류 발생: {result}")
+        else:
+            self.populate_filters(*result)
+        self.startup_step_done('filters')
+
+    def on_first_map(self, event):
+        if event.widget is not self.root:
+            return
+        self.root.unbind("<Map>")
+        metrics.add_time('startup.first_frame', time.perf_counter() - self.started)
+
+    def startup_step_done(self, step):
+        """시작할 때 백그라운드로 읽는 것이 모두 끝나면 startup.interactive를 기록합니다."""
+        if step not in self.startup_pending:
+            return
+        self.startup_pending.discard(step)
+        if not self.startup_pending:
+            metrics.add_time('startup.interactive', time.perf_counter() - self.started)
+
+    def current_filters(self):
+        genre = self.genre_combo.get()
+        if genre == MULTI_GENRE_TEXT:
+            genre = self.genre_filter
+        return (self.search_entry.get(), self.maker_combo.get(), genre, self.show_duplicates_var.get())
+
+    def open_genre_filter(self):
+        genres = list(self.genre_combo['values'])[1:]
+        current = self.genre_filter if self.genre_combo.get() == MULTI_GENRE_TEXT else genre_filter(self.genre_combo.get())
+        GenreFilterWindow(self.root, genres, current, self.apply_genre_filter)
+
+    def apply_genre_filter(self, genres):
+        """GenreFilterWindow에서 고른 조건으로 검색합니다. 장르 하나만 포함이면 콤보에서 고른 것과 같게 표시합니다."""
+        self.genre_filter = genres
+        if genres is None:
+            self.genre_combo.set('[전체]')
+        elif len(genres.all) == 1 and not genres.any and not genres.none:
+            self.genre_combo.set(genres.all[0])
+        else:
+            self.genre_combo.set(MULTI_GENRE_TEXT)
+        self.perform_search()
+
+    def schedule_search(self, event=None):
+        """입력 중에는 검색하지 않고, 마지막 입력 후 SEARCH_DEBOUNCE_MS가 지나면 검색합니다."""
+        if self.search_after_id:
+            self.root.after_cancel(self.search_after_id)
+            self.search_after_id = None
+        if self.current_filters() != self.last_filters:
+            self.search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.perform_search)
 
     def perform_search(self):
-        keyword = self.search_entry.get()
-        selected_maker = self.maker_combo.get()
-        selected_genre = self.genre_combo.get()
-        show_duplicates = self.show_duplicates_var.get()
-        self.works_data = search_works(keyword, selected_maker, selected_genre, show_duplicates)
-        
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        for work in self.works_data:
-            self.tree.insert("", "end", values=(work['id'], work['product_name'], work['maker_name']))
-            
+        """현재 조건으로 백그라운드 검색을 시작합니다. 결과는 poll_search_results가 받아 표시합니다."""
+        if self.search_after_id:
+            self.root.after_cancel(self.search_after_id)
+            self.search_after_id = None
+        if not os.path.exists(DATABASE_FILE):
+            messagebox.showerror("오류", f"'{DATABASE_FILE}'를 찾을 수 없습니다.")
+            return
+        self.last_filters = self.current_filters()
+        self.search_generation += 1
+        self.search_started = time.perf_counter()
+        self.search_worker.submit(self.search_generation, self.last_filters)
+        if self.poll_after_id is None:
+            self.poll_after_id = self.root.after(SEARCH_POLL_MS, self.poll_search_results)
+
+    def poll_search_results(self):
+        self.poll_after_id = None
+        latest = None
+        while True:
+            try:
+                generation, result = self.search_worker.results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.search_generation:
+                latest = result
+            elif not isinstance(result, sqlite3.Error):
+                result.close()
+        if latest is not None:
+            self.shown_generation = self.search_generation
+            self.show_search_result(latest)
+            # 검색 시작부터 결과가 화면에 그려질 때까지 (디바운스 대기는 제외)
+            metrics.add_time('search.to_screen', time.perf_counter() - self.search_started)
+            self.startup_step_done('search')
+        if self.shown_generation < self.search_generation:
+            self.poll_after_id = self.root.after(SEARCH_POLL_MS, self.poll_search_results)
+
+    def show_search_result(self, result):
+        if isinstance(result, sqlite3.Error):
+            messagebox.showerror("DB 오류", f"데이터베이스 조회 중 오류 발생: {result}")
+            return
+        if self.pager:
+            self.pager.close()
+        # 다음 페이지부터는 UI 스레드의 공유 읽기 연결로 읽습니다.
+        result.conn = get_db().reader
+        self.pager = result
+        self.first_row = 0
+        self.selected_ids.clear()
+        self.current_selected_id = None
+        self.current_selected_path = None
+        self.render_rows()
         self.detail_text.config(state='normal')
         self.detail_text.delete(1.0, tk.END)
         self.detail_text.config(state='disabled')
+        self.show_cover(None, None)
+
+    def render_rows(self):
+        """first_row부터 화면에 보이는 만큼만 Treeview에 넣고 스크롤바 위치를 맞춥니다."""
+        with metrics.timer('ui.render'):
+            self._render_rows()
+
+    def _render_rows(self):
+        total = self.pager.count() if self.pager else 0
+        self.first_row = max(0, min(self.first_row, total - self.visible_rows))
+        self.works_data = self.pager.rows(self.first_row, self.visible_rows) if self.pager else []
+        self.row_positions = {work[0]: i for i, work in enumerate(self.works_data)}
+
+        # 계속 보이는 행은 그대로 두고, 사라진 행만 지우고 새로 보이는 행만 넣습니다.
+        stale = [item for item in self.tree.get_children() if int(item) not in self.row_positions]
+        if stale:
+            self.tree.delete(*stale)
+        for index, work in enumerate(self.works_data):
+            if self.tree.exists(work[0]):
+                self.tree.move(work[0], "", index)
+            else:
+                self.tree.insert("", index, iid=work[0], values=work)
+        selected = [work[0] for work in self.works_data if work[0] in self.selected_ids]
+        if selected != [int(item) for item in self.tree.selection()]:
+            self.tree.selection_set(selected)
+        if self.current_selected_id is not None and self.tree.exists(self.current_selected_id):
+            self.tree.focus(self.current_selected_id)
+
+        if total:
+            self.scrollbar.set(self.first_row / total, min(1.0, (self.first_row + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_rows(self, delta):
+        self.scroll_to(self.first_row + delta)
+        return "break"
+
+    def scroll_to(self, first_row):
+        total = self.pager.count() if self.pager else 0
+        first_row = max(0, min(first_row, total - self.visible_rows))
+        if first_row != self.first_row:
+            self.first_row = first_row
+            self.render_rows()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            total = self.pager.count() if self.pager else 0
+            self.scroll_to(int(float(amount) * total))
+        elif action == 'scroll':
+            step = self.visible_rows if unit == 'pages' else 1
+            self.scroll_to(self.first_row + int(amount) * step)
+
+    def on_mousewheel(self, event):
+        # Windows는 한 칸에 120, macOS는 1 단위로 delta가 들어옵니다.
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll_rows(-3 * steps)
+
+    def on_tree_resize(self, event):
+        """창 크기가 바뀌면 화면에 들어가는 행 수를 다시 계산합니다."""
+        children = self.tree.get_children()
+        bbox = self.tree.bbox(children[0]) if children else None
+        if not bbox:
+            return
+        header_height, row_height = bbox[1], bbox[3]
+        visible_rows = max(1, (event.height - header_height) // row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.render_rows()
+
+    def move_selection(self, delta):
+        """방향키/PageUp/PageDown: 선택을 옮기고, 화면 밖으로 나가면 목록을 스크롤합니다."""
+        if not self.works_data:
+            return "break"
+        focus = self.tree.focus()
+        position = self.first_row + (self.row_positions.get(int(focus), 0) if focus else 0)
+        total = self.pager.count()
+        target = max(0, min(position + delta, total - 1))
+        if target < self.first_row:
+            self.first_row = target
+        elif target >= self.first_row + self.visible_rows:
+            self.first_row = target - self.visible_rows + 1
+        self.current_selected_id = None
+        self.selected_ids.clear()
+        self.render_rows()
+        work_id = self.works_data[target - self.first_row][0]
+        self.tree.selection_set(work_id)
+        self.tree.focus(work_id)
+        return "break"
 
     def clear_filters(self):
         self.search_entry.delete(0, tk.END)
         self.maker_combo.set('[전체]')
         self.genre_combo.set('[전체]')
+        self.genre_filter = None
         self.show_duplicates_var.set(False)
         self.perform_search()
 
     def on_item_select(self, event):
         selected_items = self.tree.selection()
+        # 화면에 보이는 행의 선택만 바꾸고, 화면 밖 행의 선택은 그대로 둡니다.
+        self.selected_ids = (self.selected_ids - set(self.row_positions)) | {int(item) for item in selected_items}
         if not selected_items:
             return
         
-        selected_item_id = self.tree.item(selected_items[0])['values'][0]
-        selected_work = next((w for w in self.works_data if w['id'] == selected_item_id), None)
+        selected_item_id = int(selected_items[0])
+        selected_work = None
+        if selected_item_id in self.row_positions:
+            # 장르와 경로는 선택한 작품만 읽고, 최근에 본 작품은 캐시에서 가져옵니다.
+            selected_work = get_db().work_details(selected_item_id)
         
         if selected_work:
-            self.current_selected_id = selected_work['id']
+            self.current_selected_id = selected_item_id
             self.current_selected_path = selected_work['file_path']
             original_filename = os.path.basename(self.current_selected_path)
             info = (f"▪️ 작품명: {selected_work['product_name']}\n"
@@ -205,14 +895,28 @@ class LibraryApp:
                     f"▪️ 장르: {selected_work['genres']}\n"
                     f"▪️ 원본 파일명: {original_filename}\n"
                     f"▪️ 전체 경로: {self.current_selected_path}")
+            if len(self.selected_ids) > 1:
+                info = f"▪️ 선택한 항목: {len(self.selected_ids)}개 (삭제는 선택한 항목 전체에 적용됩니다)\n" + info
             self.detail_text.config(state='normal')
             self.detail_text.delete(1.0, tk.END)
             self.detail_text.insert(tk.END, info)
             self.detail_text.config(state='disabled')
+            # 표지는 백그라운드에서 읽히면 show_cover로 들어옵니다. (최근에 본 표지는 바로)
+            self.show_cover(None, None)
+            self.covers.show(selected_item_id)
         else:
             self.current_selected_id = None
             self.current_selected_path = None
 
+    def show_cover(self, file_id, image):
+        """선택한 작품의 표지를 보여 줍니다. file_id가 None이면 표지 칸을 비웁니다."""
+        if file_id is not None and file_id != self.current_selected_id:
+            return
+        # 표지가 LRU에서 밀려나도 화면에 보이는 동안은 지워지지 않도록 참조를 들고 있습니다.
+        self.cover_image = image
+        text = "표지 없음" if file_id is not None and image is None else ""
+        self.cover_label.config(image=image or '', text=text)
+
     def open_file_location(self):
         try:
             path = self.current_selected_path
@@ -229,45 +933,230 @@ class LibraryApp:
         except AttributeError:
             messagebox.showwarning("경고", "먼저 목록에서 항목을 선택해주세요.")
 
-    def delete_selected_item(self):
-        try:
-            file_id_to_delete = self.current_selected_id
-            file_path_to_delete = self.current_selected_path
-        except AttributeError:
+    def delete_selected_items(self):
+        """선택한 작품(여러 개 가능)의 파일을 지우고, 지운 것만 목록에서 뺍니다."""
+        file_ids = sorted(self.selected_ids)
+        if not file_ids:
             messagebox.showwarning("선택 오류", "삭제할 항목을 선택해주세요.")
             return
+        files = get_db().file_paths(file_ids)
+        if not confirm_delete(files):
+            return
+        DeleteProgressWindow(self.root, files, self.remove_rows)
 
-        if not file_id_to_delete:
-            messagebox.showwarning("선택 오류", "삭제할 항목을 선택해주세요.")
+    def remove_rows(self, file_ids):
+        """삭제한 작품을 다시 검색하지 않고 목록에서 뺍니다."""
+        if not file_ids:
             return
+        self.selected_ids.difference_update(file_ids)
+        self.covers.forget(file_ids)
+        if self.current_selected_id in file_ids:
+            self.current_selected_id = None
+            self.current_selected_path = None
+            self.detail_text.config(state='normal')
+            self.detail_text.delete(1.0, tk.END)
+            self.detail_text.config(state='disabled')
+            self.show_cover(None, None)
+        if self.pager:
+            self.pager.discard(file_ids)
+        self.render_rows()
+
+    def open_duplicate_manager(self):
+        manager_window = DuplicateManagerWindow(self.root)
+        self.root.wait_window(manager_window.top)
+        self.perform_search()
+
+
+# --- 여러 장르 선택 창 클래스 ---
+MULTI_GENRE_TEXT = '[여러 장르]'
+GENRE_MODE_TEXT = {'all': "모두 포함", 'any': "하나 이상", 'none': "제외"}
+GENRE_MODE_ORDER = [None, 'all', 'any', 'none']
+
+class GenreFilterWindow:
+    """
+    여러 장르의 조건을 고르는 창입니다. 장르마다 모두 포함(AND), 하나 이상(OR), 제외(NOT) 중 하나를 정하며,
+    더블클릭하면 조건이 차례로 바뀝니다. 적용하면 on_apply(GenreFilter 또는 None)를 부릅니다.
+    """
+
+    def __init__(self, parent, genres, current, on_apply):
+        self.genres = genres
+        self.on_apply = on_apply
+        # 장르 이름 → 'all' / 'any' / 'none'
+        self.modes = {}
+        if current:
+            for mode in ('all', 'any', 'none'):
+                for genre in getattr(current, mode):
+                    self.modes[genre] = mode
 
-        if not messagebox.askyesno("영구 삭제 확인", f"정말로 파일을 영구적으로 삭제하시겠습니까?\n\n- 파일명: {os.path.basename(file_path_to_delete)}\n\n이 작업은 되돌릴 수 없습니다.", icon='warning'):
+        self.top = tk.Toplevel(parent)
+        self.top.title("장르 여러 개 선택")
+        self.top.geometry("420x520")
+        self.top.transient(parent)
+
+        search_frame = ttk.Frame(self.top, padding="10 10 10 0")
+        search_frame.pack(fill=tk.X)
+        ttk.Label(search_frame, text="장르 찾기:").pack(side=tk.LEFT)
+        self.search_entry = ttk.Entry(search_frame)
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        self.search_entry.bind("<KeyRelease>", lambda event: self.fill())
+
+        list_frame = ttk.Frame(self.top, padding=10)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(list_frame, columns=("Genre", "Mode"), show="headings")
+        self.tree.heading("Genre", text="장르")
+        self.tree.heading("Mode", text="조건")
+        self.tree.column("Genre", width=250)
+        self.tree.column("Mode", width=100, anchor='center')
+        self.tree.tag_configure('all', foreground='blue')
+        self.tree.tag_configure('any', foreground='green')
+        self.tree.tag_configure('none', foreground='red')
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.tree.bind("<Double-1>", self.cycle_mode)
+
+        mode_frame = ttk.Frame(self.top, padding="10 0 10 0")
+        mode_frame.pack(fill=tk.X)
+        for mode, text in GENRE_MODE_TEXT.items():
+            ttk.Button(mode_frame, text=text, command=lambda m=mode: self.set_mode(m)).pack(side=tk.LEFT)
+        ttk.Button(mode_frame, text="해제", command=lambda: self.set_mode(None)).pack(side=tk.LEFT, padx=(5, 0))
+
+        action_frame = ttk.Frame(self.top, padding=10)
+        action_frame.pack(fill=tk.X)
+        ttk.Button(action_frame, text="취소", command=self.top.destroy).pack(side=tk.RIGHT)
+        ttk.Button(action_frame, text="적용", command=self.apply).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(action_frame, text="모두 해제", command=self.clear).pack(side=tk.LEFT)
+        self.fill()
+
+    def fill(self):
+        """찾기 칸의 글자가 들어간 장르만 보여 줍니다."""
+        text = self.search_entry.get().strip().casefold()
+        self.tree.delete(*self.tree.get_children())
+        for index, genre in enumerate(self.genres):
+            if text and text not in genre.casefold():
+                continue
+            self.tree.insert("", "end", iid=str(index), values=(genre, ""))
+            self.show_mode(str(index))
+
+    def show_mode(self, item):
+        genre = self.genres[int(item)]
+        mode = self.modes.get(genre)
+        self.tree.item(item, values=(genre, GENRE_MODE_TEXT.get(mode, "")), tags=(mode,) if mode else ())
+
+    def set_mode(self, mode):
+        for item in self.tree.selection():
+            genre = self.genres[int(item)]
+            if mode:
+                self.modes[genre] = mode
+            else:
+                self.modes.pop(genre, None)
+            self.show_mode(item)
+
+    def cycle_mode(self, event):
+        item = self.tree.identify_row(event.y)
+        if not item:
             return
+        genre = self.genres[int(item)]
+        mode = GENRE_MODE_ORDER[(GENRE_MODE_ORDER.index(self.modes.get(genre)) + 1) % len(GENRE_MODE_ORDER)]
+        if mode:
+            self.modes[genre] = mode
+        else:
+            self.modes.pop(genre, None)
+        self.show_mode(item)
+
+    def clear(self):
+        self.modes.clear()
+        for item in self.tree.get_children():
+            self.show_mode(item)
+
+    def apply(self):
+        genres = GenreFilter(*(tuple(sorted(genre for genre, m in self.modes.items() if m == mode))
+                               for mode in ('all', 'any', 'none')))
+        self.top.destroy()
+        self.on_apply(genre_filter(genres))
+
+
+def confirm_delete(files, parent=None):
+    """{id: 경로}의 파일을 영구 삭제할지 묻습니다."""
+    names = [os.path.basename(path) for path in files.values()]
+    listed = "\n".join(f"- {name}" for name in names[:10])
+    if len(names) > 10:
+        listed += f"\n... 외 {len(names) - 10}개"
+    return messagebox.askyesno(
+        "영구 삭제 확인",
+        f"정말로 파일 {len(names)}개를 영구적으로 삭제하시겠습니까?\n\n{listed}\n\n이 작업은 되돌릴 수 없습니다.",
+        icon='warning', parent=parent)
+
+
+class DeleteProgressWindow:
+    """
+    {id: 경로}의 파일을 백그라운드 스레드(remove_files_from_disk)에서 지우며 진행 상황을 보여 주는 창입니다.
+    끝나면 디스크에서 지운 파일의 DB 레코드를 UI 스레드에서 한 트랜잭션으로 삭제하고 on_done(지운 id 목록)을 부릅니다.
+    """
+
+    def __init__(self, parent, files, on_done):
+        self.files = files
+        self.on_done = on_done
+        self.progress = queue.Queue()
+        self.result = None
+        self.top = tk.Toplevel(parent)
+        self.top.title("파일 삭제 중")
+        self.top.transient(parent)
+        # 끝날 때까지 창을 닫거나 다른 창을 조작하지 않게 합니다.
+        self.top.protocol("WM_DELETE_WINDOW", lambda: None)
+        self.top.grab_set()
+        self.label = ttk.Label(self.top, text=f"0 / {len(files)}", padding=10)
+        self.label.pack()
+        self.bar = ttk.Progressbar(self.top, length=300, maximum=max(1, len(files)))
+        self.bar.pack(padx=10, pady=(0, 10))
+        threading.Thread(target=self._run, daemon=True).start()
+        self.top.after(PROGRESS_POLL_MS, self.poll)
 
+    def _run(self):
         try:
-            if os.path.exists(file_path_to_delete):
-                os.remove(file_path_to_delete)
+            self.result = remove_files_from_disk(self.files, progress=lambda done, total: self.progress.put(done))
+        finally:
+            self.progress.put(None)
+
+    def poll(self):
+        finished = False
+        done = None
+        while True:
+            try:
+                item = self.progress.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                finished = True
             else:
-                messagebox.showinfo("정보", "원본 파일이 이미 없습니다. DB만 삭제합니다.")
-        except OSError as e:
-            messagebox.showerror("파일 삭제 오류", f"파일 삭제 중 오류 발생:\n{e}")
+                done = item
+        if done is not None:
+            self.bar['value'] = done
+            self.label.config(text=f"{done} / {len(self.files)}")
+        if not finished:
+            self.top.after(PROGRESS_POLL_MS, self.poll)
             return
 
-        success, message = delete_record_from_db(file_id_to_delete)
-        if success:
-            messagebox.showinfo("삭제 완료", "성공적으로 삭제되었습니다.")
-        else:
-            messagebox.showerror("DB 삭제 오류", message)
-        
-        self.perform_search()
-
-    def open_duplicate_manager(self):
-        manager_window = DuplicateManagerWindow(self.root)
-        self.root.wait_window(manager_window.top)
-        self.perform_search()
+        removed, errors = self.result or ([], [])
+        success, message = delete_records_from_db(removed) if removed else (True, "")
+        parent = self.top.master
+        self.top.grab_release()
+        self.top.destroy()
+        if not success:
+            messagebox.showerror("DB 삭제 오류", message, parent=parent)
+            removed = []
+        if errors:
+            listed = "\n".join(f"- {os.path.basename(path)}: {e}" for _, path, e in errors[:10])
+            messagebox.showerror("파일 삭제 오류", f"파일 {len(errors)}개를 삭제하지 못했습니다:\n{listed}", parent=parent)
+        elif removed:
+            messagebox.showinfo("삭제 완료", f"{len(removed)}개 파일을 삭제했습니다.", parent=parent)
+        self.on_done(removed)
 
 
 # --- 중복 관리 창 클래스 ---
+GROUP_KIND_TEXT = {'title': "작품명", 'key': "품번", 'content': "내용"}
+
 class DuplicateManagerWindow:
     def __init__(self, parent):
         self.top = tk.Toplevel(parent)
@@ -277,9 +1166,11 @@ class DuplicateManagerWindow:
         left_frame = ttk.Frame(self.top, padding=10)
         left_frame.pack(side=tk.LEFT, fill=tk.Y)
         ttk.Label(left_frame, text="중복된 작품 목록").pack(anchor='w')
-        self.dup_tree = ttk.Treeview(left_frame, columns=("Name", "Count"), show="headings")
+        self.dup_tree = ttk.Treeview(left_frame, columns=("Kind", "Name", "Count"), show="headings")
+        self.dup_tree.heading("Kind", text="기준")
         self.dup_tree.heading("Name", text="작품명")
         self.dup_tree.heading("Count", text="개수")
+        self.dup_tree.column("Kind", width=60, anchor='center')
         self.dup_tree.column("Name", width=250)
         self.dup_tree.column("Count", width=50, anchor='center')
         self.dup_tree.pack(fill=tk.BOTH, expand=True)
@@ -288,12 +1179,14 @@ class DuplicateManagerWindow:
         right_frame = ttk.Frame(self.top, padding=10)
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         ttk.Label(right_frame, text="파일 상세 정보").pack(anchor='w')
-        self.file_tree = ttk.Treeview(right_frame, columns=("ID", "Status", "Path"), show="headings")
+        self.file_tree = ttk.Treeview(right_frame, columns=("ID", "Status", "Hash", "Path"), show="headings")
         self.file_tree.heading("ID", text="ID")
         self.file_tree.heading("Status", text="상태")
+        self.file_tree.heading("Hash", text="내용")
         self.file_tree.heading("Path", text="파일 경로")
         self.file_tree.column("ID", width=50, anchor='center')
         self.file_tree.column("Status", width=80, anchor='center')
+        self.file_tree.column("Hash", width=80, anchor='center')
         self.file_tree.column("Path", width=400)
         self.file_tree.tag_configure('hidden', foreground='gray')
         self.file_tree.pack(fill=tk.BOTH, expand=True)
@@ -302,73 +1195,114 @@ class DuplicateManagerWindow:
         action_frame.pack(fill=tk.X)
         self.toggle_button = ttk.Button(action_frame, text="상태 변경 (보임/숨김)", command=self.toggle_hide_status, state='disabled')
         self.toggle_button.pack(side=tk.LEFT)
+        self.delete_button = ttk.Button(action_frame, text="파일 삭제", command=self.delete_selected_files,
+                                        style="Delete.TButton", state='disabled')
+        self.delete_button.pack(side=tk.LEFT, padx=5)
         
+        # dup_tree 항목 id → (kind, group_key)
+        self.groups = {}
+        self.current_group = None
+        # file_tree에 있는 파일 id → 숨김 여부 (상태 변경 때 다시 읽지 않습니다)
+        self.file_status = {}
         self.load_duplicate_groups()
 
     def load_duplicate_groups(self):
+        """중복 묶음 테이블에서 파일이 2개 이상인 묶음만 읽습니다. (라이브러리 전체를 묶지 않습니다)"""
         for i in self.dup_tree.get_children():
             self.dup_tree.delete(i)
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-        cursor.execute("SELECT product_name, COUNT(id) FROM files WHERE scraped_status=1 GROUP BY product_name HAVING COUNT(id) > 1 ORDER BY product_name")
-        for row in cursor.fetchall():
-            self.dup_tree.insert("", "end", values=row)
-        conn.close()
+        self.groups = {}
+        for kind, group_key, count, name in get_db().fetch_all('duplicate_groups'):
+            kind_text = GROUP_KIND_TEXT.get(kind, kind)
+            item = self.dup_tree.insert("", "end", values=(kind_text, name or group_key, count))
+            self.groups[item] = (kind, group_key)
 
     def on_group_select(self, event):
         selected_items = self.dup_tree.selection()
         if not selected_items:
             return
         
-        product_name = self.dup_tree.item(selected_items[0])['values'][0]
+        self.current_group = selected_items[0]
+        kind, group_key = self.groups[self.current_group]
         
-        for i in self.file_tree.get_children():
-            self.file_tree.delete(i)
+        self.file_tree.delete(*self.file_tree.get_children())
+        self.file_status = {}
             
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, is_hidden, file_path FROM files WHERE product_name = ? ORDER BY is_hidden, file_path", (product_name,))
-        for row in cursor.fetchall():
-            file_id, is_hidden, file_path = row
+        for row in get_db().fetch_all(f'duplicate_files_by_{kind}', (group_key,)):
+            file_id, is_hidden, file_path, content_hash = row
+            self.file_status[file_id] = bool(is_hidden)
             status_text = "숨김" if is_hidden else "보임"
+            # 같은 작품명이라도 내용 해시가 다르면 다른 버전입니다. (해시가 없으면 아직 비교하지 않은 파일)
+            hash_text = content_hash[:8] if content_hash else "-"
             tags = ('hidden',) if is_hidden else ()
-            self.file_tree.insert("", "end", iid=file_id, values=(file_id, status_text, file_path), tags=tags)
-        conn.close()
+            self.file_tree.insert("", "end", iid=file_id, values=(file_id, status_text, hash_text, file_path), tags=tags)
         self.toggle_button.config(state='normal')
+        self.delete_button.config(state='normal')
 
     def toggle_hide_status(self):
+        """선택한 파일(여러 개 가능)의 보임/숨김을 각각 바꿉니다. 한 트랜잭션으로 기록하고 그 행만 다시 그립니다."""
         selected_items = self.file_tree.selection()
         if not selected_items:
             messagebox.showwarning("선택 오류", "상태를 변경할 파일을 선택해주세요.", parent=self.top)
             return
-        
-        file_id = selected_items[0]
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-        cursor.execute("SELECT is_hidden FROM files WHERE id = ?", (file_id,))
-        current_status = cursor.fetchone()[0]
-        
-        new_status = 1 - current_status
-        
-        cursor.execute("UPDATE files SET is_hidden = ? WHERE id = ?", (new_status, file_id))
-        conn.commit()
-        conn.close()
 
-        # 목록을 다시 로드하여 변경사항을 즉시 반영
-        # on_group_select를 직접 호출하면 선택이 풀리는 문제가 있을 수 있으므로,
-        # 선택된 그룹을 기억했다가 다시 로드하는 것이 더 안정적입니다.
-        selected_group = self.dup_tree.selection()
-        self.on_group_select(None)
-        if selected_group:
-            self.dup_tree.selection_set(selected_group)
+        statuses = {int(item): not self.file_status[int(item)] for item in selected_items}
+        success, message = set_hidden_many(statuses)
+        if not success:
+            messagebox.showerror("DB 오류", message, parent=self.top)
+            return
+        for file_id, is_hidden in statuses.items():
+            self.file_status[file_id] = is_hidden
+            values = list(self.file_tree.item(file_id, 'values'))
+            values[1] = "숨김" if is_hidden else "보임"
+            self.file_tree.item(file_id, values=values, tags=('hidden',) if is_hidden else ())
+
+    def delete_selected_files(self):
+        """선택한 파일(여러 개 가능)을 지우고, 지운 행만 목록에서 뺍니다."""
+        selected_items = self.file_tree.selection()
+        if not selected_items:
+            messagebox.showwarning("선택 오류", "삭제할 파일을 선택해주세요.", parent=self.top)
+            return
+        files = {int(item): self.file_tree.item(item, 'values')[3] for item in selected_items}
+        if not confirm_delete(files, parent=self.top):
+            return
+        DeleteProgressWindow(self.top, files, self.remove_file_rows)
+
+    def remove_file_rows(self, file_ids):
+        """지운 파일의 행을 빼고 묶음의 파일 수를 고칩니다. 2개 미만이 된 묶음은 목록에서 뺍니다."""
+        file_ids = [file_id for file_id in file_ids if self.file_tree.exists(file_id)]
+        if not file_ids:
+            return
+        self.file_tree.delete(*file_ids)
+        for file_id in file_ids:
+            self.file_status.pop(file_id, None)
+        group = self.current_group
+        if group is None or not self.dup_tree.exists(group):
+            return
+        kind_text, name, count = self.dup_tree.item(group, 'values')
+        count = int(count) - len(file_ids)
+        if count < 2:
+            self.dup_tree.delete(group)
+            self.groups.pop(group, None)
+            self.current_group = None
+            self.file_tree.delete(*self.file_tree.get_children())
+            self.file_status = {}
+            self.toggle_button.config(state='disabled')
+            self.delete_button.config(state='disabled')
+        else:
+            self.dup_tree.item(group, values=(kind_text, name, count))
 
 
 # --- 애플리케이션 실행 ---
 if __name__ == "__main__":
+    # --metrics[=파일.json]: 종료할 때 검색/화면 갱신 시간 요약 출력, --profile[=파일.prof]: cProfile 결과 저장
+    started = time.perf_counter()
+    metrics_module.configure(name='library_app')
     if not os.path.exists(DATABASE_FILE):
         messagebox.showerror("오류", f"데이터베이스 파일 '{DATABASE_FILE}'를 찾을 수 없습니다.")
     else:
+        # 스키마가 최신이면 user_version만 확인하고 바로 돌아옵니다.
         setup_database()
         root = tk.Tk()
-        app = LibraryApp(root)
-        root.mainloop()
\ No newline at end of file
+        app = LibraryApp(root, started)
+        root.mainloop()
+        metrics_module.finish('library_app')
\ No newline at end of file
@@ -0,0 +1,216 @@
+import sqlite3
+from collections import OrderedDict
+
+import db_schema
+from metrics import metrics
+
+# --- 설정 ---
+# 읽기 전용 연결: DB 파일을 메모리 매핑으로 읽고, 페이지 캐시를 넉넉히 잡습니다.
+READ_MMAP_SIZE = 256 * 1024 * 1024   # 256MB
+READ_CACHE_SIZE_KB = 64 * 1024       # 64MB (cache_size에는 음수로 넣어 KB 단위로 지정)
+# 연결마다 준비(prepare)해 둔 SQL 문을 이 개수까지 재사용합니다.
+STATEMENT_CACHE_SIZE = 256
+# 상세 정보(경로, 장르)를 최근에 조회한 작품 몇 개까지 메모리에 둘지
+DETAIL_CACHE_SIZE = 256
+# 같은 조건으로 다시 한 검색과 제작사/장르 목록을 이 개수까지 기억합니다. (DB가 바뀌면 모두 버립니다)
+QUERY_CACHE_SIZE = 64
+
+# 라이브러리 앱에서 쓰는 조회/변경 SQL. 항상 같은 문자열로 실행되므로 연결의 문장 캐시에서 재사용됩니다.
+QUERIES = {
+    # 제작사 목록은 files 전체 대신 요약 테이블(filter_summary.MAKER_TABLE)에서 읽습니다.
+    'makers': "SELECT name FROM maker_counts ORDER BY name",
+    'genres': "SELECT name FROM genres ORDER BY name",
+    # 중복 묶음은 dup_groups(중복 묶음 테이블)에서 읽고, 표시할 작품명은 묶음마다 인덱스로 하나만 찾습니다.
+    'duplicate_groups': """SELECT d.kind, d.group_key, d.file_count,
+                                  CASE d.kind
+                                      WHEN 'title' THEN (SELECT product_name FROM files WHERE title_key = d.group_key LIMIT 1)
+                                      WHEN 'key' THEN (SELECT product_name FROM files WHERE extracted_key = d.group_key
+                                                       AND product_name IS NOT NULL LIMIT 1)
+                                      ELSE (SELECT COALESCE(product_name, file_path) FROM files
+                                            WHERE content_hash = d.group_key LIMIT 1)
+                                  END AS name
+                           FROM dup_groups AS d
+                           WHERE d.kind IN ('title', 'key', 'content') AND d.file_count > 1
+                           ORDER BY name, d.kind""",
+    'duplicate_files_by_title': ("SELECT id, is_hidden, file_path, content_hash FROM files WHERE title_key = ? "
+                                 "ORDER BY is_hidden, file_path"),
+    'duplicate_files_by_key': ("SELECT id, is_hidden, file_path, content_hash FROM files WHERE extracted_key = ? "
+                               "ORDER BY is_hidden, file_path"),
+    'duplicate_files_by_content': ("SELECT id, is_hidden, file_path, content_hash FROM files WHERE content_hash = ? "
+                                   "ORDER BY is_hidden, file_path"),
+    'work_details': """SELECT f.product_name, f.maker_name, f.file_path,
+                              (SELECT GROUP_CONCAT(g.name, ', ') FROM file_genres AS fg JOIN genres AS g ON fg.genre_id = g.id
+                               WHERE fg.file_id = f.id)
+                       FROM files AS f WHERE f.id = ?""",
+    # 표지 팩(cover_pack.CoverPack) 안의 위치와 형식. 받아서 저장한(status = 1) 표지만 읽습니다.
+    'cover': ("SELECT c.offset, c.length, c.format FROM files AS f JOIN covers AS c ON c.extracted_key = f.extracted_key "
+              "WHERE f.id = ? AND c.status = 1"),
+    'is_hidden': "SELECT is_hidden FROM files WHERE id = ?",
+    'set_hidden': "UPDATE files SET is_hidden = ? WHERE id = ?",
+    'delete_file_genres': "DELETE FROM file_genres WHERE file_id = ?",
+    'delete_file': "DELETE FROM files WHERE id = ?",
+}
+
+
+def open_read_connection(path, check_same_thread=True):
+    """조회 전용으로 튜닝한 연결을 엽니다. (query_only이므로 실수로 쓰기를 해도 오류가 납니다)"""
+    conn = sqlite3.connect(path, check_same_thread=check_same_thread, cached_statements=STATEMENT_CACHE_SIZE)
+    conn.execute(f"PRAGMA busy_timeout = {db_schema.BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA mmap_size = {READ_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size = -{READ_CACHE_SIZE_KB}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA query_only = 1")
+    return conn
+
+
+class QueryCache:
+    """
+    조회 결과를 키(조회 이름과 정규화한 조건)별로 최근 size개까지 기억하는 LRU입니다.
+    꺼낼 때마다 연결의 PRAGMA data_version을 확인해서, 다른 연결(크롤러, 스캐너, 앱의 쓰기 연결)이
+    그 사이에 커밋했으면 기억한 결과를 모두 버립니다. data_version은 테이블을 읽지 않고 변경 카운터만 보므로
+    같은 조회를 반복하면 SQLite에서 다시 읽지 않습니다.
+
+    한 연결과 그 연결을 쓰는 스레드에서만 씁니다. 적중/실패 수는 hits/misses와 metrics의
+    '<name>.cache_hit' / '<name>.cache_miss'로 볼 수 있습니다.
+    """
+
+    def __init__(self, name, size=QUERY_CACHE_SIZE):
+        self.name = name
+        self.size = size
+        self.entries = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, conn, key, compute):
+        """
+        key의 결과를 돌려줍니다. 없거나 DB가 바뀌었으면 compute()로 구해서 기억합니다.
+        (compute 도중에 다른 연결이 커밋해도 다음 get에서 버려지므로 오래된 결과가 남지 않습니다)
+        """
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            metrics.count(f'{self.name}.cache_hit')
+            return self.entries[key]
+        self.misses += 1
+        metrics.count(f'{self.name}.cache_miss')
+        value = compute()
+        self.entries[key] = value
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return value
+
+    def forget(self, keys):
+        """keys의 결과만 버립니다. (이 연결로 바꾼 항목 등)"""
+        for key in keys:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """기억한 결과를 모두 버립니다. data_version은 연결마다 따로 세므로 연결을 바꿀 때도 부릅니다."""
+        self.entries.clear()
+        self.version = None
+
+
+class LibraryDB:
+    """
+    라이브러리 앱의 DB 접근 계층입니다.
+    오래 유지하는 읽기 연결 하나와 쓰기 연결 하나를 처음 쓸 때 열어 두고 계속 재사용하므로,
+    SQLite의 페이지 캐시와 준비된 문장이 클릭할 때마다 버려지지 않습니다.
+    (WAL 모드이므로 쓰기 연결이 커밋한 내용은 읽기 연결의 다음 조회에 바로 보입니다)
+
+    두 연결은 처음 사용한 스레드(UI 스레드)에서만 씁니다. 다른 스레드에서는 open_read_connection으로
+    자기 연결을 따로 엽니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._reader = None
+        self._writer = None
+        # 상세 정보도 QueryCache로 기억하므로, 크롤러/감시 모드/파이프라인이 작품을 바꾸면 다음 조회에서 다시 읽습니다.
+        self.details = QueryCache('details', DETAIL_CACHE_SIZE)
+        self.queries = QueryCache('query')
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            self._reader = open_read_connection(self.path)
+        return self._reader
+
+    @property
+    def writer(self):
+        if self._writer is None:
+            self._writer = db_schema.connect(self.path)
+            self._writer.execute(f"PRAGMA cache_size = -{READ_CACHE_SIZE_KB}")
+        return self._writer
+
+    def fetch_all(self, name, params=()):
+        """QUERIES[name]을 읽기 연결로 실행해 모든 행을 돌려줍니다."""
+        return self.reader.execute(QUERIES[name], params).fetchall()
+
+    def fetch_one(self, name, params=()):
+        return self.reader.execute(QUERIES[name], params).fetchone()
+
+    def cached(self, key, compute):
+        """읽기 연결로 하는 조회 compute()의 결과를 key로 기억해 둡니다. (QueryCache)"""
+        return self.queries.get(self.reader, key, compute)
+
+    def work_details(self, file_id):
+        """
+        작품 하나의 상세 정보 dict(product_name, maker_name, file_path, genres)를 돌려줍니다. 없으면 None.
+        최근에 조회한 DETAIL_CACHE_SIZE개는 DB가 그사이 바뀌지 않았으면 DB를 읽지 않고 돌려줍니다.
+        """
+        return self.details.get(self.reader, file_id, lambda: self._read_details(file_id))
+
+    def _read_details(self, file_id):
+        row = self.fetch_one('work_details', (file_id,))
+        if row is None:
+            return None
+        return {'product_name': row[0], 'maker_name': row[1], 'file_path': row[2], 'genres': row[3] or "N/A"}
+
+    def file_paths(self, file_ids):
+        """{id: file_path}. 여러 작품을 한꺼번에 지울 때 쓰며, IN 목록이 너무 길지 않게 나눠서 읽습니다."""
+        file_ids = list(file_ids)
+        paths = {}
+        for i in range(0, len(file_ids), 500):
+            chunk = file_ids[i:i + 500]
+            paths.update(self.reader.execute(
+                f"SELECT id, file_path FROM files WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+        return paths
+
+    def forget_details(self, file_ids):
+        """삭제하거나 바뀐 작품의 상세 정보를 캐시에서 지웁니다."""
+        self.details.forget(file_ids)
+
+    def write(self, statements):
+        """
+        [(이름, 파라미터 또는 파라미터 목록)]을 쓰기 연결에서 하나의 트랜잭션으로 실행합니다.
+        파라미터가 list이면 executemany로 여러 행에 적용합니다. 실패하면 전부 되돌리고 예외를 다시 던집니다.
+        """
+        conn = self.writer
+        try:
+            for name, params in statements:
+                if isinstance(params, list):
+                    conn.executemany(QUERIES[name], params)
+                else:
+                    conn.execute(QUERIES[name], params)
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+    def close(self):
+        for conn in (self._reader, self._writer):
+            if conn is not None:
+                conn.close()
+        self._reader = self._writer = None
+        self.details.clear()
+        self.queries.clear()
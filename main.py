@@ -1,97 +1,433 @@
 import os
-import sqlite3
-import re
-import tkinter as tk
-from tkinter import filedialog
+import sys
+import time
+import queue
+import threading
+import db_schema
+import key_extractor
+import metrics as metrics_module
+from metrics import metrics
 
 # 2. 생성될 데이터베이스 파일 이름입니다.
 DATABASE_FILE = 'file_index.db'
 
+# 방금 수정된 폴더는 같은 mtime 안에 파일이 더 추가될 수 있으므로,
+# 이 시간(초) 이내에 수정된 폴더는 mtime을 기록하지 않고 다음 스캔 때 다시 확인합니다.
+DIR_MTIME_SETTLE_SECONDS = 2
+
+# 폴더를 동시에 읽을 스레드 수와, 한 트랜잭션에 모아서 기록할 행 수입니다.
+# 네트워크 드라이브(NAS)처럼 stat/readdir 지연이 큰 곳에서는 스레드 수를 늘리면 빨라집니다.
+SCAN_WORKERS = 8
+SCAN_BATCH_SIZE = 5000
+
 def setup_database():
-    """데이터베이스와 테이블을 초기 설정합니다."""
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    # 'files' 테이블이 없으면 새로 생성합니다.
-    # extracted_key: 파일명에서 추출한 문자열
-    # file_path: 파일의 전체 경로
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS files (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            extracted_key TEXT NOT NULL,
-            file_path TEXT NOT NULL UNIQUE
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    """데이터베이스와 테이블을 초기 설정합니다. (db_schema의 마이그레이션을 적용)"""
+    db_schema.setup_database(DATABASE_FILE)
     print(f"데이터베이스 '{DATABASE_FILE}'가 준비되었습니다.")
 
 def extract_info_from_filename(filename):
     """
-    파일 이름에서 특정 문자열을 추출합니다.
-    *** 중요: 이 함수는 사용자의 요구사항에 맞게 수정해야 합니다. ***
+    파일 이름에서 품번 키를 추출합니다. 없으면 None.
+
+    품번 규칙(RJ/거, VJ, BJ, RE …)은 key_extractor.KEY_RULES에 있고,
+    key_rules.json 파일을 만들면 코드를 고치지 않고 규칙을 바꿀 수 있습니다.
+    (예: 'rj12345.zip' -> '12345', 'VJ012345.zip' -> 'VJ012345')
+    """
+    found = key_extractor.default_extractor().extract(filename)
+    return found[1] if found else None
 
+def normalize_root(path):
+    """
+    스캔할 루트 폴더를 DB에 기록하는 형태(절대 경로, 운영체제의 경로 구분자, 끝에 구분자 없음)로 맞춥니다.
+    스캐너, 감시 모드(watcher.py), 파이프라인(pipeline.py)이 모두 이 함수를 거치므로, 같은 폴더를
+    상대 경로나 'C:/...'(Windows 폴더 선택 창)로 지정해도 기존 행을 그대로 찾습니다.
+    """
+    return os.path.normpath(os.path.abspath(path))
 
+def _subtree_range(path):
+    """path 아래 모든 경로를 찾기 위한 (시작, 끝) 문자열 범위를 돌려줍니다."""
+    prefix = path if path.endswith(('/', '\\')) else path + os.sep
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
 
-    현재 코드는 파일 이름에서 'rj', 'RJ', '거' 뒤에 오는 5자리 이상의 연속된 숫자를 추출합니다.
-    (예: 'rj12345.zip' -> '12345')
+def scan_directory(dir_path, known_dir, incremental):
+    """
+    폴더 하나를 스캔합니다.
+    incremental 모드에서 폴더 mtime이 기록과 같으면 목록을 읽지 않고 skipped=True를 돌려줍니다.
+    files 항목은 (이름, 크기, mtime_ns, inode, 추출 키, 규칙 이름) 튜플이며, 키는 폴더 목록 전체를 한 번에 추출합니다.
+    (이름에 품번이 여러 개 있어도 처음 찾은 키 하나만 기록합니다)
+    """
+    scan = {'path': dir_path, 'mtime_ns': None, 'skipped': False, 'files': [], 'subdirs': [], 'error': None}
+    try:
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+    except OSError as e:
+        scan['error'] = e
+        return scan
+    # 방금 바뀐 폴더는 기록하지 않습니다 (다음 스캔에서 다시 확인).
+    if time.time_ns() - mtime_ns >= DIR_MTIME_SETTLE_SECONDS * 1_000_000_000:
+        scan['mtime_ns'] = mtime_ns
+    if incremental and known_dir and known_dir['mtime_ns'] is not None and known_dir['mtime_ns'] == mtime_ns:
+        scan['skipped'] = True
+        return scan
+    files = []
+    # 측정 중일 때만 폴더 목록 읽기(walk)와 파일 stat 시간을 따로 잽니다.
+    timing = metrics.enabled
+    if timing:
+        walk_start = time.perf_counter()
+        stat_seconds = 0.0
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        scan['subdirs'].append(entry.path)
+                    elif entry.is_file():
+                        if timing:
+                            stat_start = time.perf_counter()
+                            st = entry.stat()
+                            stat_seconds += time.perf_counter() - stat_start
+                        else:
+                            st = entry.stat()
+                        files.append((entry.name, st.st_size, st.st_mtime_ns, entry.inode()))
+                except OSError as e:
+                    print(f"\n파일 정보를 읽을 수 없습니다: {entry.path} ({e})")
+    except OSError as e:
+        scan['error'] = e
+        scan['mtime_ns'] = None
+    if timing:
+        metrics.add_time('scan.walk', time.perf_counter() - walk_start - stat_seconds)
+        metrics.add_time('scan.stat', stat_seconds, len(files))
+    with metrics.timer('scan.extract'):
+        found = key_extractor.default_extractor().extract_batch([f[0] for f in files])
+    for (name, size, mtime_ns, inode), match in zip(files, found):
+        rule, key = match or (None, None)
+        scan['files'].append((name, size, mtime_ns, inode, key, rule))
+    return scan
 
-    다른 형식을 원하시면 아래 re.search의 정규표현식을 수정하세요.
+class ScanSession:
     """
-    # 'rj', 'RJ', '거' 뒤에 오는 5자리 이상의 연속된 숫자를 찾습니다.
-    match = re.search(r'(?i)(?:rj|거)(\d{5,})', filename)
-    if match:
-        return match.group(1)
+    스캔 결과를 DB에 반영하고 결과 카운터를 관리합니다. (기록은 한 스레드에서만 합니다)
+    on_flush를 넘기면 모아 둔 행을 커밋할 때마다 부릅니다. (예: 새 파일을 바로 크롤링하도록 알리기)
+    """
+
+    def __init__(self, conn, root_path, batch_size=SCAN_BATCH_SIZE, on_flush=None):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.root_path = root_path = normalize_root(root_path)
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self.file_batch = []
+        self.dir_batch = []
+        # 삭제 후보가 있는 폴더는 정리가 끝난 뒤에 mtime을 기록합니다.
+        # (중간에 중단되면 다음 스캔에서 다시 읽도록)
+        self.deferred_dirs = []
+        self.total_files_processed = 0
+        self.success_count = 0
+        self.fail_count = 0
+        self.scanned_dirs = 0
+        self.skipped_dirs = 0
+        self.added = 0
+        self.updated = 0
+        self.moved = 0
+        self.removed = 0
+        # 사라진 파일 후보 (id, 크기, inode, 키). 스캔이 끝난 뒤 이동 여부를 판단합니다.
+        self.missing = []
+        # 함께 스캔하는 다른 루트의 세션들 (scan_trees). 루트 사이의 이동을 새로 추가한 쪽의 카운터에서 뺍니다.
+        self.peers = [self]
+        self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM files")
+        self.max_id_before = self.cursor.fetchone()[0]
+
+        # 루트 아래 기존 폴더 기록을 한 번에 읽어 둡니다.
+        low, high = _subtree_range(root_path)
+        self.known_dirs = {}
+        self.children = {}
+        self.cursor.execute(
+            "SELECT path, parent, mtime_ns, file_count, matched_count FROM dirs WHERE path = ? OR (path >= ? AND path < ?)",
+            (root_path, low, high))
+        for path, parent, mtime_ns, file_count, matched_count in self.cursor.fetchall():
+            self.known_dirs[path] = {'mtime_ns': mtime_ns, 'file_count': file_count, 'matched_count': matched_count}
+            self.children.setdefault(parent, []).append(path)
+
+    def next_dirs(self, scan):
+        """다음에 스캔할 하위 폴더 목록을 돌려줍니다."""
+        if scan['skipped']:
+            return list(self.children.get(scan['path'], []))
+        return scan['subdirs']
+
+    def apply(self, scan, parent):
+        """폴더 하나의 스캔 결과를 DB에 반영합니다."""
+        with metrics.timer('scan.apply'):
+            self._apply(scan, parent)
+
+    def _apply(self, scan, parent):
+        dir_path = scan['path']
+        known = self.known_dirs.get(dir_path)
+        if scan['error'] is not None:
+            print(f"\n폴더를 읽을 수 없습니다: {dir_path} ({scan['error']})")
+            # 읽지 못한 폴더의 기존 기록은 그대로 두고, 다음 스캔에서 다시 시도합니다.
+            if known:
+                self.cursor.execute("UPDATE dirs SET mtime_ns = NULL WHERE path = ?", (dir_path,))
+            return
+
+        if scan['skipped']:
+            self.skipped_dirs += 1
+            self.total_files_processed += known['file_count']
+            self.success_count += known['matched_count']
+            self.fail_count += known['file_count'] - known['matched_count']
+            return
+
+        self.scanned_dirs += 1
+        self.cursor.execute(
+            "SELECT id, file_path, file_size, file_mtime, file_inode, extracted_key FROM files WHERE dir_path = ?",
+            (dir_path,))
+        existing = {row[1]: row for row in self.cursor.fetchall()}
+
+        matched_count = 0
+        for name, size, mtime_ns, inode, key, rule in scan['files']:
+            self.total_files_processed += 1
+            full_path = os.path.join(dir_path, name)
+            if not key:
+                # 기록된 파일인데 이제 키가 나오지 않으면(품번 규칙 변경 등) existing에 남겨 삭제 후보로 정리합니다.
+                self.fail_count += 1
+                continue
+            row = existing.pop(full_path, None)
+            self.success_count += 1
+            matched_count += 1
+            if row is None:
+                self.added += 1
+            elif (row[2], row[3], row[4]) != (size, mtime_ns, inode):
+                self.updated += 1
+            else:
+                continue
+            self.file_batch.append((key, rule, full_path, dir_path, size, mtime_ns, inode))
+
+        # 폴더 안에서 사라진 파일
+        missing_before = len(self.missing)
+        for file_id, _, size, _, inode, key in existing.values():
+            self.missing.append((file_id, size, inode, key))
+
+        # 사라진 하위 폴더는 그 아래 전체가 삭제 후보가 됩니다.
+        current = set(scan['subdirs'])
+        for child in self.children.get(dir_path, []):
+            if child not in current:
+                self._drop_subtree(child)
+
+        mtime_ns = scan['mtime_ns']
+        if len(self.missing) > missing_before and mtime_ns is not None:
+            self.deferred_dirs.append((mtime_ns, dir_path))
+            mtime_ns = None
+        self.dir_batch.append((dir_path, parent, mtime_ns, len(scan['files']), matched_count))
+
+        if len(self.file_batch) + len(self.dir_batch) >= self.batch_size:
+            self.flush()
 
-    return None
+    def flush(self):
+        """모아 둔 행들을 executemany로 기록하고 커밋합니다."""
+        with metrics.timer('scan.insert'):
+            self._flush()
 
-def process_files(TARGET_DIRECTORY):
-    """지정된 디렉토리와 모든 하위 디렉토리의 파일들을 처리하고 데이터베이스에 기록합니다."""
+    def _flush(self):
+        if self.file_batch:
+            # 이전 버전에서 dir_path 없이 기록된 행도 경로가 같으면 메타데이터만 갱신됩니다.
+            self.cursor.executemany('''
+                INSERT INTO files (extracted_key, key_rule, file_path, dir_path, file_size, file_mtime, file_inode)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(file_path) DO UPDATE SET
+                    -- 크기나 mtime이 바뀐 파일의 내용 해시는 더 이상 맞지 않으므로 지웁니다.
+                    content_hash = CASE WHEN file_size IS excluded.file_size AND file_mtime IS excluded.file_mtime
+                                        THEN content_hash END,
+                    dir_path = excluded.dir_path,
+                    file_size = excluded.file_size,
+                    file_mtime = excluded.file_mtime,
+                    file_inode = excluded.file_inode,
+                    key_rule = excluded.key_rule
+            ''', self.file_batch)
+            self.file_batch = []
+        if self.dir_batch:
+            self.cursor.executemany('''
+                INSERT INTO dirs (path, parent, mtime_ns, file_count, matched_count) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    parent = excluded.parent,
+                    mtime_ns = excluded.mtime_ns,
+                    file_count = excluded.file_count,
+                    matched_count = excluded.matched_count
+            ''', self.dir_batch)
+            self.dir_batch = []
+        self.conn.commit()
+        if self.on_flush is not None:
+            self.on_flush()
+
+    def _drop_subtree(self, dir_path):
+        low, high = _subtree_range(dir_path)
+        self.cursor.execute(
+            "SELECT id, file_size, file_inode, extracted_key FROM files WHERE dir_path = ? OR (dir_path >= ? AND dir_path < ?)",
+            (dir_path, low, high))
+        self.missing.extend(self.cursor.fetchall())
+        self.cursor.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (dir_path, low, high))
+
+    def finish(self):
+        """
+        남은 행을 기록하고 사라진 파일을 정리합니다.
+        같은 inode/크기/키를 가진 파일이 이번 스캔에서 새로 추가되었다면 이동으로 보고,
+        기존 행(스크래핑 결과 포함)의 경로를 새 위치로 옮깁니다. 나머지는 삭제합니다.
+        """
+        self.flush()
+        with metrics.timer('scan.finish'):
+            self._finish()
+
+    def _finish(self):
+        for old_id, size, inode, key in self.missing:
+            new_row = None
+            if inode:
+                self.cursor.execute(
+                    "SELECT id, file_path, dir_path, file_mtime FROM files WHERE file_inode = ? AND file_size = ? AND extracted_key = ? AND id > ? LIMIT 1",
+                    (inode, size, key, self.max_id_before))
+                new_row = self.cursor.fetchone()
+            if new_row:
+                new_id, new_path, new_dir, new_mtime = new_row
+                self.cursor.execute("DELETE FROM files WHERE id = ?", (new_id,))
+                self.cursor.execute(
+                    "UPDATE files SET file_path = ?, dir_path = ?, file_mtime = ? WHERE id = ?",
+                    (new_path, new_dir, new_mtime, old_id))
+                self.moved += 1
+                self._owner(new_path).added -= 1
+            else:
+                self.cursor.execute("DELETE FROM file_genres WHERE file_id = ?", (old_id,))
+                self.cursor.execute("DELETE FROM files WHERE id = ?", (old_id,))
+                self.removed += 1
+        self.missing = []
+        self.cursor.executemany("UPDATE dirs SET mtime_ns = ? WHERE path = ?", self.deferred_dirs)
+        self.deferred_dirs = []
+        self.conn.commit()
+
+    def _owner(self, path):
+        """path를 기록한 세션을 돌려줍니다."""
+        for session in self.peers:
+            low, high = _subtree_range(session.root_path)
+            if low <= path < high:
+                return session
+        return self
+
+def _walk_worker(work_queue, result_queue, incremental, pending):
+    """
+    작업 큐에서 (ScanSession, 폴더, 부모 폴더)를 꺼내 스캔하고, 하위 폴더는 다시 작업 큐에,
+    결과는 기록 큐에 넣습니다. 모든 폴더를 마치면 기록 큐에 None을 넣습니다.
+    """
+    while True:
+        item = work_queue.get()
+        if item is None:
+            return
+        session, dir_path, parent = item
+        try:
+            scan = scan_directory(dir_path, session.known_dirs.get(dir_path), incremental)
+            children = session.next_dirs(scan)
+            # 하위 폴더를 먼저 등록해야 남은 작업 수가 중간에 0이 되지 않습니다.
+            with pending['lock']:
+                pending['count'] += len(children)
+            for child in children:
+                work_queue.put((session, child, dir_path))
+        except Exception as e:
+            scan = {'path': dir_path, 'mtime_ns': None, 'skipped': False, 'files': [], 'subdirs': [], 'error': e}
+        result_queue.put((session, scan, parent))
+        with pending['lock']:
+            pending['count'] -= 1
+            finished = pending['count'] == 0
+        if finished:
+            result_queue.put(None)
+
+def scan_tree(conn, root_path, incremental=True, workers=SCAN_WORKERS, batch_size=SCAN_BATCH_SIZE, on_flush=None):
+    """root_path 아래를 스캔해 conn에 반영하고, 결과 카운터가 담긴 ScanSession을 돌려줍니다. (출력 없음)"""
+    return scan_trees(conn, [root_path], incremental, workers, batch_size, on_flush)[0]
+
+def scan_trees(conn, root_paths, incremental=True, workers=SCAN_WORKERS, batch_size=SCAN_BATCH_SIZE, on_flush=None):
+    """
+    여러 루트 폴더를 함께 스캔해 conn에 반영하고, 루트마다의 ScanSession 목록을 돌려줍니다. (출력 없음)
+    폴더 읽기 스레드 workers개가 모든 루트의 폴더를 나눠 읽고, 기록은 현재 스레드 하나가 합니다.
+    루트 사이에 옮겨진 파일도 이동으로 처리되도록, 모든 루트의 새 행을 기록한 뒤에 사라진 파일을 정리합니다.
+    """
+    sessions = [ScanSession(conn, root_path, batch_size, on_flush) for root_path in root_paths]
+    for session in sessions:
+        session.peers = sessions
+    work_queue = queue.Queue()
+    # 기록이 밀리면 스캔 스레드가 기다리도록 결과 큐의 크기를 제한합니다.
+    result_queue = queue.Queue(maxsize=workers * 4)
+    pending = {'lock': threading.Lock(), 'count': len(sessions)}
+    threads = [threading.Thread(target=_walk_worker, args=(work_queue, result_queue, incremental, pending), daemon=True)
+               for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for session in sessions:
+        work_queue.put((session, session.root_path, None))
+    try:
+        while sessions:
+            # 기록 스레드가 스캔 결과를 기다린 시간 (길면 폴더 읽기가 병목)
+            with metrics.timer('scan.wait'):
+                item = result_queue.get()
+            if item is None:
+                break
+            session, scan, parent = item
+            session.apply(scan, parent)
+        for session in sessions:
+            session.flush()
+        for session in sessions:
+            session.finish()
+    finally:
+        for _ in threads:
+            work_queue.put(None)
+    return sessions
+
+def process_files(TARGET_DIRECTORY, incremental=True, workers=SCAN_WORKERS, batch_size=SCAN_BATCH_SIZE):
+    """
+    지정된 디렉토리와 모든 하위 디렉토리의 파일들을 처리하고 데이터베이스에 기록합니다.
+
+    incremental=True이면 mtime이 바뀌지 않은 폴더는 파일 목록을 다시 읽지 않습니다.
+    (폴더 mtime은 파일 추가/삭제/이름 변경 때만 바뀌므로, 내용만 수정된 파일까지
+    다시 확인하려면 incremental=False로 전체 스캔하세요.)
+    사라진 파일은 DB에서 삭제하고, 다른 위치로 옮겨진 파일은 기존 행의 file_path를 갱신합니다.
+
+    폴더 읽기는 workers개의 스레드가 나눠서 하고, DB 기록은 현재 스레드 하나가
+    batch_size개 행씩 모아서 한 트랜잭션으로 처리합니다.
+    """
     if not os.path.isdir(TARGET_DIRECTORY):
         print(f"오류: 지정된 디렉토리 '{TARGET_DIRECTORY}'를 찾을 수 없습니다.")
         return
 
-    # 카운터 변수 초기화
-    success_count = 0
-    fail_count = 0
-    total_files_processed = 0
-
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
-    print(f"'{TARGET_DIRECTORY}' 폴더 및 하위 폴더의 파일들을 처리합니다...")
-    
-    for root, _, files in os.walk(TARGET_DIRECTORY):
-        for filename in files:
-            full_path = os.path.join(root, filename)
-            
-            total_files_processed += 1
-            key = extract_info_from_filename(filename)
-            
-            if key:
-                success_count += 1
-                try:
-                    cursor.execute("INSERT OR IGNORE INTO files (extracted_key, file_path) VALUES (?, ?)", (key, full_path))
-                except sqlite3.Error as e:
-                    print(f"\n데이터베이스 오류 발생: {e}")
-            else:
-                fail_count += 1
+    workers = max(1, workers)
+    mode_text = "증분" if incremental else "전체"
+    print(f"'{TARGET_DIRECTORY}' 폴더 및 하위 폴더의 파일들을 처리합니다... ({mode_text} 스캔, 스레드 {workers}개)")
 
-    conn.commit()
-    conn.close()
+    conn = db_schema.connect(DATABASE_FILE)
+    start_time = time.perf_counter()
+    try:
+        session = scan_tree(conn, TARGET_DIRECTORY, incremental, workers, batch_size)
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - start_time
+    for name in ('total_files_processed', 'success_count', 'fail_count', 'scanned_dirs', 'skipped_dirs',
+                 'added', 'updated', 'moved', 'removed'):
+        metrics.count(f'scan.{name}', getattr(session, name))
     
     print("\n파일 처리 및 데이터베이스 기록이 완료되었습니다.")
     print("-" * 40)
     print("처리 결과 요약")
-    print(f"- 총 처리 파일 수: {total_files_processed}개")
-    print(f"- 성공 (키 추출)  : {success_count}개")
-    print(f"- 실패 (키 미발견): {fail_count}개")
+    print(f"- 총 처리 파일 수: {session.total_files_processed}개")
+    print(f"- 성공 (키 추출)  : {session.success_count}개")
+    print(f"- 실패 (키 미발견): {session.fail_count}개")
+    print(f"- 스캔한 폴더     : {session.scanned_dirs}개 (변경 없음 {session.skipped_dirs}개 건너뜀)")
+    print(f"- 신규 / 변경     : {session.added}개 / {session.updated}개")
+    print(f"- 이동 / 삭제     : {session.moved}개 / {session.removed}개")
+    print(f"- 소요 시간       : {elapsed:.1f}초 ({session.total_files_processed / max(elapsed, 1e-9):.0f}개/초)")
     print("-" * 40)
 
 def main():
     """메인 실행 함수"""
+    # --metrics[=파일.json]: 단계별 시간 요약 출력, --profile[=파일.prof]: cProfile 결과 저장
+    metrics_module.configure(name='main')
     setup_database()
 
     # ===== Tkinter를 사용해 폴더 선택 대화상자를 띄우는 부분 =====
+    # (화면 없는 서버에서 스캔 함수만 가져다 쓸 수 있도록 여기서 가져옵니다. pipeline.py 참고)
+    import tkinter as tk
+    from tkinter import filedialog
     # 불필요한 기본 Tk 창을 숨김
     root = tk.Tk()
     root.withdraw()
@@ -104,7 +440,14 @@ def main():
         return
     
     print(f"선택된 폴더: {target_path}")
-    process_files(target_path) # 선택된 경로를 process_files 함수에 전달
+    # python main.py --full 로 실행하면 변경 여부와 관계없이 모든 폴더를 다시 읽습니다.
+    incremental = '--full' not in sys.argv[1:]
+    process_files(target_path, incremental) # 선택된 경로를 process_files 함수에 전달
+    metrics_module.finish('process_files')
+    # python main.py --watch 로 실행하면 스캔 후 폴더를 계속 감시하며 변경을 반영합니다.
+    if '--watch' in sys.argv[1:]:
+        import watcher
+        watcher.watch(target_path)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import time
+import threading
+import cProfile
+import pstats
+from contextlib import contextmanager, nullcontext
+
+# --- 설정 ---
+# 환경 변수 LIBRARY_METRICS=1 이거나 실행할 때 --metrics를 주면 측정합니다.
+# --metrics=파일.json 이면 요약을 그 파일에도 저장하고, --profile[=파일.prof]이면 cProfile 결과를 저장합니다.
+METRICS_ENV = 'LIBRARY_METRICS'
+DEFAULT_PROFILE_FILE = '{name}.prof'
+
+_NULL_TIMER = nullcontext()
+
+
+class Metrics:
+    """
+    단계별 시간(timer), 개수(count), 값 분포(observe)를 모으는 가벼운 측정 도구입니다.
+    여러 스레드에서 불러도 됩니다. 꺼져 있으면(enabled=False) 모든 메서드가 바로 돌아오며,
+    파일마다 도는 반복문처럼 자주 불리는 곳은 호출 전에 metrics.enabled를 확인해 그 비용마저 없앱니다.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.timers = {}      # 이름 → [횟수, 합계(초), 최대(초)]
+        self.counters = {}    # 이름 → 개수
+        self.histograms = {}  # 이름 → {값: 개수}
+        self.started = time.perf_counter()
+
+    def add_time(self, name, seconds, calls=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = [calls, seconds, seconds]
+            else:
+                timer[0] += calls
+                timer[1] += seconds
+                if seconds > timer[2]:
+                    timer[2] = seconds
+
+    def timer(self, name):
+        """with metrics.timer('이름'): ... 블록의 실행 시간을 더합니다."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._timer(name)
+
+    @contextmanager
+    def _timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, value):
+        """value별 개수를 셉니다. (예: HTTP 응답 코드 분포)"""
+        if not self.enabled:
+            return
+        key = str(value)
+        with self.lock:
+            histogram = self.histograms.setdefault(name, {})
+            histogram[key] = histogram.get(key, 0) + 1
+
+    def summary(self, name=None):
+        """지금까지 모은 값을 JSON으로 바꿀 수 있는 dict로 돌려줍니다."""
+        with self.lock:
+            timers = {
+                key: {'calls': calls, 'total_ms': round(total * 1000, 3),
+                      'mean_ms': round(total * 1000 / calls, 3) if calls else 0.0, 'max_ms': round(peak * 1000, 3)}
+                for key, (calls, total, peak) in sorted(self.timers.items())
+            }
+            return {
+                'name': name,
+                'elapsed_ms': round((time.perf_counter() - self.started) * 1000, 3),
+                'timers': timers,
+                'counters': dict(sorted(self.counters.items())),
+                'histograms': {key: dict(sorted(h.items())) for key, h in sorted(self.histograms.items())},
+            }
+
+
+# 프로그램 전체에서 함께 쓰는 측정 도구
+metrics = Metrics(enabled=os.environ.get(METRICS_ENV, '') not in ('', '0'))
+
+_options = {'metrics_file': None, 'profile_file': None, 'threads_profiled': False}
+_profilers = []
+_profilers_lock = threading.Lock()
+
+
+def configure(argv=None, name='library'):
+    """
+    명령줄의 --metrics[=파일], --profile[=파일] 옵션을 읽어 측정/프로파일링을 켭니다.
+    처리한 옵션을 뺀 나머지 인자 목록을 돌려줍니다.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    rest = []
+    for arg in argv:
+        option, _, value = arg.partition('=')
+        if option == '--metrics':
+            metrics.enabled = True
+            _options['metrics_file'] = value or None
+        elif option == '--profile':
+            _options['profile_file'] = value or DEFAULT_PROFILE_FILE.format(name=name)
+        else:
+            rest.append(arg)
+    if metrics.enabled:
+        metrics.reset()
+    if _options['profile_file']:
+        _start_profiling()
+    return rest
+
+
+def _thread_profile(frame, event, arg):
+    """새 스레드의 첫 이벤트에서 그 스레드 전용 프로파일러를 켭니다. (cProfile은 스레드마다 따로 동작)"""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # 다른 프로파일러가 이미 켜져 있으면 이 스레드는 프로파일하지 않고 그대로 실행합니다.
+        sys.setprofile(None)
+        _options['threads_profiled'] = False
+        return
+    with _profilers_lock:
+        _profilers.append(profiler)
+
+
+def _start_profiling():
+    profiler = cProfile.Profile()
+    _profilers.append(profiler)
+    # Python 3.12부터는 프로세스에 프로파일러를 하나만 켤 수 있어(sys.monitoring) 메인 스레드만 프로파일합니다.
+    _options['threads_profiled'] = sys.version_info < (3, 12)
+    if _options['threads_profiled']:
+        threading.setprofile(_thread_profile)
+    profiler.enable()
+
+
+def finish(name):
+    """
+    측정이 켜져 있으면 요약 JSON을 출력하고(--metrics=파일이면 파일에도 저장),
+    프로파일링 중이면 모든 스레드의 결과를 합쳐 .prof 파일로 저장합니다.
+    """
+    if _profilers:
+        threading.setprofile(None)
+        with _profilers_lock:
+            profilers = list(_profilers)
+            _profilers.clear()
+        profilers[0].disable()
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            try:
+                stats.add(profiler)
+            except TypeError:
+                continue  # 아무 함수도 실행하지 않은 스레드
+        stats.dump_stats(_options['profile_file'])
+        print(f"프로파일 결과를 '{_options['profile_file']}'에 저장했습니다. (python -m pstats {_options['profile_file']})")
+        if not _options['threads_profiled']:
+            print("(이 Python 버전에서는 메인 스레드만 프로파일했습니다. 작업 스레드의 시간은 --metrics로 보세요)")
+    if not metrics.enabled:
+        return None
+    summary = metrics.summary(name)
+    if _options['profile_file']:
+        summary['threads_profiled'] = _options['threads_profiled']
+    text = json.dumps(summary, ensure_ascii=False, indent=2)
+    print(text)
+    if _options['metrics_file']:
+        with open(_options['metrics_file'], 'w', encoding='utf-8') as f:
+            f.write(text)
+    return summary
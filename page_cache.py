@@ -0,0 +1,148 @@
+import os
+import time
+import zlib
+import hashlib
+import threading
+
+# --- 설정 ---
+# 받아온 작품 페이지(HTML)를 압축해서 보관하는 폴더와 최대 용량입니다.
+PAGE_CACHE_DIR = 'page_cache'
+PAGE_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1GB
+# 용량을 넘으면 이 비율까지 줄어들 때까지 오래된 항목부터 지웁니다.
+PAGE_CACHE_EVICT_TARGET = 0.9
+
+
+class PageCache:
+    """
+    내용 해시(sha256)로 주소를 정하는 디스크 캐시입니다.
+    페이지 본문은 zlib으로 압축해 cache_dir/해시앞2자리/해시 파일로 저장하고,
+    extracted_key → 해시 매핑과 마지막 사용 시각은 DB의 page_cache 테이블에 기록합니다.
+    같은 내용의 페이지는 한 번만 저장됩니다.
+
+    write_blob/read_blob은 여러 스레드나 프로세스에서 호출해도 되고,
+    DB를 다루는 나머지 메서드는 기록 담당 스레드 하나에서만 호출합니다.
+    """
+
+    def __init__(self, cache_dir=PAGE_CACHE_DIR, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.total_bytes = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def setup(cursor):
+        """page_cache 테이블을 준비합니다."""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS page_cache (
+                extracted_key TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_page_cache_last_used ON page_cache (last_used)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_page_cache_hash ON page_cache (content_hash)")
+
+    def blob_path(self, digest):
+        return os.path.join(self.cache_dir, digest[:2], digest)
+
+    def write_blob(self, content):
+        """페이지 본문을 압축해 저장하고 (해시, 저장된 크기)를 돌려줍니다."""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            return digest, os.path.getsize(path)
+        data = zlib.compress(content, 6)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 다른 스레드가 같은 내용을 동시에 쓰더라도 반쯤 쓰인 파일이 보이지 않도록 임시 파일을 바꿔치기합니다.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return digest, len(data)
+
+    def read_blob(self, digest):
+        """저장된 페이지 본문을 읽어 압축을 풉니다. 없으면 None을 돌려줍니다."""
+        try:
+            with open(self.blob_path(digest), 'rb') as f:
+                return zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+
+    def lookup(self, cursor, key):
+        """key에 해당하는 캐시 해시를 돌려주고 사용 시각을 갱신합니다."""
+        cursor.execute("SELECT content_hash FROM page_cache WHERE extracted_key = ?", (key,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        if not os.path.exists(self.blob_path(row[0])):
+            cursor.execute("DELETE FROM page_cache WHERE extracted_key = ?", (key,))
+            return None
+        cursor.execute("UPDATE page_cache SET last_used = ? WHERE extracted_key = ?", (time.time(), key))
+        return row[0]
+
+    def record(self, cursor, key, digest, size):
+        """key → 해시 매핑을 기록합니다. (커밋은 호출한 쪽에서 합니다)"""
+        self._load_total(cursor)
+        cursor.execute("SELECT content_hash FROM page_cache WHERE extracted_key = ?", (key,))
+        old = cursor.fetchone()
+        if old and old[0] == digest:
+            cursor.execute("UPDATE page_cache SET last_used = ? WHERE extracted_key = ?", (time.time(), key))
+            return
+        cursor.execute("SELECT 1 FROM page_cache WHERE content_hash = ? LIMIT 1", (digest,))
+        if cursor.fetchone() is None:
+            self.total_bytes += size
+        cursor.execute(
+            "INSERT OR REPLACE INTO page_cache (extracted_key, content_hash, size, last_used) VALUES (?, ?, ?, ?)",
+            (key, digest, size, time.time()))
+        if old:
+            self._release(cursor, old[0])
+
+    def forget(self, cursor, key):
+        """key의 캐시 항목을 지웁니다. (저장된 페이지를 파싱할 수 없어 다시 받아야 할 때)"""
+        self._load_total(cursor)
+        cursor.execute("SELECT content_hash FROM page_cache WHERE extracted_key = ?", (key,))
+        row = cursor.fetchone()
+        if row is None:
+            return
+        cursor.execute("DELETE FROM page_cache WHERE extracted_key = ?", (key,))
+        self._release(cursor, row[0])
+
+    def evict(self, cursor):
+        """용량 제한을 넘었으면 가장 오래 사용하지 않은 항목부터 지웁니다. 지운 항목 수를 돌려줍니다."""
+        self._load_total(cursor)
+        if self.total_bytes <= self.max_bytes:
+            return 0
+        target = self.max_bytes * PAGE_CACHE_EVICT_TARGET
+        evicted = 0
+        while self.total_bytes > target:
+            cursor.execute("SELECT extracted_key, content_hash FROM page_cache ORDER BY last_used LIMIT 500")
+            rows = cursor.fetchall()
+            if not rows:
+                self.total_bytes = 0
+                break
+            for key, digest in rows:
+                cursor.execute("DELETE FROM page_cache WHERE extracted_key = ?", (key,))
+                self._release(cursor, digest)
+                evicted += 1
+                if self.total_bytes <= target:
+                    break
+        return evicted
+
+    def _release(self, cursor, digest):
+        """더 이상 참조하는 key가 없는 본문 파일을 지웁니다."""
+        cursor.execute("SELECT 1 FROM page_cache WHERE content_hash = ? LIMIT 1", (digest,))
+        if cursor.fetchone() is not None:
+            return
+        path = self.blob_path(digest)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        self.total_bytes -= size
+
+    def _load_total(self, cursor):
+        if self.total_bytes is None:
+            cursor.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT content_hash, size FROM page_cache)")
+            self.total_bytes = cursor.fetchone()[0]
@@ -0,0 +1,266 @@
+import os
+import sys
+import time
+import argparse
+import threading
+
+import db_schema
+import main as indexer
+import crawler
+import crawl_jobs
+import content_hash
+import search_index
+import metrics as metrics_module
+from metrics import metrics
+from cover_pack import COVER_STORED
+from page_cache import PageCache
+
+# --- 설정 ---
+DATABASE_FILE = 'file_index.db'
+# 크롤링 단계가 대기열에서 한 번에 가져오는 작업 수. 스캔이 새 파일을 기록하면 다음 묶음에 바로 들어옵니다.
+CRAWL_CHUNK_SIZE = 200
+# 스캔 중에 받을 작업이 없으면 스캔이 다음 묶음을 기록할 때까지 이 시간(초)까지 기다렸다가 다시 확인합니다.
+CRAWL_POLL_SECONDS = 1.0
+
+
+def _contains(root, path):
+    try:
+        return os.path.commonpath([root, path]) == root
+    except ValueError:
+        return False  # 다른 드라이브
+
+
+def distinct_roots(paths):
+    """
+    main.normalize_root로 맞추고, 없는 폴더와 다른 루트 안에 들어 있는 루트를 뺀 목록을 돌려줍니다.
+    (겹치는 루트를 함께 스캔하면 같은 폴더를 두 번 읽고, 한쪽의 정리 단계가 다른 쪽 파일을 지울 수 있습니다)
+    """
+    roots = []
+    for path in sorted({indexer.normalize_root(path) for path in paths}):
+        if not os.path.isdir(path):
+            print(f"오류: 지정된 디렉토리 '{path}'를 찾을 수 없습니다. 건너뜁니다.")
+            continue
+        # 정렬하면 바깥 루트가 먼저 오지만, 사이에 다른 루트('lib-old')가 끼일 수 있으므로 모두와 비교합니다.
+        outer = next((root for root in roots if _contains(root, path)), None)
+        if outer is not None:
+            print(f"'{path}'는 '{outer}' 안에 있으므로 따로 스캔하지 않습니다.")
+            continue
+        roots.append(path)
+    return roots
+
+
+class Pipeline:
+    """
+    스캔 → 크롤링 → 색인 정리를 한 프로세스에서 이어서 실행합니다. (Tk 창이나 입력 없이 동작)
+
+    - 스캔: 여러 루트를 main.scan_trees로 함께 스캔합니다. 묶음을 커밋할 때마다 크롤링 단계를 깨웁니다.
+    - 크롤링: crawl_jobs 대기열에서 CRAWL_CHUNK_SIZE개씩 가져와 crawler.scrape_tasks로 받습니다.
+      새 파일은 트리거로 대기열에 들어가므로, 스캔이 끝나기 전에 찾은 품번부터 받기 시작합니다.
+      스캔이 끝났고 받을 작업이 없으면 멈춥니다. (백오프 중인 재시도는 다음 실행 때 받습니다)
+    - 내용 해시: 스캔이 끝나면 크롤링과 동시에 content_hash.find_content_duplicates를 실행합니다.
+    - 표지(covers=True): 크롤링이 끝난 뒤 찾아 둔 표지를 받습니다.
+    - 색인 정리: FTS 색인 조각을 합치고 PRAGMA optimize로 통계를 갱신합니다.
+
+    단계마다 자기 DB 연결을 쓰고, 기록 충돌은 busy_timeout으로 기다립니다.
+    run()은 단계별 시간과 처리량을 담은 dict를 돌려줍니다.
+    """
+
+    def __init__(self, roots, incremental=True, limit=None, rate=0, concurrency=crawler.MAX_CONCURRENT_REQUESTS,
+                 base_url=crawler.BASE_URL, hash_files=True, covers=False, cache=None, verbose=False,
+                 workers=indexer.SCAN_WORKERS):
+        self.roots = distinct_roots(roots)
+        self.incremental = incremental
+        self.limit = limit
+        self.rate = rate
+        self.concurrency = max(1, concurrency)
+        self.base_url = base_url
+        self.hash_files = hash_files
+        self.covers = covers
+        self.cache = cache
+        self.verbose = verbose
+        self.workers = max(1, workers)
+        # 스캔이 끝났는지, 그리고 크롤링 단계가 마지막으로 확인한 뒤에 스캔이 새 행을 커밋했는지
+        self.scan_done = threading.Event()
+        self.new_rows = threading.Event()
+        self.errors = []
+        self.report = {'roots': self.roots, 'scan': {}, 'crawl': {'pages': 0, 'during_scan': 0, 'chunks': 0,
+                                                                 'failures': {}}}
+
+    def run(self):
+        for module in (indexer, crawler, content_hash):
+            module.DATABASE_FILE = DATABASE_FILE
+        db_schema.setup_database(DATABASE_FILE)
+        if self.cache is None:
+            self.cache = PageCache()
+        start_time = time.perf_counter()
+
+        scan_thread = threading.Thread(target=self._stage, args=('scan', self._scan), daemon=True)
+        crawl_thread = threading.Thread(target=self._stage, args=('crawl', self._crawl), daemon=True)
+        scan_thread.start()
+        crawl_thread.start()
+        scan_thread.join()
+        if self.hash_files and not self.errors:
+            self._stage('hash', self._hash)
+        crawl_thread.join()
+        if self.covers and not self.errors:
+            self._stage('covers', self._fetch_covers)
+        self._stage('index', self._optimize)
+
+        elapsed = time.perf_counter() - start_time
+        scan, crawl = self.report['scan'], self.report['crawl']
+        self.report['seconds'] = round(elapsed, 3)
+        self.report['files_per_sec'] = round(scan.get('files', 0) / max(elapsed, 1e-9), 2)
+        self.report['pages_per_sec'] = round(crawl['pages'] / max(elapsed, 1e-9), 2)
+        if self.errors:
+            self.report['errors'] = [f"{stage}: {type(e).__name__}: {e}" for stage, e in self.errors]
+        return self.report
+
+    def _stage(self, name, func):
+        """단계 하나를 실행하고 걸린 시간을 기록합니다. 실패하면 예외를 기록하고, 스캔이 실패했으면 크롤링도 멈춥니다."""
+        stage = self.report.setdefault(name, {})
+        start = time.perf_counter()
+        try:
+            with metrics.timer(f'pipeline.{name}'):
+                func()
+        except Exception as e:
+            print(f"\n'{name}' 단계에서 오류가 발생했습니다: {type(e).__name__}: {e}")
+            self.errors.append((name, e))
+        finally:
+            if name == 'scan':
+                self.scan_done.set()
+                self.new_rows.set()
+            stage['seconds'] = round(time.perf_counter() - start, 3)
+
+    def _scan(self):
+        conn = db_schema.connect(DATABASE_FILE)
+        try:
+            sessions = indexer.scan_trees(conn, self.roots, self.incremental, self.workers,
+                                          on_flush=self.new_rows.set)
+        finally:
+            conn.close()
+        scan = self.report['scan']
+        scan['roots'] = {}
+        for session in sessions:
+            counts = {name: getattr(session, name) for name in
+                      ('total_files_processed', 'success_count', 'scanned_dirs', 'skipped_dirs',
+                       'added', 'updated', 'moved', 'removed')}
+            scan['roots'][session.root_path] = counts
+            for name, value in counts.items():
+                metrics.count(f'scan.{name}', value)
+        scan['files'] = sum(counts['total_files_processed'] for counts in scan['roots'].values())
+
+    def _crawl(self):
+        crawl = self.report['crawl']
+        conn = db_schema.connect(DATABASE_FILE)
+        cursor = conn.cursor()
+        session = crawler.create_session(self.concurrency)
+        bucket = crawler.TokenBucket(self.rate)
+        try:
+            while self.limit is None or crawl['pages'] < self.limit:
+                # 확인 순서가 중요합니다: 스캔 종료를 먼저 읽어야, 종료 직전에 기록된 작업을 놓치지 않습니다.
+                self.new_rows.clear()
+                scan_done = self.scan_done.is_set()
+                size = CRAWL_CHUNK_SIZE if self.limit is None else min(CRAWL_CHUNK_SIZE, self.limit - crawl['pages'])
+                tasks = [(db_id, key, None) for db_id, key in crawl_jobs.due_jobs(cursor, size)]
+                if not tasks:
+                    if scan_done:
+                        break
+                    with metrics.timer('pipeline.crawl_wait'):
+                        self.new_rows.wait(CRAWL_POLL_SECONDS)
+                    continue
+                done, failures = crawler.scrape_tasks(conn, tasks, session, bucket, self.concurrency, self.base_url,
+                                                      self.cache, verbose=self.verbose)
+                crawl['pages'] += done
+                crawl['chunks'] += 1
+                if not scan_done:
+                    crawl['during_scan'] += done
+                for name, count in failures.items():
+                    crawl['failures'][name] = crawl['failures'].get(name, 0) + count
+                if self.verbose:
+                    print(f"크롤링: {crawl['pages']}개 완료")
+        finally:
+            session.close()
+            conn.close()
+
+    def _hash(self):
+        conn = db_schema.connect(DATABASE_FILE)
+        try:
+            stats = content_hash.find_content_duplicates(conn)
+        finally:
+            conn.close()
+        self.report['hash'].update(full_hashed=stats['full_hashed'], groups=stats['groups'],
+                                   mb_hashed=round(stats['bytes_hashed'] / (1024 * 1024), 1))
+
+    def _fetch_covers(self):
+        crawler.fetch_covers(rate=self.rate, concurrency=self.concurrency, base_url=self.base_url)
+        conn = db_schema.connect(DATABASE_FILE)
+        try:
+            self.report['covers']['stored'] = conn.execute(
+                "SELECT COUNT(*) FROM covers WHERE status = ?", (COVER_STORED,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def _optimize(self):
+        conn = db_schema.connect(DATABASE_FILE)
+        try:
+            search_index.optimize_search_index(conn.cursor())
+            conn.commit()
+            conn.execute("PRAGMA optimize")
+        finally:
+            conn.close()
+
+
+def print_report(report):
+    scan, crawl = report['scan'], report['crawl']
+    print("\n" + "-" * 40)
+    print("파이프라인 실행 결과")
+    for root, counts in scan.get('roots', {}).items():
+        print(f"- {root}: 파일 {counts['total_files_processed']}개 (신규 {counts['added']}, 변경 {counts['updated']}, "
+              f"이동 {counts['moved']}, 삭제 {counts['removed']})")
+    print(f"- 스캔     : {scan.get('files', 0)}개, {scan['seconds']:.1f}초")
+    print(f"- 크롤링   : {crawl['pages']}개 (스캔 중에 {crawl['during_scan']}개), {crawl['seconds']:.1f}초")
+    if crawl['failures']:
+        print("  실패: " + ", ".join(f"{name} {n}개" for name, n in sorted(crawl['failures'].items())))
+    if 'hash' in report:
+        print(f"- 내용 해시: 내용이 같은 묶음 {report['hash'].get('groups', 0)}개, {report['hash']['seconds']:.1f}초")
+    if 'covers' in report:
+        print(f"- 표지     : 저장된 표지 {report['covers'].get('stored', 0)}개, {report['covers']['seconds']:.1f}초")
+    print(f"- 색인 정리: {report['index']['seconds']:.1f}초")
+    print(f"- 전체     : {report['seconds']:.1f}초 (파일 {report['files_per_sec']:.0f}개/초, "
+          f"페이지 {report['pages_per_sec']:.2f}개/초)")
+    for error in report.get('errors', []):
+        print(f"- 오류     : {error}")
+    print("-" * 40)
+
+
+def main():
+    global DATABASE_FILE
+    # --metrics[=파일.json]: 단계별 시간 요약 출력, --profile[=파일.prof]: cProfile 결과 저장
+    args = metrics_module.configure(name='pipeline')
+    parser = argparse.ArgumentParser(description="폴더 스캔 → 작품 정보 수집 → 색인 정리를 한 번에 실행합니다.")
+    parser.add_argument('roots', nargs='+', help="스캔할 폴더 (여러 개를 함께 스캔)")
+    parser.add_argument('--full', action='store_true', help="변경 여부와 관계없이 모든 폴더를 다시 읽기")
+    parser.add_argument('--limit', type=int, default=None, help="이번에 수집할 최대 작품 수 (기본값: 모두)")
+    parser.add_argument('--rate', type=float, default=0.5, help="초당 최대 요청 수 (0이면 제한 없음)")
+    parser.add_argument('--concurrency', type=int, default=crawler.MAX_CONCURRENT_REQUESTS, help="동시 요청 수")
+    parser.add_argument('--no-hash', action='store_true', help="내용 해시 비교를 건너뛰기")
+    parser.add_argument('--covers', action='store_true', help="표지 이미지도 받아 썸네일 팩에 저장")
+    parser.add_argument('--db', default=DATABASE_FILE, help="DB 파일")
+    parser.add_argument('--verbose', action='store_true', help="작품마다 수집 결과 출력")
+    options = parser.parse_args(args)
+
+    DATABASE_FILE = options.db
+    pipeline = Pipeline(options.roots, incremental=not options.full, limit=options.limit, rate=options.rate,
+                        concurrency=options.concurrency, hash_files=not options.no_hash, covers=options.covers,
+                        verbose=options.verbose)
+    if not pipeline.roots:
+        sys.exit(1)
+    report = pipeline.run()
+    print_report(report)
+    metrics_module.finish('pipeline')
+    if 'errors' in report:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import UnicodeDammit, EntitySubstitution
+
+# BeautifulSoup이 닫는 태그 없이 바로 닫힌 것으로 보는 태그들 (br, img, meta ...)
+EMPTY_ELEMENT_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS)
+# 이 태그들 안의 텍스트(script, style, template ...)는 get_text()에 포함되지 않습니다.
+STRING_CONTAINER_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+GENRE_HEADER_TEXT = '장르'
+
+
+class _Finished(Exception):
+    """필요한 값을 모두 찾았을 때 파싱을 멈추기 위한 내부 예외입니다."""
+
+
+class _NeedsFullParse(Exception):
+    """th 안에 th가 중첩된 페이지처럼 빠른 경로로 똑같은 결과를 보장할 수 없을 때 발생합니다."""
+
+
+class ProductPageParser(HTMLParser):
+    """
+    작품 페이지에서 h1#work_name, span.maker_name, 장르 칸(th '장르' 옆 td 안의 div.main_genre a)만
+    골라 읽는 스트리밍 파서입니다. 전체 트리를 만들지 않고, 세 값을 모두 찾으면 바로 멈춥니다.
+    표지 주소는 작품명(h1) 앞에 나오는 마지막 meta[property=og:image]의 content입니다.
+
+    결과는 BeautifulSoup(html_content, 'html.parser')로 같은 값을 찾은 것과 똑같도록
+    태그 스택, 텍스트 묶음, 문자 참조 처리 방식을 BeautifulSoup의 html.parser 빌더에 맞췄습니다.
+    """
+
+    def __init__(self, original_encoding=None):
+        super().__init__(convert_charrefs=False)
+        self.original_encoding = original_encoding
+        # 열린 태그 스택. 각 항목은 [태그 이름, th 내부 미니 트리 노드 또는 None]
+        self.stack = []
+        self.container_count = 0
+        # 닫는 태그 없이 바로 닫은 빈 태그 이름별 개수. 나중에 나오는 </br> 같은 닫는 태그는 무시합니다.
+        # (BeautifulSoup은 리스트를 쓰지만 페이지마다 수천 개가 쌓이므로 개수만 셉니다)
+        self.already_closed_empty_element = {}
+        # 태그 사이에 쌓이는 텍스트 조각 (BeautifulSoup의 current_data와 같은 단위)
+        self.text = []
+        # 진행 중인 텍스트 수집: [시작 깊이, 조각 목록, 결과 콜백]
+        self.captures = []
+
+        self.product_name = None
+        self.maker_name = None
+        self.genres = []
+        self.cover_url = None
+        self.work_name_state = 0   # 0: 못 찾음, 1: 읽는 중, 2: 완료
+        self.maker_state = 0
+        # 장르: 0: 헤더 찾는 중, 1: 헤더 다음 td 찾는 중, 2: td 읽는 중, 3: 완료
+        self.genre_state = 0
+        self.th_depth = None        # 검사 중인 th의 스택 깊이
+        self.sibling_depth = None   # 장르 헤더(th)의 부모 아래 깊이
+        self.cell_depth = None      # 장르 td의 스택 깊이
+        self.main_genre_depths = []
+
+    # --- 텍스트 처리 ---
+
+    def handle_data(self, data):
+        self.text.append(data)
+
+    def handle_charref(self, name):
+        # BeautifulSoup과 같이 256 미만의 숫자 참조는 원래 인코딩/Windows-1252 문자로 해석합니다.
+        if name.startswith('x'):
+            real_name = int(name.lstrip('x'), 16)
+        elif name.startswith('X'):
+            real_name = int(name.lstrip('X'), 16)
+        else:
+            real_name = int(name)
+        data = None
+        if real_name < 256:
+            for encoding in (self.original_encoding, 'windows-1252'):
+                if not encoding:
+                    continue
+                try:
+                    data = bytearray([real_name]).decode(encoding)
+                except UnicodeDecodeError:
+                    pass
+        if not data:
+            try:
+                data = chr(real_name)
+            except (ValueError, OverflowError):
+                pass
+        self.text.append(data or '\N{REPLACEMENT CHARACTER}')
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.text.append(character if character is not None else f'&{name}')
+
+    def _end_data(self, kind='text'):
+        """
+        모인 텍스트 조각 하나를 현재 열린 태그의 자식 문자열로 확정합니다.
+        kind: 'text'(일반 텍스트), 'cdata', 'other'(주석, 선언 등 get_text에 포함되지 않는 노드)
+        """
+        if not self.text:
+            return
+        data = ''.join(self.text)
+        self.text = []
+        if self.th_depth is not None:
+            node = self.stack[-1][1]
+            if node is not None:
+                node.append(data)
+        if kind == 'text' and self.container_count:
+            kind = 'other'
+        if kind != 'other' and self.captures:
+            stripped = data.strip()
+            if stripped:
+                for capture in self.captures:
+                    capture[1].append(stripped)
+
+    def handle_comment(self, data):
+        self._end_data()
+        # 주석도 자식 노드이므로 th의 .string 판정에는 영향을 주지만, get_text에는 포함되지 않습니다.
+        self.text.append(data)
+        self._end_data('other')
+
+    def handle_decl(self, data):
+        self._end_data()
+        self.text.append(data)
+        self._end_data('other')
+
+    def unknown_decl(self, data):
+        self._end_data()
+        if data.upper().startswith('CDATA['):
+            self.text.append(data[len('CDATA['):])
+            self._end_data('cdata')
+        else:
+            self.text.append(data)
+            self._end_data('other')
+
+    def handle_pi(self, data):
+        self._end_data()
+        self.text.append(data)
+        self._end_data('other')
+
+    # --- 태그 처리 ---
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag)
+
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        self._end_data()
+        depth = len(self.stack)
+
+        node = None
+        if self.th_depth is not None:
+            if tag == 'th':
+                raise _NeedsFullParse()
+            node = []
+            self.stack[-1][1].append(node)
+        elif tag == 'th' and self.genre_state == 0:
+            node = []
+            self.th_depth = depth + 1
+        self.stack.append([tag, node])
+        if tag in STRING_CONTAINER_TAGS:
+            self.container_count += 1
+
+        if self.work_name_state == 0 and tag == 'meta' and self._attr(attrs, 'property') == 'og:image':
+            self.cover_url = self._attr(attrs, 'content') or None
+        if self.work_name_state == 0 and tag == 'h1' and self._attr(attrs, 'id') == 'work_name':
+            self.work_name_state = 1
+            self.captures.append([depth + 1, [], self._set_work_name])
+        if self.maker_state == 0 and tag == 'span' and 'maker_name' in self._classes(attrs):
+            self.maker_state = 1
+            self.captures.append([depth + 1, [], self._set_maker_name])
+
+        if self.genre_state == 1 and depth == self.sibling_depth and tag == 'td':
+            self.genre_state = 2
+            self.cell_depth = depth + 1
+        elif tag == 'div':
+            # CSS 선택자 'div.main_genre a'와 같이 조상 div는 td 바깥에 있어도 됩니다.
+            if 'main_genre' in self._classes(attrs):
+                self.main_genre_depths.append(depth + 1)
+        elif self.genre_state == 2 and tag == 'a' and self.main_genre_depths:
+                index = len(self.genres)
+                self.genres.append('')
+                self.captures.append([depth + 1, [], lambda text, i=index: self.genres.__setitem__(i, text)])
+
+        if tag in EMPTY_ELEMENT_TAGS and handle_empty_element:
+            self._pop_to(depth)
+            self.already_closed_empty_element[tag] = self.already_closed_empty_element.get(tag, 0) + 1
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        if check_already_closed and self.already_closed_empty_element.get(tag):
+            # 이미 닫은 빈 태그의 닫는 태그는 텍스트 묶음도 끊지 않습니다.
+            self.already_closed_empty_element[tag] -= 1
+            return
+        self._end_data()
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                self._pop_to(i)
+                break
+
+    def _pop_to(self, depth):
+        """스택을 depth 길이로 줄이고, 그 사이에 닫힌 태그에 걸린 작업을 마무리합니다."""
+        if self.th_depth is not None and depth < self.th_depth:
+            th_node = self.stack[self.th_depth - 1][1]
+            if self._node_string(th_node) == GENRE_HEADER_TEXT:
+                self.genre_state = 1
+                self.sibling_depth = self.th_depth - 1
+            self.th_depth = None
+        if self.container_count:
+            self.container_count -= sum(1 for entry in self.stack[depth:] if entry[0] in STRING_CONTAINER_TAGS)
+        del self.stack[depth:]
+
+        if self.captures:
+            still_open = []
+            for capture in self.captures:
+                if capture[0] > depth:
+                    capture[2](''.join(capture[1]))
+                else:
+                    still_open.append(capture)
+            self.captures = still_open
+        while self.main_genre_depths and self.main_genre_depths[-1] > depth:
+            self.main_genre_depths.pop()
+        if self.genre_state == 1 and depth < self.sibling_depth:
+            # 헤더의 부모가 닫힐 때까지 td가 없었습니다.
+            self.genre_state = 3
+        elif self.genre_state == 2 and depth < self.cell_depth:
+            self.genre_state = 3
+
+        if self.work_name_state == 2 and self.maker_state == 2 and self.genre_state == 3:
+            raise _Finished()
+
+    def _set_work_name(self, text):
+        self.product_name = text
+        self.work_name_state = 2
+
+    def _set_maker_name(self, text):
+        self.maker_name = text
+        self.maker_state = 2
+
+    @staticmethod
+    def _attr(attrs, name):
+        value = None
+        for key, val in attrs:
+            if key == name:
+                # BeautifulSoup처럼 같은 속성이 여러 번 나오면 마지막 값을 씁니다.
+                value = '' if val is None else val
+        return value
+
+    @classmethod
+    def _classes(cls, attrs):
+        value = cls._attr(attrs, 'class')
+        return value.split() if value else ()
+
+    @classmethod
+    def _node_string(cls, node):
+        """BeautifulSoup의 Tag.string과 같이, 자식이 하나뿐일 때만 그 문자열을 돌려줍니다."""
+        if len(node) != 1:
+            return None
+        child = node[0]
+        if isinstance(child, str):
+            return child
+        return cls._node_string(child)
+
+    def parse(self, markup):
+        """markup(str)을 파싱해 결과 dict를 돌려줍니다. 빠른 경로로 처리할 수 없으면 _NeedsFullParse."""
+        try:
+            self.feed(markup)
+            self.close()
+            self._end_data()
+            self._pop_to(0)
+        except _Finished:
+            pass
+        if not self.product_name:
+            return None
+        return {'product_name': self.product_name, 'maker_name': self.maker_name, 'genres': self.genres,
+                'cover_url': self.cover_url}
+
+
+def parse_product_page(html_content):
+    """HTML(bytes 또는 str)에서 작품명, 제작사명, 장르, 표지 주소를 추출합니다. 작품명이 없으면 None."""
+    markup = html_content
+    original_encoding = None
+    if isinstance(markup, bytes):
+        dammit = UnicodeDammit(markup, is_html=True)
+        markup = dammit.unicode_markup
+        original_encoding = dammit.original_encoding
+    try:
+        return ProductPageParser(original_encoding).parse(markup)
+    except _NeedsFullParse:
+        return parse_product_page_soup(html_content)
+
+def parse_product_page_soup(html_content):
+    """BeautifulSoup으로 전체 트리를 만들어 추출합니다. (기준 구현, 빠른 경로의 대체 경로)"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    work_name_h1 = soup.find('h1', id='work_name')
+    product_name = work_name_h1.get_text(strip=True) if work_name_h1 else None
+    maker_name_span = soup.find('span', class_='maker_name')
+    maker_name = maker_name_span.get_text(strip=True) if maker_name_span else None
+    cover_url = None
+    if work_name_h1:
+        cover_meta = work_name_h1.find_previous('meta', attrs={'property': 'og:image'})
+        if cover_meta:
+            cover_url = cover_meta.get('content') or None
+    genres = []
+    genre_header = soup.find('th', string=GENRE_HEADER_TEXT)
+    if genre_header:
+        genre_cell = genre_header.find_next_sibling('td')
+        if genre_cell:
+            genre_links = genre_cell.select('div.main_genre a')
+            genres = [link.get_text(strip=True) for link in genre_links]
+    if not product_name:
+        return None
+    return {'product_name': product_name, 'maker_name': maker_name, 'genres': genres, 'cover_url': cover_url}
@@ -0,0 +1,106 @@
+import sqlite3
+
+# 검색용 FTS5 테이블 이름. rowid는 files.id와 같습니다.
+SEARCH_TABLE = 'works_fts'
+# trigram 토크나이저는 3글자 미만의 검색어를 색인으로 찾을 수 없습니다.
+TRIGRAM_MIN_LENGTH = 3
+
+_GENRES_OF = """(SELECT GROUP_CONCAT(g.name, ', ') FROM file_genres AS fg JOIN genres AS g ON fg.genre_id = g.id
+                 WHERE fg.file_id = {file_id})"""
+
+
+def fts5_available(cursor):
+    """SQLite에 FTS5 trigram 토크나이저가 있는지 확인합니다."""
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp._fts5_check USING fts5(x, tokenize='trigram')")
+        cursor.execute("DROP TABLE temp._fts5_check")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def setup_search_index(cursor):
+    """
+    작품명/제작사/장르 검색용 FTS5(trigram) 색인과 동기화 트리거를 준비합니다.
+    files에 product_name 컬럼이 아직 없거나 FTS5를 쓸 수 없으면 아무것도 하지 않고 False를 돌려줍니다.
+    처음 만들 때는 기존 데이터로 색인을 채웁니다.
+    """
+    cursor.execute("PRAGMA table_info(files)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if 'product_name' not in columns or not fts5_available(cursor):
+        return False
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'genres'")
+    if cursor.fetchone() is None:
+        return False
+
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (SEARCH_TABLE,))
+    created = cursor.fetchone() is None
+    cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(product_name, maker_name, genres, tokenize='trigram')")
+
+    # 작품명/제작사가 바뀌면 행 전체를 다시 색인합니다. (작품명이 없는 행은 색인하지 않습니다)
+    reindex_row = f"""
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+            INSERT INTO {SEARCH_TABLE} (rowid, product_name, maker_name, genres)
+            SELECT NEW.id, NEW.product_name, NEW.maker_name, {_GENRES_OF.format(file_id='NEW.id')}
+            WHERE NEW.product_name IS NOT NULL;"""
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_files_ai AFTER INSERT ON files
+        WHEN NEW.product_name IS NOT NULL BEGIN
+            INSERT INTO {SEARCH_TABLE} (rowid, product_name, maker_name, genres)
+            VALUES (NEW.id, NEW.product_name, NEW.maker_name, {_GENRES_OF.format(file_id='NEW.id')});
+        END""")
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_files_au AFTER UPDATE OF product_name, maker_name ON files BEGIN
+            {reindex_row}
+        END""")
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_files_ad AFTER DELETE ON files BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+        END""")
+    # 장르 연결이 바뀌면 해당 작품의 genres 칸만 갱신합니다.
+    for event, row in (('INSERT', 'NEW'), ('DELETE', 'OLD')):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_file_genres_{event[0].lower()} AFTER {event} ON file_genres BEGIN
+                UPDATE {SEARCH_TABLE} SET genres = {_GENRES_OF.format(file_id=f'{row}.file_id')}
+                WHERE rowid = {row}.file_id;
+            END""")
+
+    if created:
+        rebuild_search_index(cursor)
+    return True
+
+
+def rebuild_search_index(cursor):
+    """색인을 비우고 files/genres 내용으로 다시 채웁니다."""
+    cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    cursor.execute(f"""
+        INSERT INTO {SEARCH_TABLE} (rowid, product_name, maker_name, genres)
+        SELECT f.id, f.product_name, f.maker_name, GROUP_CONCAT(g.name, ', ')
+        FROM files AS f
+        LEFT JOIN file_genres AS fg ON f.id = fg.file_id
+        LEFT JOIN genres AS g ON fg.genre_id = g.id
+        WHERE f.product_name IS NOT NULL
+        GROUP BY f.id""")
+
+
+def optimize_search_index(cursor):
+    """
+    트리거로 조금씩 쌓인 색인 조각(segment)을 하나로 합칩니다. 많은 작품을 한꺼번에 수집한 뒤에 부르면
+    검색할 때 읽는 조각 수가 줄어듭니다. 색인이 없으면 아무것도 하지 않고 False를 돌려줍니다.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (SEARCH_TABLE,))
+    if cursor.fetchone() is None:
+        return False
+    cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+    return True
+
+
+def keyword_match_query(keyword):
+    """
+    작품명/제작사에서 keyword를 부분 문자열로 찾는 FTS5 MATCH 식을 돌려줍니다.
+    색인으로 찾을 수 없는 검색어(3글자 미만, LIKE 와일드카드 % _ 포함)이면 None을 돌려주므로
+    호출하는 쪽은 LIKE 검색으로 처리해야 합니다.
+    """
+    if len(keyword) < TRIGRAM_MIN_LENGTH or '%' in keyword or '_' in keyword:
+        return None
+    return '{product_name maker_name} : "' + keyword.replace('"', '""') + '"'
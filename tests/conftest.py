@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# 저장소 최상위의 모듈(main, crawler, ...)과 bench 패키지를 가져올 수 있도록 합니다.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import db_schema  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """최신 스키마를 적용한 빈 DB 파일 경로"""
+    path = str(tmp_path / 'test.db')
+    db_schema.setup_database(path)
+    return path
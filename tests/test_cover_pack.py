@@ -0,0 +1,62 @@
+import db_schema
+from bench.fixtures import cover_image
+from cover_pack import COVER_FAILED, COVER_PENDING, COVER_STORED, CoverPack, make_thumbnail, record_cover_urls, store_covers
+
+
+def test_append_sync_and_read_after_reopen(tmp_path):
+    path = str(tmp_path / 'covers.pack')
+    images = [cover_image(key) for key in (1, 2, 3)]
+    pack = CoverPack(path)
+    offsets = [pack.append(data) for data in images]
+    pack.sync()
+    # 기록하는 쪽이 아직 열려 있어도 다른 CoverPack에서 읽을 수 있습니다.
+    reader = CoverPack(path)
+    assert [reader.read(offset, len(data)) for offset, data in zip(offsets, images)] == images
+
+    # 읽기용으로 매핑한 뒤에 붙인 내용은 다시 매핑해서 읽습니다.
+    extra = cover_image(4)
+    offset = pack.append(extra)
+    pack.sync()
+    assert reader.read(offset, len(extra)) == extra
+    pack.close()
+    reader.close()
+
+    reopened = CoverPack(path)
+    assert reopened.read(offsets[1], len(images[1])) == images[1]
+    assert reopened.read(offset + len(extra), 1) is None
+    reopened.close()
+
+
+def test_read_missing_pack(tmp_path):
+    pack = CoverPack(str(tmp_path / 'missing.pack'))
+    assert pack.read(0, 10) is None
+    pack.close()
+
+
+def test_store_covers_records_positions(db_path, tmp_path):
+    conn = db_schema.connect(db_path)
+    cursor = conn.cursor()
+    record_cover_urls(cursor, [('1', '/img/1.png'), ('2', '/img/2.png'), ('3', '/img/3.png')])
+    pack = CoverPack(str(tmp_path / 'covers.pack'))
+    results = [
+        {'key': '1', 'info': make_thumbnail(cover_image(1)), 'status': 200, 'error': None, 'retry_after': None},
+        {'key': '2', 'info': None, 'status': 404, 'error': "HTTP 404", 'retry_after': None},
+        {'key': '3', 'info': None, 'status': None, 'error': "ConnectionError", 'retry_after': None},
+    ]
+    assert store_covers(cursor, pack, results) == {'not_found': 1, 'network': 1}
+    conn.commit()
+    pack.close()
+
+    rows = {key: row for key, *row in conn.execute("SELECT extracted_key, status, offset, length FROM covers")}
+    assert rows['2'][0] == COVER_FAILED
+    assert rows['3'][0] == COVER_PENDING
+    status, offset, length = rows['1']
+    assert status == COVER_STORED
+    reader = CoverPack(str(tmp_path / 'covers.pack'))
+    assert reader.read(offset, length) == results[0]['info'][0]
+    reader.close()
+
+    # 주소가 바뀐 표지는 다시 받도록 되돌립니다.
+    record_cover_urls(cursor, [('1', '/img/1-new.png')])
+    assert conn.execute("SELECT status FROM covers WHERE extracted_key = '1'").fetchone()[0] == COVER_PENDING
+    conn.close()
@@ -0,0 +1,140 @@
+import sqlite3
+import time
+
+import crawl_jobs
+import crawler
+import db_schema
+from bench.fixtures import FixtureServer, build_library
+from page_cache import PageCache
+
+
+def add_job(conn, key='100001'):
+    conn.execute("INSERT INTO files (extracted_key, file_path) VALUES (?, ?)", (key, f'/lib/RJ{key}.zip'))
+    return conn.execute("SELECT id FROM files WHERE extracted_key = ?", (key,)).fetchone()[0]
+
+
+def failed(file_id, status, retry_after=None):
+    return {'id': file_id, 'key': '100001', 'info': None, 'status': status, 'error': f"HTTP {status}",
+            'retry_after': retry_after}
+
+
+def job(conn, file_id):
+    return conn.execute("SELECT attempts, failure_class, next_attempt, etag, last_modified FROM crawl_jobs "
+                        "WHERE file_id = ?", (file_id,)).fetchone()
+
+
+def test_transient_failure_backs_off(db_path):
+    conn = db_schema.connect(db_path)
+    file_id = add_job(conn)
+    now = 1_000_000.0
+    assert crawl_jobs.due_jobs(conn.cursor(), 10, now) == [(file_id, '100001')]
+
+    assert crawl_jobs.record_results(conn.cursor(), [failed(file_id, 503)], now) == {'server_error': 1}
+    attempts, failure, next_attempt, _, _ = job(conn, file_id)
+    assert (attempts, failure) == (1, 'server_error')
+    assert now + crawl_jobs.RETRY_BASE_DELAY * 0.75 <= next_attempt <= now + crawl_jobs.RETRY_BASE_DELAY * 1.25
+    assert crawl_jobs.due_jobs(conn.cursor(), 10, now) == []
+    assert crawl_jobs.due_jobs(conn.cursor(), 10, next_attempt) == [(file_id, '100001')]
+
+    # 두 번째 실패는 더 오래 기다리고, 서버의 Retry-After보다 짧지 않습니다.
+    crawl_jobs.record_results(conn.cursor(), [failed(file_id, 429, retry_after=10_000)], now)
+    attempts, failure, next_attempt, _, _ = job(conn, file_id)
+    assert (attempts, failure) == (2, 'rate_limited')
+    assert next_attempt >= now + 10_000
+    conn.close()
+
+
+def test_permanent_failure_and_exhausted_retries_leave_queue(db_path):
+    conn = db_schema.connect(db_path)
+    missing = add_job(conn, '100001')
+    flaky = add_job(conn, '100002')
+    crawl_jobs.record_results(conn.cursor(), [failed(missing, 404)])
+    assert job(conn, missing)[1:3] == ('not_found', None)
+
+    for _ in range(crawl_jobs.RETRY_MAX_ATTEMPTS):
+        crawl_jobs.record_results(conn.cursor(), [failed(flaky, 503)])
+    assert job(conn, flaky)[:3] == (crawl_jobs.RETRY_MAX_ATTEMPTS, 'server_error', None)
+    assert crawl_jobs.queue_summary(conn.cursor())['failed'] == {'not_found': 1, 'server_error': 1}
+
+    assert crawl_jobs.requeue_failed(conn.cursor()) == 2
+    assert len(crawl_jobs.due_jobs(conn.cursor(), 10)) == 2
+    conn.close()
+
+
+def test_not_modified_without_headers_keeps_validators(db_path):
+    conn = db_schema.connect(db_path)
+    file_id = add_job(conn)
+    ok = {'id': file_id, 'key': '100001', 'info': {'product_name': 'x'}, 'status': 200,
+          'etag': '"v1"', 'last_modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+    crawl_jobs.record_results(conn.cursor(), [ok], 1.0)
+    not_modified = {'id': file_id, 'key': '100001', 'info': None, 'status': 304, 'not_modified': True,
+                    'etag': None, 'last_modified': None, 'refresh': True}
+    crawl_jobs.record_results(conn.cursor(), [not_modified], 2.0)
+    assert job(conn, file_id)[3:] == ('"v1"', 'Mon, 01 Jan 2024 00:00:00 GMT')
+
+    # 새 페이지(200)는 검증값을 통째로 바꿉니다.
+    crawl_jobs.record_results(conn.cursor(), [dict(ok, etag='"v2"', last_modified=None)], 3.0)
+    assert job(conn, file_id)[3:] == ('"v2"', None)
+    conn.close()
+
+
+def test_refresh_sends_conditional_requests_after_304(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'crawl.db')
+    build_library(db_path, works=20, duplicate_ratio=0, scraped=False)
+    monkeypatch.setattr(crawler, 'DATABASE_FILE', db_path)
+    cache = PageCache(str(tmp_path / 'pages'))
+    with FixtureServer() as server:
+        # 첫 키는 한 번 일시적으로 실패한 뒤 다음 실행 때 다시 받습니다.
+        server.faults[100000] = [503]
+        crawler.run_scraper(limit=20, rate=0, concurrency=4, base_url=server.url_template, cache=cache)
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT SUM(scraped_status = 1) FROM files").fetchone()[0] == 19
+        retry = conn.execute("SELECT attempts, failure_class FROM crawl_jobs WHERE next_attempt > ?",
+                             (time.time(),)).fetchall()
+        assert retry == [(1, 'server_error')]
+
+        # 서버의 304에는 Last-Modified가 없지만, 두 번의 갱신 모두 조건부 요청으로 끝나야 합니다.
+        for _ in range(2):
+            crawler.run_scraper(limit=20, rate=0, concurrency=4, base_url=server.url_template, cache=cache,
+                                refresh=True)
+        assert server.not_modified == 38
+        validators = conn.execute("SELECT etag, last_modified FROM crawl_jobs AS j JOIN files AS f "
+                                  "ON f.id = j.file_id WHERE f.scraped_status = 1").fetchall()
+        assert len(validators) == 19
+        assert all(etag and last_modified for etag, last_modified in validators)
+        conn.close()
+
+
+def test_classify_parse_failures():
+    assert crawl_jobs.classify({'info': None, 'status': 200}) == 'parse'
+    assert crawl_jobs.classify({'info': None, 'from_cache': True}) == 'cache_parse'
+    assert 'cache_parse' not in crawl_jobs.PERMANENT_FAILURES
+
+
+def test_unparsable_cached_page_is_evicted_and_fetched_again(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'crawl.db')
+    build_library(db_path, works=5, duplicate_ratio=0, scraped=False)
+    monkeypatch.setattr(crawler, 'DATABASE_FILE', db_path)
+    cache = PageCache(str(tmp_path / 'pages'))
+    conn = sqlite3.connect(db_path)
+    key = conn.execute("SELECT extracted_key FROM files ORDER BY id LIMIT 1").fetchone()[0]
+    # 예전 실행에서 잘린 페이지가 캐시에 저장된 경우
+    digest, size = cache.write_blob(b'<html lang="ko-kr"><body>')
+    cache.record(conn.cursor(), key, digest, size)
+    conn.commit()
+
+    with FixtureServer() as server:
+        crawler.run_scraper(limit=5, rate=0, concurrency=2, base_url=server.url_template, cache=cache)
+        assert conn.execute("SELECT SUM(scraped_status = 1) FROM files").fetchone()[0] == 4
+        retry = conn.execute("SELECT j.attempts, j.failure_class, j.next_attempt <= ? FROM crawl_jobs AS j "
+                             "JOIN files AS f ON f.id = j.file_id WHERE f.extracted_key = ?",
+                             (time.time(), key)).fetchone()
+        assert retry == (0, 'cache_parse', 1)
+        assert conn.execute("SELECT content_hash FROM page_cache WHERE extracted_key = ?", (key,)).fetchone() is None
+        assert cache.read_blob(digest) is None
+
+        # 다음 실행은 캐시 대신 네트워크로 받습니다.
+        crawler.run_scraper(limit=5, rate=0, concurrency=2, base_url=server.url_template, cache=cache)
+    assert conn.execute("SELECT SUM(scraped_status = 1) FROM files").fetchone()[0] == 5
+    assert conn.execute("SELECT COUNT(*) FROM crawl_jobs WHERE failure_class IS NOT NULL").fetchone()[0] == 0
+    conn.close()
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+import key_extractor
+from key_extractor import KeyExtractor, load_rules
+
+
+@pytest.fixture(scope='module')
+def extractor():
+    return KeyExtractor()
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('거12345.zip', ('RJ', '12345')),
+    ('rj01234567 작품.zip', ('RJ', '01234567')),
+    ('Rj123456.zip', ('RJ', '123456')),
+    ('[rJ123456] 작품', ('RJ', '123456')),
+    ('vJ012345.zip', ('VJ', 'VJ012345')),
+    ('Bj54321 (완).7z', ('BJ', 'BJ54321')),
+    ('[re123456]', ('RE', 'RE123456')),
+    # RJ는 단어 시작 조건이 없으므로 영문자 뒤에 붙어 있어도 찾습니다.
+    ('xrj12345', ('RJ', '12345')),
+])
+def test_extract(extractor, name, expected):
+    assert extractor.extract(name) == expected
+
+
+@pytest.mark.parametrize('name', [
+    'prej123456', 'rejected12345',
+    # 단어 시작에서만 찾는 규칙은 영문자 뒤에 붙은 접두어를 무시합니다.
+    'are123456', 'xvj012345', 'abj54321',
+    # 숫자가 모자라는 경우
+    'rj1234.zip', 'VJ0123', '거1234',
+    'no key here.zip', '',
+])
+def test_extract_none(extractor, name):
+    assert extractor.extract(name) is None
+
+
+def test_word_start_allows_non_ascii_and_punctuation(extractor):
+    assert extractor.extract('작품VJ012345') == ('VJ', 'VJ012345')
+    assert extractor.extract('(RE123456)') == ('RE', 'RE123456')
+
+
+def test_extract_all_returns_every_key_in_order(extractor):
+    assert extractor.extract_all('RJ01234567 VJ012345.zip') == [('RJ', '01234567'), ('VJ', 'VJ012345')]
+    assert extractor.extract('RJ01234567 VJ012345.zip') == ('RJ', '01234567')
+    assert extractor.extract_all('rejected12345') == []
+
+
+def test_minimum_digits_per_rule():
+    extractor = KeyExtractor([('RJ', ['rj'], 5, '{digits}', False), ('XX', ['xx'], 7, 'XX{digits}', True)])
+    assert extractor.extract('xx123456') is None
+    assert extractor.extract('xx1234567') == ('XX', 'XX1234567')
+    assert extractor.extract('rj12345') == ('RJ', '12345')
+
+
+def test_overlapping_prefixes_prefer_longest():
+    rules = [('RE', ['re'], 5, 'RE{digits}', True), ('REJ', ['rej'], 5, 'REJ{digits}', True)]
+    extractor = KeyExtractor(rules)
+    assert extractor.extract('REJ12345') == ('REJ', 'REJ12345')
+    assert extractor.extract('re12345') == ('RE', 'RE12345')
+    # 같은 접두어가 여러 규칙에 있으면 앞의 규칙이 우선입니다.
+    assert KeyExtractor([('A', ['rj'], 5, 'A{digits}', False),
+                         ('B', ['rj'], 5, 'B{digits}', False)]).extract('rj12345') == ('A', 'A12345')
+
+
+# 이어 붙였을 때 구분자('\0') 양쪽의 이름이 섞이면 결과가 달라지는 경우들
+BATCH_NAMES = [
+    'RJ123456.zip', 'abc', 'RE123456', 'are123456', 'tail RJ', '12345 head', 'rj12345', '67890.zip',
+    '', '거12345', 'x', 'VJ012345', 'RJ01234567 VJ012345.zip', 'prej123456', 'no key', 'BJ1234',
+]
+
+
+def test_extract_batch_matches_per_name(extractor):
+    assert extractor.extract_batch(BATCH_NAMES) == [extractor.extract(name) for name in BATCH_NAMES]
+    assert extractor.extract_batch(BATCH_NAMES, all_keys=True) == [extractor.extract_all(name) for name in BATCH_NAMES]
+    assert extractor.extract_batch([]) == []
+    assert extractor.extract_batch([], all_keys=True) == []
+
+
+def test_load_rules_override(tmp_path):
+    path = tmp_path / 'key_rules.json'
+    path.write_text(json.dumps([['XX', ['xx', '엑'], 6, 'XX{digits}', True]], ensure_ascii=False), encoding='utf-8')
+    rules = load_rules(str(path))
+    assert rules == [('XX', ['xx', '엑'], 6, 'XX{digits}', True)]
+    extractor = KeyExtractor(rules)
+    assert extractor.extract('Xx123456') == ('XX', 'XX123456')
+    assert extractor.extract('엑123456') == ('XX', 'XX123456')
+    assert extractor.extract('RJ123456') is None
+
+
+def test_load_rules_without_file(tmp_path):
+    assert load_rules(str(tmp_path / 'missing.json')) is key_extractor.KEY_RULES
+
+
+def test_empty_rules_are_rejected():
+    with pytest.raises(ValueError):
+        KeyExtractor([])
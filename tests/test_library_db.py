@@ -0,0 +1,26 @@
+import sqlite3
+
+from bench.fixtures import build_library
+from library_db import LibraryDB
+
+
+def test_work_details_follow_changes_from_other_connections(tmp_path):
+    path = str(tmp_path / 'library.db')
+    build_library(path, works=50)
+    db = LibraryDB(path)
+    first = db.work_details(1)
+    assert db.work_details(1) is first
+    assert db.details.hits == 1
+
+    # 크롤러나 파이프라인처럼 다른 연결(프로세스)에서 작품 정보를 바꿉니다.
+    other = sqlite3.connect(path)
+    other.execute("UPDATE files SET product_name = 'renamed', maker_name = 'new maker' WHERE id = 1")
+    other.commit()
+    other.close()
+    changed = db.work_details(1)
+    assert (changed['product_name'], changed['maker_name']) == ('renamed', 'new maker')
+
+    db.forget_details([1])
+    assert db.work_details(1) == changed
+    assert db.work_details(10**9) is None
+    db.close()
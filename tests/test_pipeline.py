@@ -0,0 +1,53 @@
+import os
+import sqlite3
+
+import content_hash
+import crawler
+import main as indexer
+import pipeline
+from bench.fixtures import FixtureServer, build_tree
+from page_cache import PageCache
+
+
+def test_distinct_roots_drops_nested_root_after_sibling(tmp_path):
+    base = tmp_path / 'x'
+    for name in ('lib', 'lib-old', 'lib/sub'):
+        (base / name).mkdir(parents=True)
+    roots = pipeline.distinct_roots([str(base / 'lib'), str(base / 'lib-old'), str(base / 'lib/sub')])
+    assert roots == [str(base / 'lib'), str(base / 'lib-old')]
+
+
+def test_distinct_roots_normalizes_and_skips_missing(tmp_path, monkeypatch):
+    (tmp_path / 'lib').mkdir()
+    monkeypatch.chdir(tmp_path)
+    roots = pipeline.distinct_roots(['lib/', str(tmp_path / 'lib'), 'missing'])
+    assert roots == [str(tmp_path / 'lib')]
+
+
+def test_pipeline_report_counts(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'pipeline.db')
+    for module in (pipeline, indexer, crawler, content_hash):
+        monkeypatch.setattr(module, 'DATABASE_FILE', db_path)
+    roots = [str(tmp_path / 'a'), str(tmp_path / 'b')]
+    for seed, root in enumerate(roots):
+        build_tree(root, 300, 50, key_ratio=0.2, seed=seed)
+
+    with FixtureServer() as server:
+        runner = pipeline.Pipeline(roots + [os.path.join(roots[0], 'd1')], incremental=False, rate=0, concurrency=4,
+                                   base_url=server.url_template, cache=PageCache(str(tmp_path / 'pages')))
+        report = runner.run()
+
+    conn = sqlite3.connect(db_path)
+    rows, keyed, scraped = conn.execute(
+        "SELECT COUNT(*), COUNT(extracted_key), SUM(scraped_status = 1) FROM files").fetchone()
+    queued = conn.execute("SELECT COUNT(*) FROM crawl_jobs WHERE next_attempt IS NOT NULL").fetchone()[0]
+    conn.close()
+
+    assert 'errors' not in report
+    assert sorted(report['scan']['roots']) == roots
+    assert report['scan']['files'] == 600
+    assert sum(counts['added'] for counts in report['scan']['roots'].values()) == rows == keyed
+    assert report['crawl']['pages'] == scraped == rows
+    assert report['crawl']['failures'] == {}
+    assert queued == 0
+    assert report['seconds'] >= report['scan']['seconds']
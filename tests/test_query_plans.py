@@ -0,0 +1,47 @@
+import re
+
+import pytest
+
+import db_schema
+from bench.fixtures import build_library
+
+# files 테이블(조회에서는 별칭 f)을 처음부터 끝까지 읽는 단계
+FILES_SCAN = re.compile(r'^SCAN (files|f)\b')
+
+
+@pytest.fixture(scope='module')
+def library_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('plans') / 'library.db')
+    build_library(path, works=2000)
+    return path
+
+
+@pytest.fixture
+def library(library_path):
+    # 연결마다 준비된 EXPLAIN 문을 캐시하므로, 스키마를 바꾸는 테스트가 다른 테스트에 영향을 주지 않도록 새로 엽니다.
+    conn = db_schema.connect(library_path)
+    yield conn
+    conn.close()
+
+
+def plan(conn, sql, params):
+    return [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def test_hot_queries_use_indexes(library):
+    assert db_schema.check_query_plans(library) == []
+
+
+@pytest.mark.parametrize('name, sql, params', db_schema.HOT_QUERIES, ids=[q[0] for q in db_schema.HOT_QUERIES])
+def test_hot_query_does_not_scan_files(library, name, sql, params):
+    assert [detail for detail in plan(library, sql, params) if FILES_SCAN.match(detail)] == []
+
+
+def test_dropped_index_is_reported(library):
+    library.execute("BEGIN")
+    try:
+        library.execute("DROP INDEX idx_files_dir_path")
+        problems = db_schema.check_query_plans(library)
+    finally:
+        library.rollback()
+    assert [name for name, _ in problems] == ["폴더의 파일 (증분 스캔)"]
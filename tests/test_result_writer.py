@@ -0,0 +1,44 @@
+import sqlite3
+
+import crawler
+import db_schema
+from bench.fixtures import FixtureServer, build_library
+from page_cache import PageCache
+
+
+def scraped(file_id, name, genres):
+    return {'id': file_id, 'key': str(100000 + file_id), 'status': 200, 'error': None, 'retry_after': None,
+            'info': {'product_name': name, 'maker_name': 'maker', 'genres': genres}}
+
+
+def test_every_result_is_written_across_batches(db_path):
+    conn = db_schema.connect(db_path)
+    conn.executemany("INSERT INTO files (extracted_key, file_path) VALUES (?, ?)",
+                     [(str(100000 + i), f'/lib/{i}.zip') for i in range(1, 12)])
+    conn.commit()
+    writer = crawler.ResultWriter(conn, batch_size=4)
+    for file_id in range(1, 11):
+        writer.add(scraped(file_id, f'work {file_id}', ['a', f'g{file_id % 3}']))
+    writer.add({'id': 11, 'key': '100011', 'info': None, 'status': 404, 'error': "HTTP 404", 'retry_after': None})
+    # 11개 중 8개는 배치 두 번으로 이미 기록되었고, 나머지는 flush에서 기록됩니다.
+    assert len(writer.pending) == 3
+    writer.flush()
+
+    rows = dict(conn.execute("SELECT id, scraped_status FROM files"))
+    assert rows == {**{i: 1 for i in range(1, 11)}, 11: -1}
+    assert conn.execute("SELECT COUNT(*) FROM file_genres").fetchone()[0] == 20
+    assert [row[0] for row in conn.execute("SELECT name FROM genres ORDER BY name")] == ['a', 'g0', 'g1', 'g2']
+    assert writer.failures == {'not_found': 1}
+    conn.close()
+
+
+def test_run_scraper_writes_partial_last_batch(db_path, tmp_path, monkeypatch):
+    build_library(db_path, works=30, duplicate_ratio=0, scraped=False)
+    monkeypatch.setattr(crawler, 'DATABASE_FILE', db_path)
+    with FixtureServer() as server:
+        crawler.run_scraper(limit=30, rate=0, concurrency=4, base_url=server.url_template, batch_size=7,
+                            cache=PageCache(str(tmp_path / 'pages')))
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM files WHERE scraped_status = 1").fetchone()[0] == 30
+    assert conn.execute("SELECT COUNT(*) FROM files WHERE product_name IS NULL").fetchone()[0] == 0
+    conn.close()
@@ -0,0 +1,43 @@
+import key_extractor
+import main as indexer
+import db_schema
+
+
+class WithoutKey:
+    """이름에 hidden이 들어 있으면 키를 찾지 못하는 추출기 (품번 규칙을 바꾼 경우)"""
+
+    def __init__(self, extractor, hidden):
+        self.extractor = extractor
+        self.hidden = hidden
+
+    def extract_batch(self, names):
+        return [None if self.hidden in name else match
+                for name, match in zip(names, self.extractor.extract_batch(names))]
+
+
+def test_file_whose_key_is_no_longer_found_is_removed(db_path, tmp_path, monkeypatch):
+    root = tmp_path / 'lib'
+    root.mkdir()
+    for name in ('RJ100001 a.zip', 'RJ100002 b.zip'):
+        (root / name).touch()
+    conn = db_schema.connect(db_path)
+    assert indexer.scan_tree(conn, str(root), incremental=False).added == 2
+
+    extractor = key_extractor.default_extractor()
+    monkeypatch.setattr(key_extractor, 'default_extractor', lambda: WithoutKey(extractor, '100002'))
+    session = indexer.scan_tree(conn, str(root), incremental=False)
+    assert (session.added, session.removed, session.fail_count) == (0, 1, 1)
+    assert [row[0] for row in conn.execute("SELECT extracted_key FROM files")] == ['100001']
+    conn.close()
+
+
+def test_relative_and_absolute_roots_share_rows(db_path, tmp_path, monkeypatch):
+    (tmp_path / 'lib' / 'sub').mkdir(parents=True)
+    (tmp_path / 'lib' / 'sub' / 'RJ100001 a.zip').touch()
+    monkeypatch.chdir(tmp_path)
+    conn = db_schema.connect(db_path)
+    assert indexer.scan_tree(conn, 'lib/', incremental=False).added == 1
+    session = indexer.scan_tree(conn, str(tmp_path / 'lib'), incremental=False)
+    assert (session.added, session.removed) == (0, 0)
+    assert conn.execute("SELECT file_path FROM files").fetchall() == [(str(tmp_path / 'lib' / 'sub' / 'RJ100001 a.zip'),)]
+    conn.close()
@@ -0,0 +1,262 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+import db_schema
+import main
+
+# --- 설정 ---
+# 마지막 이벤트 후 이 시간(초) 동안 조용하면 모아 둔 변경을 한 번에 반영합니다.
+WATCH_SETTLE_SECONDS = 0.5
+# 이벤트가 계속 들어와도 이 시간(초)이 지나면 일단 반영합니다.
+WATCH_MAX_DELAY_SECONDS = 5
+# inotify를 쓸 수 없을 때 증분 스캔을 반복하는 간격(초)
+WATCH_POLL_SECONDS = 10
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+# 폴더 목록이 바뀌거나 파일 내용/시각이 바뀌는 이벤트만 받습니다. (IN_MODIFY는 쓰는 동안 계속 오므로 제외)
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class Inotify:
+    """
+    ctypes로 부른 Linux inotify입니다. 폴더마다 watch를 걸고, 바뀐 폴더 경로의 집합을 돌려줍니다.
+    새로 생긴 하위 폴더에는 자동으로 watch를 추가합니다.
+    """
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+        self.paths = {}     # watch 번호 → 폴더 경로
+        self.watches = {}   # 폴더 경로 → watch 번호
+
+    def add_tree(self, root):
+        """root와 그 아래 모든 폴더에 watch를 겁니다. watch 한도를 넘으면 OSError(ENOSPC)."""
+        for dir_path, dirnames, _ in os.walk(root):
+            self.add(dir_path)
+
+    def add(self, dir_path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dir_path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return  # 그사이 사라진 폴더
+            raise OSError(err, f"inotify_add_watch 실패: {dir_path}")
+        self.paths[wd] = dir_path
+        self.watches[dir_path] = wd
+
+    def remove_tree(self, dir_path):
+        """폴더가 다른 곳으로 옮겨졌을 때 그 아래 watch를 모두 해제합니다."""
+        low, high = main._subtree_range(dir_path)
+        for path in [p for p in self.watches if p == dir_path or low <= p < high]:
+            wd = self.watches.pop(path)
+            self.paths.pop(wd, None)
+            self.libc.inotify_rm_watch(self.fd, wd)
+
+    def wait(self, timeout):
+        """이벤트를 기다립니다. timeout(초)이 None이면 이벤트가 올 때까지 잠듭니다."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        return bool(readable)
+
+    def read(self):
+        """
+        쌓인 이벤트를 읽어 (바뀐 폴더 집합, 넘침 여부)를 돌려줍니다.
+        넘침(IN_Q_OVERFLOW)이면 이벤트가 일부 사라졌으므로 전체 증분 스캔이 필요합니다.
+        """
+        changed = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                dir_path = self.paths.get(wd)
+                if dir_path is None:
+                    continue
+                if mask & IN_IGNORED:
+                    self.paths.pop(wd, None)
+                    if self.watches.get(dir_path) == wd:
+                        del self.watches[dir_path]
+                    continue
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    # 폴더 자체의 삭제/이동은 부모 폴더의 이벤트로 처리합니다.
+                    continue
+                changed.add(dir_path)
+                if mask & IN_ISDIR and name:
+                    child = os.path.join(dir_path, name)
+                    if mask & IN_MOVED_FROM:
+                        self.remove_tree(child)
+                    elif mask & (IN_CREATE | IN_MOVED_TO):
+                        # watch를 걸기 전에 만들어진 하위 폴더/파일은 부모 폴더를 다시 읽을 때 함께 스캔됩니다.
+                        self.add_tree(child)
+        return changed, overflow
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Watcher:
+    """
+    root 아래의 변경을 DB에 반영하는 감시 모드입니다.
+    이벤트는 WATCH_SETTLE_SECONDS 동안 모아(같은 폴더의 이벤트는 하나로 합쳐) 바뀐 폴더만 다시 읽고,
+    한 번의 ScanSession(= 배치 기록 후 커밋 한 번)으로 추가/변경/이동/삭제를 반영합니다.
+    inotify를 쓸 수 없으면 WATCH_POLL_SECONDS마다 증분 스캔을 반복합니다.
+
+    on_new_files(행 목록)를 넘기면 새로 발견된 (id, extracted_key)를 크롤러 작업으로 넘길 수 있습니다.
+    """
+
+    def __init__(self, root_path, on_new_files=None, use_inotify=True):
+        self.root_path = main.normalize_root(root_path)
+        self.on_new_files = on_new_files
+        self.inotify = None
+        if use_inotify and sys.platform.startswith('linux'):
+            try:
+                self.inotify = Inotify()
+            except (OSError, AttributeError) as e:
+                print(f"inotify를 사용할 수 없어 {WATCH_POLL_SECONDS}초 간격 폴링으로 감시합니다. ({e})")
+        self.conn = None
+
+    def start(self):
+        """watch를 걸고 처음 한 번 증분 스캔합니다. (watch를 먼저 걸어야 그사이의 변경을 놓치지 않습니다)"""
+        # 연결은 감시를 실행하는 스레드에서 엽니다.
+        self.conn = db_schema.connect(main.DATABASE_FILE)
+        if self.inotify is not None:
+            try:
+                self.inotify.add_tree(self.root_path)
+            except OSError as e:
+                print(f"inotify watch를 걸 수 없어 폴링으로 감시합니다. ({e})")
+                self.inotify.close()
+                self.inotify = None
+        self.report(main.scan_tree(self.conn, self.root_path))
+
+    def run(self, stop=None):
+        """stop(threading.Event 등)이 설정될 때까지 감시합니다. 이벤트가 없으면 잠들어 있습니다."""
+        try:
+            self.start()
+            while stop is None or not stop.is_set():
+                if self.inotify is None:
+                    if stop is not None:
+                        if stop.wait(WATCH_POLL_SECONDS):
+                            break
+                    else:
+                        time.sleep(WATCH_POLL_SECONDS)
+                    self.report(main.scan_tree(self.conn, self.root_path))
+                    continue
+                # stop을 확인할 수 있도록 이벤트가 없어도 가끔 깨어납니다.
+                if not self.inotify.wait(1.0 if stop is not None else None):
+                    continue
+                self.process_events()
+        finally:
+            self.conn.close()
+            self.conn = None
+
+    def process_events(self):
+        """이벤트를 조용해질 때까지 모은 뒤 한 번에 반영합니다."""
+        changed, overflow = self.inotify.read()
+        started = time.monotonic()
+        while time.monotonic() - started < WATCH_MAX_DELAY_SECONDS and self.inotify.wait(WATCH_SETTLE_SECONDS):
+            more, more_overflow = self.inotify.read()
+            changed |= more
+            overflow = overflow or more_overflow
+        if overflow:
+            print("이벤트가 너무 많아 일부를 놓쳤습니다. 전체 증분 스캔으로 맞춥니다.")
+            self.report(main.scan_tree(self.conn, self.root_path))
+        elif changed:
+            self.report(self.apply_changes(changed))
+
+    def apply_changes(self, changed):
+        """바뀐 폴더들만 다시 읽어 한 ScanSession으로 반영합니다. (새 하위 폴더는 그 아래까지)"""
+        session = main.ScanSession(self.conn, self.root_path)
+        # 사라진 폴더는 부모 폴더를 다시 읽을 때 정리됩니다.
+        stack = sorted((path for path in changed if os.path.isdir(path)), reverse=True)
+        seen = set()
+        while stack:
+            dir_path = stack.pop()
+            if dir_path in seen:
+                continue
+            seen.add(dir_path)
+            scan = main.scan_directory(dir_path, session.known_dirs.get(dir_path), incremental=False)
+            parent = None if dir_path == self.root_path else os.path.dirname(dir_path)
+            session.apply(scan, parent)
+            # 처음 보는 하위 폴더는 그 아래 전체를 읽습니다.
+            stack.extend(child for child in scan['subdirs'] if child not in session.known_dirs)
+        session.finish()
+        return session
+
+    def report(self, session):
+        new_rows = []
+        if session.added:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT id, extracted_key FROM files WHERE id > ? AND scraped_status = 0",
+                           (session.max_id_before,))
+            new_rows = cursor.fetchall()
+        if session.added or session.updated or session.moved or session.removed:
+            print(f"[{time.strftime('%H:%M:%S')}] 신규 {session.added} / 변경 {session.updated} / "
+                  f"이동 {session.moved} / 삭제 {session.removed}")
+        if new_rows and self.on_new_files is not None:
+            self.on_new_files(new_rows)
+
+    def close(self):
+        """inotify를 닫습니다. (DB 연결은 run이 끝날 때 닫힙니다)"""
+        if self.inotify is not None:
+            self.inotify.close()
+
+
+def watch(root_path, on_new_files=None, use_inotify=True):
+    """root_path를 감시하며 DB를 계속 갱신합니다. Ctrl+C로 끝냅니다."""
+    if not os.path.isdir(root_path):
+        print(f"오류: 지정된 디렉토리 '{root_path}'를 찾을 수 없습니다.")
+        return
+    db_schema.setup_database(main.DATABASE_FILE)
+    watcher = Watcher(root_path, on_new_files, use_inotify)
+    mode_text = "inotify" if watcher.inotify is not None else "폴링"
+    print(f"'{root_path}' 폴더를 감시합니다... ({mode_text}, Ctrl+C로 종료)")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\n감시를 종료합니다.")
+    finally:
+        watcher.close()
+
+
+if __name__ == '__main__':
+    # python watcher.py 폴더 [--poll]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not args:
+        print("사용법: python watcher.py 폴더 [--poll]")
+        sys.exit(1)
+    watch(args[0], use_inotify='--poll' not in sys.argv[1:])